@@ -0,0 +1,86 @@
+"""
+Memory used per object by the most numerous of the `oas_types`, with their `__slots__`, compared to holding the same
+fields in a per-instance `__dict__`, as they were before.
+
+Only the objects themselves are measured: the field values are shared by both layouts.
+
+    python benchmarks/memory_per_object.py [count]
+"""
+import copy
+import pathlib
+import sys
+import tracemalloc
+from typing import Callable, Dict
+
+# isort: off
+# These two lines are to ensure that the version of `sanic_openapi3e` measured is from this checkout.
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+from sanic_openapi3e.oas_types import (
+    Example,
+    Header,
+    MediaType,
+    OObject,
+    Operation,
+    Parameter,
+    PathItem,
+    Reference,
+    RequestBody,
+    Response,
+    Responses,
+    Schema,
+)
+
+# isort: on
+
+TEMPLATES: Dict[str, OObject] = {
+    "Schema": Schema(_type="integer", _format="int32", minimum=4, description="Minimum value: 4"),
+    "Parameter": Parameter(name="an_id", _in="query", description="An ID", schema=Schema.Integer),
+    "Response": Response(description="OK", content={"application/json": MediaType(schema=Schema.Object)}),
+    "MediaType": MediaType(schema=Schema.String),
+    "Header": Header(description="A header", schema=Schema.String),
+    "Example": Example(summary="A small number", value=7),
+    "RequestBody": RequestBody(description="A body", content={"application/json": MediaType(schema=Schema.Object)}),
+    "Reference": Reference("#/components/schemas/an_id"),
+    "Operation": Operation(summary="A summary", operation_id="GET~~~an_id", responses=Responses()),
+    "PathItem": PathItem(summary="A summary"),
+}
+
+
+def _dict_backed(template: OObject) -> Callable[[], object]:
+    """A factory for plain objects that hold the fields of the template in their `__dict__`, set in the same order."""
+    clazz = type(template.__class__.__name__, (), {})
+    fields = list(template._fields())  # pylint: disable=protected-access
+
+    def factory():
+        obj = clazz()
+        for name, value in fields:
+            setattr(obj, name, value)
+        return obj
+
+    return factory
+
+
+def _bytes_per_object(factory: Callable[[], object], count: int) -> float:
+    objects = [None] * count
+    factory()  # warm-up, so that any per-class caches are not measured.
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for idx in range(count):
+        objects[idx] = factory()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main(count: int = 10_000):
+    print(f"{'type':<12} {'fields':>6} {'__dict__':>10} {'__slots__':>10} {'saved':>7}")
+    for name, template in TEMPLATES.items():
+        fields = len(list(template._fields()))  # pylint: disable=protected-access
+        dict_bytes = _bytes_per_object(_dict_backed(template), count)
+        slots_bytes = _bytes_per_object(lambda template=template: copy.copy(template), count)
+        saved = 1 - slots_bytes / dict_bytes
+        print(f"{name:<12} {fields:>6} {dict_bytes:>9.0f}B {slots_bytes:>9.0f}B {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
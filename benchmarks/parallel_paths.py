@@ -0,0 +1,65 @@
+"""
+Time to build, and render, every spec variant of an app with many routes, with its paths rendered in one process, and
+then in more of them, as with `app.config.OPENAPI_BUILD_PROCESSES`. Each build is checked to be the same, byte for byte.
+
+    python benchmarks/parallel_paths.py [routes] [max processes]
+"""
+import os
+import pathlib
+import sys
+import timeit
+
+import sanic.response
+from sanic import Sanic
+
+# isort: off
+# These two lines are to ensure that the version of `sanic_openapi3e` measured is from this checkout.
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+from sanic_openapi3e import doc, openapi
+from sanic_openapi3e.oas_types import Components, Schema
+
+# isort: on
+
+
+def large_app(routes: int) -> Sanic:
+    app = Sanic("parallel_paths", strict_slashes=True)
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    app.config.OPENAPI_COMPONENTS = Components(
+        schemas={"limit": Schema(_type="integer", _format="int32", minimum=1, description="How many, at most")}
+    )
+    for idx in range(routes):
+
+        @doc.summary("Get item {}".format(idx))
+        @doc.tag("items")
+        @doc.parameter(name="an_id", _in="path", description="An ID", required=True, schema=Schema.Integer)
+        @doc.parameter(name="limit", _in="query", schema=doc.Reference("#/components/schemas/limit"))
+        @doc.parameter(name="day", _in="query", schema=Schema(_type="string", enum=["Mon", "Tue", "Wed"]))
+        @doc.response(200, "OK")
+        @doc.response(404, "Not found")
+        def handler(_, an_id: int):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        app.add_route(handler, "/items/{}/<an_id:int>".format(idx), methods=("GET", "PUT"))
+    return app
+
+
+def main(routes: int = 10_000, max_processes: int = 0):
+    app = large_app(routes)
+    max_processes = max_processes or os.cpu_count() or 1
+    print(f"{routes} routes, {os.cpu_count()} cores")
+
+    serial_time, serial_bodies = None, None
+    processes = 1
+    while processes <= max_processes:
+        app.config.OPENAPI_BUILD_PROCESSES = processes
+        elapsed = min(timeit.repeat(lambda: openapi.build_openapi_spec(app, None), number=1, repeat=3))
+        # pylint: disable=protected-access
+        bodies = {variant: rendered.bodies for variant, rendered in openapi._openapi_state(app).rendered.items()}
+        serial_time, serial_bodies = serial_time or elapsed, serial_bodies or bodies
+        assert bodies == serial_bodies, "the specs built in parallel must be the same"
+        print(f"{processes:>3} processes: {elapsed * 1000:.0f}ms, {serial_time / elapsed:.1f}x")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
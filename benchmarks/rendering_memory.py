@@ -0,0 +1,48 @@
+"""
+Peak memory, and time, to render a large spec as JSON and YAML: straight from the `OpenAPIv3` object, a piece at a time,
+and from its `yaml`-able form made in full first, as it was before.
+
+    python benchmarks/rendering_memory.py [paths]
+"""
+import pathlib
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+# isort: off
+# These two lines are to ensure that the version of `sanic_openapi3e` measured is from this checkout.
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+from sanic_openapi3e.rendering import RenderedSpec
+
+from serialization import large_spec
+
+# isort: on
+
+
+def _measure(render: Callable[[], RenderedSpec]) -> Tuple[float, float, RenderedSpec]:
+    start = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    rendered = render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, rendered
+
+
+def main(paths: int = 2_000):
+    spec = large_spec(paths)
+    whole_time, whole_peak, whole = _measure(lambda: RenderedSpec(spec.as_yamlable_object(), compression_level=0))
+    streamed_time, streamed_peak, streamed = _measure(lambda: RenderedSpec(spec, compression_level=0))
+    assert streamed.bodies == whole.bodies
+
+    size = (len(whole.json) + len(whole.yaml)) / 1e6
+    print(f"{paths} paths, {size:.1f}MB of JSON and YAML:")
+    print(f"  yaml-able form first: {whole_time * 1000:.0f}ms, peak {whole_peak / 1e6:.1f}MB")
+    print(f"  streamed:             {streamed_time * 1000:.0f}ms, peak {streamed_peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
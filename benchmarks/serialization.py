@@ -0,0 +1,80 @@
+"""
+Time to make a large spec `yaml`-able, with the compiled per-class serializers and with the generic one that they
+replaced.
+
+    python benchmarks/serialization.py [paths]
+"""
+import pathlib
+import sys
+import timeit
+
+# isort: off
+# These two lines are to ensure that the version of `sanic_openapi3e` measured is from this checkout.
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+from sanic_openapi3e import oas_types
+from sanic_openapi3e.oas_types import (
+    Components,
+    Info,
+    MediaType,
+    OpenAPIv3,
+    Operation,
+    Parameter,
+    PathItem,
+    Paths,
+    Response,
+    Responses,
+    Schema,
+)
+
+# isort: on
+
+
+def large_spec(paths: int) -> OpenAPIv3:
+    path_items = []
+    for idx in range(paths):
+        parameters = [
+            Parameter(name="an_id", _in="path", required=True, schema=Schema.Integer),
+            Parameter(name="limit", _in="query", schema=Schema(_type="integer", _format="int32", minimum=1)),
+            Parameter(name="day", _in="query", schema=Schema(_type="string", enum=["Mon", "Tue", "Wed"])),
+        ]
+        item = Schema(
+            _type="object",
+            properties={"an_id": Schema.Integer, "name": Schema.String, "tags": Schema.Strings},
+            required=["an_id"],
+        )
+        responses = Responses({200: Response(description="OK", content={"application/json": MediaType(schema=item)})})
+        operation = Operation(
+            operation_id="GET~~~items~{}~an_id".format(idx),
+            summary="Get item {}".format(idx),
+            parameters=parameters,
+            responses=responses,
+            tags=["items"],
+        )
+        path_items.append(("/items/{}/{{an_id}}".format(idx), PathItem(get=operation)))
+    return OpenAPIv3(
+        openapi=OpenAPIv3.version,
+        info=Info(title="API", version="v1.0.0"),
+        paths=Paths(path_items),
+        components=Components(),
+    )
+
+
+def main(paths: int = 1_000):
+    spec = large_spec(paths)
+    compiled = min(timeit.repeat(spec.as_yamlable_object, number=1, repeat=5))
+
+    # pylint: disable=protected-access
+    serializers = dict(oas_types._YAMLABLE_SERIALIZERS)
+    oas_types._YAMLABLE_SERIALIZERS.clear()
+    oas_types._YAMLABLE_SERIALIZERS.update({clazz: oas_types._generic_yamlable_serializer for clazz in serializers})
+    try:
+        generic = min(timeit.repeat(spec.as_yamlable_object, number=1, repeat=5))
+    finally:
+        oas_types._YAMLABLE_SERIALIZERS.clear()
+        oas_types._YAMLABLE_SERIALIZERS.update(serializers)
+
+    print(f"{paths} paths: generic {generic * 1000:.1f}ms, compiled {compiled * 1000:.1f}ms, {generic / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,48 @@
+"""
+Build the OpenAPI specs of a sanic app offline, so that they can be deployed with it and served as they are:
+
+    python -m sanic_openapi3e build myservice.app:app --out dist/
+
+and then, in the app's config, ``OPENAPI_PREBUILT_SPECS = "dist/"``. See `openapi.write_openapi_specs`.
+"""
+import argparse
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+import sanic
+
+from .openapi import write_openapi_specs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m sanic_openapi3e", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+    build = commands.add_parser("build", help="Write every spec variant, as JSON, YAML and compressed, to a directory.")
+    build.add_argument("app", help="The sanic app, as `module:attribute`, like `myservice.app:app`.")
+    build.add_argument("--out", default="dist", help="The directory to write the specs to. Default: dist")
+    args = parser.parse_args(argv)
+
+    module_name, _, attribute = args.app.partition(":")
+    sys.path.insert(0, os.getcwd())
+    try:
+        app = getattr(importlib.import_module(module_name), attribute or "app")
+    except (ImportError, AttributeError) as exc:
+        parser.error("Cannot import the app {}: {}".format(args.app, exc))
+    if not isinstance(app, sanic.Sanic):
+        parser.error("{} is not a sanic app, but a {}".format(args.app, type(app)))
+
+    try:
+        digests = write_openapi_specs(app, args.out)
+    except Exception as exc:  # pylint: disable=broad-except
+        print("Cannot build the specs of {}: {!r}".format(args.app, exc), file=sys.stderr)
+        return 1
+    for file_name, digest in sorted(digests.items()):
+        print("{}  {}".format(digest, os.path.join(args.out, file_name)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -162,6 +162,9 @@ def parameter(  # pylint: disable=too-many-arguments
                 raise ValueError("Cannot add choices to a Reference schema: define a new one with these choices.")
 
     assert schema
+    if interning_schemas() and isinstance(schema, Schema):
+        # Opted-in: share one frozen instance between all of the structurally equal schemas.
+        schema = schema.intern()
 
     def inner(func):
         _parameter = Parameter(
@@ -179,6 +182,8 @@ def parameter(  # pylint: disable=too-many-arguments
             examples=examples,
             content=content,
         )
+        # Frozen, so that it is merged with the route's parameter once, see `openapi._merge_route_parameter`.
+        _parameter.freeze()
         endpoints[func].parameters.append(_parameter)
         return func
 
@@ -224,7 +229,7 @@ def response(
 
     def inner(func):
         if any((description, headers, content, links)):
-            endpoints[func].x_responses_holder[str(status_code)] = Response(
+            _responses_holder(func)[str(status_code)] = Response(
                 description=description, headers=headers, content=content, links=links
             )
         return func
@@ -232,6 +237,17 @@ def response(
     return inner
 
 
+def _responses_holder(func) -> Responses:
+    """
+    The responses of the route's handler, to be added to: its own, rather than the shared `Responses.DEFAULT` that every
+    handler starts with, which is only copied once a handler documents a response of its own.
+    """
+    path_item = endpoints[func]
+    if path_item.x_responses_holder is Responses.DEFAULT:
+        path_item.x_responses_holder = Responses()
+    return path_item.x_responses_holder
+
+
 def responses(
     container: Union[
         Dict[
@@ -276,15 +292,15 @@ def responses(
                     if any((d, h, c, l)):
                         assert not r, "You cannot combine `Reference`s in this `Response`."
                     if r:
-                        endpoints[func].x_responses_holder[str(status_code)] = r
+                        _responses_holder(func)[str(status_code)] = r
                     elif any((d, h, c, l)):
-                        endpoints[func].x_responses_holder[str(status_code)] = Response(
+                        _responses_holder(func)[str(status_code)] = Response(
                             description=d, headers=h, content=c, links=l
                         )
                     else:
-                        endpoints[func].x_responses_holder[str(status_code)] = None
+                        _responses_holder(func)[str(status_code)] = None
                 else:
-                    endpoints[func].x_responses_holder[str(status_code)] = None
+                    _responses_holder(func)[str(status_code)] = None
         return func
 
     return inner
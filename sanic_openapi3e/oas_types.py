@@ -32,14 +32,29 @@ This implementation has some known limitations:
 
 """
 # pylint: disable=too-few-public-methods
+import contextlib
 import copy
 import functools
+import io
 import json
 import re
 import traceback
 import warnings
-from collections import OrderedDict
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import sanic.router
 
@@ -77,6 +92,69 @@ def _assert_strictly_greater_than_zero(element, name, clazz):
         )
 
 
+_VALIDATING = True
+"""
+Whether the constructors of the OObjects that are made by the thousand - `Schema`, `Parameter`, `Response`, `Header` and
+`MediaType` - validate their arguments. See `trust_oobjects`.
+"""
+
+
+def trust_oobjects(trusted: bool = True) -> None:
+    """
+    Opt in (or back out) of trusting the arguments of the `Schema`, `Parameter`, `Response`, `Header` and `MediaType`
+    constructors, which are then not validated as each object is made: that is most of the work of making them. This is
+    for production, where the same decorators have already been validated by the tests. Call it before the app's modules
+    with the decorators are imported. See `validate_oobjects` to validate a finished spec in one go instead.
+    """
+    global _VALIDATING  # pylint: disable=global-statement
+    _VALIDATING = not trusted
+
+
+def trusting_oobjects() -> bool:
+    return not _VALIDATING
+
+
+def validate_oobjects(value: Any) -> None:
+    """
+    Validate the trusted OObjects within the value - be it a whole `OpenAPIv3` or any part of it - as their constructors
+    would have, had they not been trusted, see `trust_oobjects`. Each OObject is validated only once, however often it
+    appears, and the constructors' errors are raised as-is.
+
+    :param value: What to validate.
+    """
+    global _VALIDATING  # pylint: disable=global-statement
+    validating, _VALIDATING = _VALIDATING, True
+    try:
+        seen: Dict[int, Any] = {}
+        stack = [value]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, OObject):
+                if id(value) in seen:
+                    continue
+                seen[id(value)] = value
+                fields = dict(value._fields())  # pylint: disable=protected-access
+                if value.__class__ in _TRUSTED_CLASSES:
+                    _validate_fields(value.__class__, fields)
+                stack.extend(fields.values())
+            elif isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple)):
+                stack.extend(value)
+    finally:
+        _VALIDATING = validating
+
+
+def _validate_fields(clazz: Type["OObject"], fields: Dict[str, Any]) -> None:
+    """
+    Make a scratch instance of the class with the fields, only for its constructor to validate them. What the
+    constructor warns about, or prints, was already when the OObject itself was made, so it is not repeated.
+    """
+    with warnings.catch_warnings(), contextlib.redirect_stderr(io.StringIO()):
+        warnings.simplefilter("ignore")
+        clazz(**fields)
+
+
 @functools.lru_cache(maxsize=64)
 def simple_snake2camel(string: str) -> str:
     if "_" not in string:
@@ -85,7 +163,7 @@ def simple_snake2camel(string: str) -> str:
     return first + "".join(ele.capitalize() for ele in rest)
 
 
-@functools.lru_cache(maxsize=64)
+@functools.lru_cache(maxsize=None)
 def openapi_keyname(key: str) -> str:
     """
     Returns the OpenAPI name for keys.
@@ -124,10 +202,59 @@ def openapi_keyname(key: str) -> str:
     }.get(key, simple_snake2camel(key))
 
 
-def default_operation_id_fn(method: str, uri: str, route: sanic.router.Route) -> str:
-    uri_for_operation_id: str = uri
-    for parameter in route.parameters:
-        uri_for_operation_id = re.sub("<" + parameter.name + ".*?>", parameter.name, uri_for_operation_id)
+_SANIC_URI_PARAMETER = re.compile(r"<(.+?)>")
+"""The pattern for the parameters in sanic URIs, like `<an_id>`, `<an_id:int>` or `<slug:[a-z]+>`."""
+
+
+class SanicUriTemplate(NamedTuple):
+    """A sanic URI, parsed. See `parse_sanic_uri`."""
+
+    uri: str
+    """The sanic URI, like `/items/<an_id:int>`."""
+
+    segments: Tuple[str, ...]
+    """The literal text around the parameters. There is always one more segment than there are parameters."""
+
+    parameter_names: Tuple[str, ...]
+    """The names of the parameters, in the order they appear in the URI."""
+
+    parameter_casts: Tuple[type, ...]
+    """The python types that sanic casts the parameters to, like `int` for `<an_id:int>`."""
+
+    oas_uri: str
+    """The URI in the OpenAPI path templating form, like `/items/{an_id}`."""
+
+    operation_id_uri: str
+    """The URI with each parameter replaced by its bare name, like `/items/an_id`, as used for operationIds."""
+
+
+@functools.lru_cache(maxsize=None)
+def parse_sanic_uri(uri: str) -> SanicUriTemplate:
+    """
+    Parse a sanic URI into its template. The templates are cached, so each distinct URI is only parsed once.
+
+    :param uri: The sanic URI, like `/items/<an_id:int>`.
+    """
+    parts = _SANIC_URI_PARAMETER.split(uri)
+    segments = tuple(parts[0::2])
+    parameters = [sanic.router.Router.parse_parameter_string(parameter_string) for parameter_string in parts[1::2]]
+    parameter_names = tuple(name for name, _type, _pattern in parameters)
+    return SanicUriTemplate(
+        uri=uri,
+        segments=segments,
+        parameter_names=parameter_names,
+        parameter_casts=tuple(_type for _name, _type, _pattern in parameters),
+        oas_uri=_join_sanic_uri_segments(segments, ["{" + name + "}" for name in parameter_names]),
+        operation_id_uri=_join_sanic_uri_segments(segments, parameter_names),
+    )
+
+
+def _join_sanic_uri_segments(segments: Sequence[str], parameters: Sequence[str]) -> str:
+    return "".join(segment + parameter for segment, parameter in zip(segments, [*parameters, ""]))
+
+
+def default_operation_id_fn(method: str, uri: str, route: sanic.router.Route) -> str:  # pylint: disable=unused-argument
+    uri_for_operation_id: str = parse_sanic_uri(uri).operation_id_uri
 
     return "{}~~{}".format(method.upper(), uri_for_operation_id).replace("/", "~")
 
@@ -156,128 +283,436 @@ def camel_case_operation_id_fn(method: str, uri: str, route: sanic.router.Route)
 
 NoneType = type(None)
 
+_UNSET = object()
+
 
 class OObject:
     """A base object for sanic_openapi3e. Internal."""
 
+    # The subclasses declare their fields in `__slots__`, in the order in which they are documented and serialized, so
+    # that their (many) instances do not each need a `__dict__`. Those that are dict-like keep their `__dict__`. The one
+    # slot here is not a field: it holds the `yaml`-able forms of a frozen object, see `freeze`.
+    __slots__ = ("_frozen_yamlable",)
+    _frozen_yamlable: Optional[Dict[bool, Dict]]
+
+    def _fields(self) -> Iterator[Tuple[str, Any]]:
+        """The (name, value) of each of the fields that are set, in order."""
+        for name in _slot_names(self.__class__):
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                yield name, value
+        instance_dict = getattr(self, "__dict__", None)
+        if instance_dict is not None:
+            yield from instance_dict.items()
+
+    def __getstate__(self):
+        # The `yaml`-able forms of a frozen object are not copied, nor pickled: the copy may well be modified.
+        slot_state = {}
+        for name in _slot_names(self.__class__):
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                slot_state[name] = value
+        return getattr(self, "__dict__", None), slot_state
+
+    def freeze(self) -> None:
+        """
+        Promise that neither this object, nor anything within it, will be modified from now on. Its `yaml`-able form is
+        then only made once, and shared wherever the object appears in the specs, like the `Response.DEFAULT_SUCCESS`
+        of every operation. A `Schema` with `x_frozen=True` is frozen in the same way.
+
+        The `yaml`-able form that is shared must not be modified either.
+        """
+        self._frozen_yamlable = {}
+
+    def is_frozen(self) -> bool:
+        """Whether the object is frozen, see `freeze`, and so can be cached by what it is, and not only shared."""
+        return getattr(self, "_frozen_yamlable", None) is not None or bool(getattr(self, "x_frozen", False))
+
     @staticmethod
     def _as_yamlable_object(
         value: Any, sort=False, opt_key: Optional[str] = None
     ) -> Union[Dict, str, bytes, int, float, List, NoneType]:
-        if isinstance(value, OObject):
-            return value.as_yamlable_object(sort=sort, opt_key=opt_key)
-        if isinstance(value, (str, bytes, int, float, type(None))):
-            return value
-        if isinstance(value, list):
-            if sort:
-                value = sorted(value)
-            return [OObject._as_yamlable_object(v, sort=sort, opt_key=opt_key) for v in value]
-        if isinstance(value, (dict, OrderedDict)):
-            items = list(value.items())
-            if sort:
-                items = sorted(items)
-            return {
-                key2: OObject._as_yamlable_object(value2, sort=sort, opt_key=f"{opt_key}.{key2}")
-                for key2, value2 in items
-            }
+        return yamlable_object(value, sort=sort, opt_key=opt_key)
 
-        raise TypeError(f"{type(value)}, value={value} opt_key={opt_key}")
-
-    def as_yamlable_object(  # pylint: disable=too-many-branches
-        self, sort=False, opt_key: Optional[str] = None
-    ) -> Dict:
-        _repr = {}
-
-        if not hasattr(self, "__dict__"):
-            raise TypeError(str(opt_key) + " " + self.__class__.__qualname__ + " " + repr(self))
-
-        for key, value in self.__dict__.items():
-            key2 = openapi_keyname(key)
-
-            # Schema classes have many keys with bool where their default is false. Don't send them out.
-            if self.__class__.__qualname__ == "Schema" and value is False:
-                if key2 in {
-                    "nullable",
-                    "readOnly",
-                    "writeOnly",
-                    " deprecated",
-                    "exclusiveMaximum",
-                    "exclusiveMinimum",
-                    "uniqueItems",
-                }:
-                    continue
+    def as_yamlable_object(self, sort=False, opt_key: Optional[str] = None) -> Dict:
+        """
+        The `yaml`-able form of this object. Unlike that of `yamlable_object`, which the rendering uses, it shares no
+        lists or dicts with itself, nor with any other: it is the caller's to modify, and `yaml.dump` it as it always
+        was, without any anchors and aliases.
+        """
+        return unshared_yamlable(yamlable_object(self, sort=sort, opt_key=opt_key))
 
-            # Allow False bools, but not other falsy values - UNLESS:
-            #   1: self is a SecurityRequirement
-            #   2: self is an Operation and key is security
-            # as an empty list has special meaning for these.
-            if (value is not False) and (not value):
-                if value == [] and self.__class__.__qualname__ == "SecurityRequirement":
-                    pass
-                elif value == [] and key == "security" and self.__class__.__qualname__ == "Operation":
-                    pass
-                else:
-                    continue
-            if key.startswith("x_"):
+    def as_shallow_yamlable_object(self, sort=False, opt_key: Optional[str] = None) -> Dict:
+        """
+        The `yaml`-able form of only this object's own fields: any OObject, list or dict within it is left as a
+        `DeferredYamlable`, to be made `yaml`-able by the caller when it gets there. This is what lets a large spec be
+        rendered a piece at a time, and `yamlable_object` walk any depth of OObjects without recursing.
+        """
+        serializer = _YAMLABLE_SERIALIZERS.get(self.__class__)
+        if serializer is None:
+            serializer = _YAMLABLE_SERIALIZERS[self.__class__] = _compile_yamlable_serializer(self.__class__)
+        return serializer(self, sort, opt_key)
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__qualname__, json.dumps(yamlable_object(self, sort=True), sort_keys=True),
+        )
+
+
+_YAMLABLE_SERIALIZERS: Dict[type, Callable[[Any, bool, Optional[str]], Dict]] = {}
+"""The shallow `yaml`-able serializer of each OObject class, see `_compile_yamlable_serializer`."""
+
+
+class DeferredYamlable(NamedTuple):
+    """A value that is still to be made `yaml`-able, as `OObject._as_yamlable_object(value, sort, opt_key)` would."""
+
+    value: Any
+    sort: bool
+    opt_key: Optional[str] = None
+
+
+_JSON_POINTER_ESCAPES = str.maketrans({"~": "~0", "/": "~1"})
+
+
+def yamlable_object(  # pylint: disable=too-many-locals, too-many-branches
+    value: Any, sort=False, opt_key: Optional[str] = None, pointer: str = "#"
+) -> Any:
+    """
+    The `yaml`-able form of the value, be it an OObject or a list, dict or scalar that holds them.
+
+    The value is walked with an explicit stack, rather than by recursing, so any depth of nesting is fine. Each OObject
+    is made `yaml`-able only once per call (and a frozen one only once, see `OObject.freeze`): wherever the same
+    instance is found again, its `yaml`-able form is shared. An OObject that is found within itself, like a `Schema`
+    that is one of its own `properties`, is given as a `$ref` to where it was first found instead.
+
+    :param value: What to make `yaml`-able.
+    :param sort: Whether to sort the fields of the OObjects, and the lists and dicts within them.
+    :param opt_key: Where the value is, for the error messages.
+    :param pointer: The JSON pointer to the value, for the `$ref`s to any OObjects found within themselves.
+    """
+    # The `yaml`-able forms already made, keyed by (id(oobject), sort), with the oobject itself, so that its id cannot
+    # be re-used meanwhile.
+    memo: Dict[Tuple[int, bool], Tuple[OObject, Dict]] = {}
+    # The OObjects that are being made `yaml`-able (those that are found within themselves), with their paths.
+    ancestors: Dict[Tuple[int, bool], Optional[Tuple]] = {}
+    refs = 0
+
+    root: List[Any] = [None]
+    # Each entry sets `container[key]` to the `yaml`-able form of the `DeferredYamlable`, which is at `path`: a linked
+    # list of the keys from the root. Those entries with no container mark the end of an OObject.
+    stack: List[Tuple[Any, Any, Any, Any]] = [(root, 0, DeferredYamlable(value, sort, opt_key), None)]
+    while stack:
+        container, key, deferred, path = stack.pop()
+        if container is None:
+            oobject, _repr, frozen, refs_before = deferred
+            del ancestors[key]
+            memo[key] = (oobject, _repr)
+            if frozen is not None and refs == refs_before:
+                # The `$ref`s are only correct where they were made, so the forms with them are not shared everywhere.
+                frozen[key[1]] = _repr
+            continue
+
+        value, sort, opt_key = deferred
+        if value.__class__ in _SCALARS or value is None or value is True or value is False:
+            container[key] = value
+
+        elif isinstance(value, OObject):
+            memo_key = (id(value), sort)
+            if memo_key in ancestors:
+                container[key] = {"$ref": _json_pointer(pointer, ancestors[memo_key])}
+                refs += 1
                 continue
-            if key == "deprecated" and value is False:
-                # By default, items in specs are `deprecated: false` - these are not desirable in the specs
+
+            frozen_forms: Optional[Dict[bool, Dict]] = getattr(value, "_frozen_yamlable", None)
+            if frozen_forms is None and isinstance(value, Schema) and value.x_frozen:
+                frozen_forms = value._frozen_yamlable = {}  # pylint: disable=protected-access
+            _repr = None if frozen_forms is None else frozen_forms.get(sort)
+            if _repr is None:
+                memoized = memo.get(memo_key)
+                _repr = None if memoized is None else memoized[1]
+            if _repr is not None:
+                container[key] = _repr
                 continue
 
-            value2: Union[Dict, List, str, bytes, int, float, bool, NoneType]
-            if value is False or value is True:
-                value2 = value
-
-            ############################################################################################################
-            # List of yamlable objects for element in value
-            elif key2 == "parameters" and self.__class__ in (PathItem, Operation):
-                value2 = [OObject.as_yamlable_object(e, sort=sort, opt_key=f"{opt_key}.{key2}") for e in value]
-
-            ############################################################################################################
-            # dicts of yamlable objects for items() value
-            elif key2 == "responses" and self.__class__ == Components:
-                value2 = {
-                    key3: value3.as_yamlable_object(opt_key=f"{opt_key}.{key2}") for key3, value3 in value.items()
-                }
-
-            elif key2 == "examples":
-                value2 = {
-                    key3: OObject._as_yamlable_object(value3, opt_key=f"{opt_key}.{key2}")
-                    for key3, value3 in value.items()
-                }
-            ############################################################################################################
-            # paths are a special case
-            elif key2 == "paths":
-                value2 = {
-                    uri: OObject.as_yamlable_object(path_item, opt_key=f"{opt_key}.{uri}")
-                    for uri, path_item in value._paths  # pylint: disable=protected-access
-                }
-            ############################################################################################################
-            # sort the schemas
-            elif key2 == "schemas":
-                # Everyone wants sorted schema entries! Note that as `dict`s, they require OObject._as_yamlable_object
-                value2 = OObject._as_yamlable_object(value, sort=True, opt_key=f"{opt_key}.{key2}")
-            ############################################################################################################
-            # default - for known OObjects
-            elif isinstance(value, OObject) and hasattr(value, "__dict__"):
-                value2 = OObject.as_yamlable_object(value, sort=sort, opt_key=f"{opt_key}.{key}")
-            else:
-                # Note how this uses the OObject._as_yamlable_object
-                value2 = OObject._as_yamlable_object(value, opt_key=f"{opt_key}.{key2}")
+            _repr = container[key] = value.as_shallow_yamlable_object(sort=sort, opt_key=opt_key)
+            ancestors[memo_key] = path
+            stack.append((None, memo_key, (value, _repr, frozen_forms, refs), path))
+            _push_deferred(stack, _repr, path)
 
-            _repr[key2] = value2
+        elif isinstance(value, list):
+            _repr = container[key] = sorted(value) if sort else list(value)
+            for idx in range(len(_repr) - 1, -1, -1):
+                stack.append((_repr, idx, DeferredYamlable(_repr[idx], sort, opt_key), (path, idx)))
 
-        if sort:
-            # Note: py36 does not have any (eternally dependable) ordering for dicts, but py37+
-            # remembers insert-order.
-            return {key: value for key, value in sorted(_repr.items())}  # pylint: disable=unnecessary-comprehension
+        elif isinstance(value, dict):
+            items = sorted(value.items()) if sort else value.items()
+            _repr = container[key] = dict(items)
+            for key2 in reversed(_repr):
+                stack.append((_repr, key2, DeferredYamlable(_repr[key2], sort, f"{opt_key}.{key2}"), (path, key2)))
 
-        return _repr
+        elif isinstance(value, (str, bytes, int, float)):
+            container[key] = value
 
-    def __repr__(self):
-        return "{}({})".format(
-            self.__class__.__qualname__, json.dumps(self.as_yamlable_object(sort=True), sort_keys=True),
-        )
+        else:
+            raise TypeError(f"{type(value)}, value={value} opt_key={opt_key}")
+
+    return root[0]
+
+
+def unshared_yamlable(value: Any) -> Any:
+    """
+    A copy of the `yaml`-able form, as made by `yamlable_object`, in which every list and dict is a new one, wherever
+    the same one was shared. Like `yamlable_object`, it walks the value with an explicit stack, rather than by
+    recursing.
+    """
+    root: List[Any] = [value]
+    stack: List[Tuple[Any, Any]] = [(root, 0)]
+    while stack:
+        container, key = stack.pop()
+        value = container[key]
+        if value.__class__ is dict:
+            dict_copy = container[key] = dict(value)
+            stack.extend((dict_copy, key2) for key2 in dict_copy)
+        elif value.__class__ is list:
+            list_copy = container[key] = list(value)
+            stack.extend((list_copy, idx) for idx in range(len(list_copy)))
+    return root[0]
+
+
+def _push_deferred(stack: List[Tuple[Any, Any, Any, Any]], container: Union[Dict, List], path: Any) -> None:
+    """Push the `DeferredYamlable`s of the shallow `yaml`-able form onto the stack, so that the first is done first."""
+    items = list(enumerate(container) if isinstance(container, list) else container.items())
+    for key, value in reversed(items):
+        if value.__class__ is DeferredYamlable:
+            stack.append((container, key, value, (path, key)))
+        elif value.__class__ in (list, dict):
+            _push_deferred(stack, value, (path, key))
+
+
+def _json_pointer(pointer: str, path: Optional[Tuple]) -> str:
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append("/" + str(key).translate(_JSON_POINTER_ESCAPES))
+    return pointer + "".join(reversed(keys))
+
+
+_SCHEMA_FALSE_KEYS = frozenset(
+    {"nullable", "readOnly", "writeOnly", "exclusiveMaximum", "exclusiveMinimum", "uniqueItems"}
+)
+"""Schema classes have many keys with bool where their default is false. Don't send them out."""
+
+_SCALARS = frozenset({str, int, float, bytes})
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(clazz: type) -> Tuple[str, ...]:
+    """The names of all of the `__slots__` of the class, including those of its bases, in declaration order."""
+    names: List[str] = []
+    for base in reversed(clazz.__mro__):
+        if base is OObject:
+            continue
+        slots = base.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__") and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def merge_oobjects(base: Any, overlay: Any, key: str = "") -> Any:
+    """
+    Merge what the overlay adds into the base, like a `doc.parameter` annotation into the parameter that sanic knows of
+    from the route. A value that is unset in one of them - `None`, or an empty string, list or dict - is taken from the
+    other one, while any other falsy value, like an `explode=False`, is set, but for a `False` in the base, which is
+    what the constructors default `deprecated` and the like to; a `Reference` in the overlay replaces whatever the base
+    has; OObjects of the same class are merged field by field and dicts key by key, all the way down. Any other values
+    that are set in both must be equal.
+
+    Neither the base nor the overlay is modified: only the OObjects and dicts that the merge changes are (shallow)
+    copied, without running their constructors again, and whatever is unchanged is shared. So, when the overlay adds
+    nothing, the base itself is returned. The `x_` fields, like a Schema's `x_frozen`, are the base's, and a copy of a
+    frozen Schema is not frozen.
+
+    :param base: The value to merge into.
+    :param overlay: The value to merge in.
+    :param key: Where the values are, for the error messages.
+    """
+    if overlay is base or _is_unset(overlay):
+        return base
+    if _is_unset(base) or base is False or isinstance(overlay, Reference):
+        return overlay
+
+    if isinstance(base, OObject) and overlay.__class__ is base.__class__:
+        merged = None
+        names = [name for name, _value in base._fields()]  # pylint: disable=protected-access
+        names += [name for name, _value in overlay._fields() if name not in names]  # pylint: disable=protected-access
+        for name in names:
+            if name.startswith("x_"):
+                # Not part of the spec, but of how the OObject is handled, like a Schema's `x_frozen`.
+                continue
+            value = getattr(base, name, None)
+            merged_value = merge_oobjects(value, getattr(overlay, name, None), key + "." + name if key else name)
+            if merged_value is not value:
+                if merged is None:
+                    merged = copy.copy(base)
+                    if isinstance(merged, Schema):
+                        # A copy is not the shared constant that its base may be, see `Schema.clone`.
+                        merged.x_frozen = False
+                setattr(merged, name, merged_value)
+        return base if merged is None else merged
+
+    if isinstance(base, dict) and isinstance(overlay, dict):
+        merged_dict = None
+        for item_key, item in overlay.items():
+            value = base.get(item_key)
+            merged_value = merge_oobjects(value, item, "{}.{}".format(key, item_key))
+            if merged_value is not value:
+                if merged_dict is None:
+                    merged_dict = base.copy()
+                merged_dict[item_key] = merged_value
+        return base if merged_dict is None else merged_dict
+
+    if base != overlay:
+        raise AssertionError("{}: {} != {}".format(key, base, overlay))
+    return base
+
+
+def _is_unset(value: Any) -> bool:
+    """Whether the value sets nothing, for `merge_oobjects`."""
+    return value is None or (value.__class__ in (str, list, dict) and not value)
+
+
+def _compile_yamlable_serializer(clazz: type) -> Callable[[Any, bool, Optional[str]], Dict]:
+    """
+    Compile the shallow `yaml`-able serializer for the OObject class, from its fields. The key names, the rules for
+    which (falsy) values are skipped and the special cases for some of the fields are all resolved here, once per class,
+    so the serializer only has the values to deal with. The OObjects, lists and dicts that the values hold are left as
+    `DeferredYamlable`s, for `yamlable_object` to get to.
+
+    The dict-like OObjects, with their field names only known per instance, use `_generic_yamlable_serializer`. Both
+    give the same output.
+    """
+    if any("__dict__" in vars(base) for base in clazz.__mro__):
+        return _generic_yamlable_serializer
+
+    lines = ["def serializer(self, sort, opt_key):", "    _repr = {}"]
+    for key in _slot_names(clazz):
+        if key.startswith("x_"):
+            continue
+        key2 = openapi_keyname(key)
+
+        if key2 == "parameters" and clazz in (PathItem, Operation):
+            convert = "[_defer(e, sort, f'{opt_key}.parameters') for e in value]"
+        elif key2 == "responses" and clazz is Components:
+            convert = "{k3: _defer(v3, False, f'{opt_key}.responses') for k3, v3 in value.items()}"
+        elif key2 == "examples":
+            convert = "{k3: _defer(v3, False, f'{opt_key}.examples') for k3, v3 in value.items()}"
+        elif key2 == "paths":
+            convert = "{uri: _defer(pi, False, f'{opt_key}.{uri}') for uri, pi in value._paths}"
+        elif key2 == "schemas":
+            convert = "_defer(value, True, f'{opt_key}.schemas')"
+        else:
+            convert = (
+                f"value if value.__class__ in _SCALARS else _defer(value, sort, f'{{opt_key}}.{key}') "
+                f"if isinstance(value, OObject) else _defer(value, False, f'{{opt_key}}.{key2}')"
+            )
+
+        skip_false = key == "deprecated" or (clazz.__qualname__ == "Schema" and key2 in _SCHEMA_FALSE_KEYS)
+        lines += [
+            "    try:",
+            f"        value = self.{key}",
+            "    except AttributeError:",
+            "        pass",
+            "    else:",
+            "        if value is True:" if skip_false else "        if value is True or value is False:",
+            f"            _repr[{key2!r}] = value",
+            "        elif value:",
+            f"            _repr[{key2!r}] = {convert}",
+        ]
+        if key == "security" and clazz.__qualname__ == "Operation":
+            # An empty list has special meaning for these.
+            lines += ["        elif value == []:", f"            _repr[{key2!r}] = []"]
+
+    lines += ["    if sort:", "        _repr = dict(sorted(_repr.items()))", "    return _repr"]
+
+    namespace: Dict[str, Any] = {"OObject": OObject, "_defer": DeferredYamlable, "_SCALARS": _SCALARS}
+    code = compile("\n".join(lines), f"<yamlable serializer for {clazz.__qualname__}>", "exec")
+    exec(code, namespace)  # pylint: disable=exec-used
+    return namespace["serializer"]
+
+
+def _generic_yamlable_serializer(  # pylint: disable=too-many-branches
+    self: OObject, sort: bool, opt_key: Optional[str]
+) -> Dict:
+    _repr = {}
+
+    for key, value in self._fields():  # pylint: disable=protected-access
+        key2 = openapi_keyname(key)
+
+        # Schema classes have many keys with bool where their default is false. Don't send them out.
+        if self.__class__.__qualname__ == "Schema" and value is False and key2 in _SCHEMA_FALSE_KEYS:
+            continue
+
+        # Allow False bools, but not other falsy values - UNLESS:
+        #   1: self is a SecurityRequirement
+        #   2: self is an Operation and key is security
+        # as an empty list has special meaning for these.
+        if (value is not False) and (not value):
+            if value == [] and self.__class__.__qualname__ == "SecurityRequirement":
+                pass
+            elif value == [] and key == "security" and self.__class__.__qualname__ == "Operation":
+                pass
+            else:
+                continue
+        if key.startswith("x_"):
+            continue
+        if key == "deprecated" and value is False:
+            # By default, items in specs are `deprecated: false` - these are not desirable in the specs
+            continue
+
+        value2: Union[Dict, List, bool, DeferredYamlable]
+        if value is False or value is True:
+            value2 = value
+
+        ############################################################################################################
+        # List of yamlable objects for element in value
+        elif key2 == "parameters" and self.__class__ in (PathItem, Operation):
+            value2 = [DeferredYamlable(e, sort, f"{opt_key}.{key2}") for e in value]
+
+        ############################################################################################################
+        # dicts of yamlable objects for items() value
+        elif key2 == "responses" and self.__class__ == Components:
+            value2 = {key3: DeferredYamlable(value3, False, f"{opt_key}.{key2}") for key3, value3 in value.items()}
+
+        elif key2 == "examples":
+            value2 = {key3: DeferredYamlable(value3, False, f"{opt_key}.{key2}") for key3, value3 in value.items()}
+        ############################################################################################################
+        # paths are a special case
+        elif key2 == "paths":
+            value2 = {
+                uri: DeferredYamlable(path_item, False, f"{opt_key}.{uri}")
+                for uri, path_item in value._paths  # pylint: disable=protected-access
+            }
+        ############################################################################################################
+        # sort the schemas
+        elif key2 == "schemas":
+            # Everyone wants sorted schema entries!
+            value2 = DeferredYamlable(value, True, f"{opt_key}.{key2}")
+        ############################################################################################################
+        # default - for known OObjects
+        elif isinstance(value, OObject):
+            value2 = DeferredYamlable(value, sort, f"{opt_key}.{key}")
+        else:
+            value2 = DeferredYamlable(value, False, f"{opt_key}.{key2}")
+
+        _repr[key2] = value2
+
+    if sort:
+        # Note: py36 does not have any (eternally dependable) ordering for dicts, but py37+
+        # remembers insert-order.
+        _repr = {key: value for key, value in sorted(_repr.items())}  # pylint: disable=unnecessary-comprehension
+
+    return _repr
 
 
 # --------------------------------------------------------------- #
@@ -288,6 +723,8 @@ class OObject:
 class OType(OObject):
     """A sanic_openapi3e class to hold OpenAPI types. Internal."""
 
+    __slots__ = ()
+
     name: str = "otype"
     formats: List[str] = []
 
@@ -298,6 +735,8 @@ class OType(OObject):
 class Contact(OObject):
     """Contact information for the exposed API."""
 
+    __slots__ = ("name", "url", "email")
+
     def __init__(
         self, name: Optional[str] = None, url: Optional[str] = None, email: Optional[str] = None,
     ):
@@ -325,6 +764,8 @@ class Contact(OObject):
 class License(OObject):
     """License information for the exposed API."""
 
+    __slots__ = ("name", "url")
+
     def __init__(self, name: str, url: Optional[str] = None):
         """
         License information for the exposed API.
@@ -350,6 +791,8 @@ class Info(OObject):
     presented in editing or documentation generation tools for convenience.
     """
 
+    __slots__ = ("title", "version", "description", "terms_of_service", "contact", "license")
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         title: str,
@@ -412,6 +855,8 @@ class Info(OObject):
 class ServerVariable(OObject):
     """An object representing a Server Variable for server URL template substitution."""
 
+    __slots__ = ("enum", "default", "description")
+
     def __init__(self, default: str, enum: List[str] = None, description: Optional[str] = None):
         """
         An object representing a Server Variable for server URL template substitution.
@@ -455,6 +900,8 @@ class ServerVariable(OObject):
 class Server(OObject):
     """An object representing a Server."""
 
+    __slots__ = ("url", "description", "variables")
+
     def __init__(
         self, url: str, description: Optional[str] = None, variables: Optional[Dict[str, ServerVariable]] = None,
     ):
@@ -505,6 +952,8 @@ class Reference(OObject):
     by the JSON Schema specification.
     """
 
+    __slots__ = ("dollar_ref",)
+
     def __init__(self, _ref: str):
         """
         A simple object to allow referencing other components in the specification, internally and externally.
@@ -536,6 +985,8 @@ class Discriminator(OObject):
     Note: in sanic_openapi3e, this object is not well tested.
     """
 
+    __slots__ = ("property_name", "mapping")
+
     def __init__(self, property_name: str, mapping: Optional[Dict[str, str]] = None):
         """
         When request bodies or response payloads may be one of a number of different schemas, a discriminator object can
@@ -575,6 +1026,8 @@ class XML(OObject):
     used to add that information. See examples for expected behavior.
     """
 
+    __slots__ = ("name", "namespace", "prefix", "attribute", "wrapped")
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         name: Optional[str] = None,
@@ -638,6 +1091,8 @@ class XML(OObject):
 class ExternalDocumentation(OObject):
     """Allows referencing an external resource for extended documentation."""
 
+    __slots__ = ("description", "url")
+
     def __init__(self, url: str, description: Optional[str] = None):
         """
         Allows referencing an external resource for extended documentation.
@@ -669,6 +1124,8 @@ class Example(OObject):
     implementations MAY choose to validate compatibility automatically, and reject the example value(s) if incompatible.
     """
 
+    __slots__ = ("summary", "description", "value", "external_value")
+
     def __init__(
         self,
         summary: Optional[str] = None,
@@ -732,6 +1189,20 @@ class Header(OObject):  # pylint: disable=too-many-instance-attributes
     - All traits that are affected by the location MUST be applicable to a location of header (for example, style).
     """
 
+    __slots__ = (
+        "description",
+        "required",
+        "deprecated",
+        "allow_empty_value",
+        "style",
+        "explode",
+        "allow_reserved",
+        "schema",
+        "example",
+        "examples",
+        "content",
+    )
+
     def __init__(  # pylint: disable=too-many-arguments, too-many-locals
         self,
         description: Optional[str] = None,
@@ -785,38 +1256,41 @@ class Header(OObject):  # pylint: disable=too-many-instance-attributes
             describes it. The map MUST only contain one entry.
         """
 
-        _assert_type(description, (str,), "description", self.__class__)
-        _assert_type(required, (bool,), "required", self.__class__)
-        _assert_type(deprecated, (bool,), "deprecated", self.__class__)
-        _assert_type(allow_empty_value, (bool,), "allow_empty_value", self.__class__)
-        _assert_type(style, (str,), "style", self.__class__)
-        _assert_type(explode, (bool,), "explode", self.__class__)
-        _assert_type(allow_reserved, (bool,), "allow_reserved", self.__class__)
-        _assert_type(schema, (Schema, Reference), "schema", self.__class__)
-        # Note: examples is specified to be "Any"
-        _assert_type(examples, (dict,), "examples", self.__class__)
-        _assert_type(content, (dict,), "content", self.__class__)
-
-        # Validations.
-        assert not (example and examples)
-        if examples:
-            for ex_name, ex in examples.items():
-                if not isinstance(ex, (Example, Reference)):
-                    raise AssertionError(
-                        "For `{}.examples`, values must be an `Example` or a `Reference`. For {} it is a {}".format(
-                            self.__class__.__qualname__, ex_name, type(ex)
+        if _VALIDATING:
+            _assert_type(description, (str,), "description", self.__class__)
+            _assert_type(required, (bool,), "required", self.__class__)
+            _assert_type(deprecated, (bool,), "deprecated", self.__class__)
+            _assert_type(allow_empty_value, (bool,), "allow_empty_value", self.__class__)
+            _assert_type(style, (str,), "style", self.__class__)
+            _assert_type(explode, (bool,), "explode", self.__class__)
+            _assert_type(allow_reserved, (bool,), "allow_reserved", self.__class__)
+            _assert_type(schema, (Schema, Reference), "schema", self.__class__)
+            # Note: examples is specified to be "Any"
+            _assert_type(examples, (dict,), "examples", self.__class__)
+            _assert_type(content, (dict,), "content", self.__class__)
+
+            # Validations.
+            assert not (example and examples)
+            if examples:
+                for ex_name, ex in examples.items():
+                    if not isinstance(ex, (Example, Reference)):
+                        raise AssertionError(
+                            "For `{}.examples`, values must be an `Example` or a `Reference`. For {} it is a {}".format(
+                                self.__class__.__qualname__, ex_name, type(ex)
+                            )
                         )
+            if content:
+                if len(list(content.values())) != 1:
+                    raise AssertionError(
+                        "For `{}.content` MUST only contain one entry".format(self.__class__.__qualname__)
                     )
-        if content:
-            if len(list(content.values())) != 1:
-                raise AssertionError("For `{}.content` MUST only contain one entry".format(self.__class__.__qualname__))
-            for c_name, media_type in content.items():
-                if not isinstance(media_type, MediaType):
-                    raise TypeError(
-                        "For `{}.content`, values must be a `MediaType`. For {} it is a {}".format(
-                            self.__class__.__qualname__, c_name, type(media_type)
+                for c_name, media_type in content.items():
+                    if not isinstance(media_type, MediaType):
+                        raise TypeError(
+                            "For `{}.content`, values must be a `MediaType`. For {} it is a {}".format(
+                                self.__class__.__qualname__, c_name, type(media_type)
+                            )
                         )
-                    )
 
         # Assignments and docs
         self.description = description
@@ -889,6 +1363,8 @@ class Header(OObject):  # pylint: disable=too-many-instance-attributes
 class Encoding(OObject):
     """A single encoding definition applied to a single schema property."""
 
+    __slots__ = ("content_type", "headers", "explode", "allow_reserved")
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         content_type: Optional[str] = None,
@@ -983,6 +1459,8 @@ class Encoding(OObject):
 class MediaType(OObject):
     """Each Media Type Object provides schema and examples for the media type identified by its key."""
 
+    __slots__ = ("schema", "example", "examples", "encoding")
+
     def __init__(
         self,
         schema: Optional[Union["Schema", Reference]] = None,
@@ -1006,29 +1484,29 @@ class MediaType(OObject):
             media type is multipart or application/x-www-form-urlencoded.
 
         """
-        _assert_type(schema, (Schema, Reference), "schema", self.__class__)
-        # Note: example is specified as "Any"
-        _assert_type(examples, (dict,), "examples", self.__class__)
-        _assert_type(encoding, (dict,), "encoding", self.__class__)
-
-        # validations
-        assert not (example and examples)
-        if examples:
-            for ex_name, ex in examples.items():
-                if not isinstance(ex, (Example, Reference)):
-                    raise AssertionError(
-                        "For `{}.examples, values should be an `Example` or a `Reference`. For {} it is a {}".format(
-                            self.__class__.__qualname__, ex_name, ex
+        if _VALIDATING:
+            _assert_type(schema, (Schema, Reference), "schema", self.__class__)
+            # Note: example is specified as "Any"
+            _assert_type(examples, (dict,), "examples", self.__class__)
+            _assert_type(encoding, (dict,), "encoding", self.__class__)
+
+            # validations
+            assert not (example and examples)
+            if examples:
+                for ex_name, ex in examples.items():
+                    if not isinstance(ex, (Example, Reference)):
+                        raise AssertionError(
+                            "For `{}.examples, values should be an `Example` or a `Reference`. "
+                            "For {} it is a {}".format(self.__class__.__qualname__, ex_name, ex)
                         )
-                    )
-        if encoding:
-            for e_name, enc in encoding.items():
-                if not isinstance(enc, Encoding):
-                    raise AssertionError(
-                        "For `{}.encoding, values should be an `Encoding`. For {} it is a {}".format(
-                            self.__class__.__qualname__, e_name, type(enc)
+            if encoding:
+                for e_name, enc in encoding.items():
+                    if not isinstance(enc, Encoding):
+                        raise AssertionError(
+                            "For `{}.encoding, values should be an `Encoding`. For {} it is a {}".format(
+                                self.__class__.__qualname__, e_name, type(enc)
+                            )
                         )
-                    )
 
         # Assignment and Docs
         if not schema:
@@ -1119,6 +1597,45 @@ class Schema(OObject):  # pylint: disable=too-many-instance-attributes
     unsupported.
     """
 
+    __slots__ = (
+        "title",
+        "multiple_of",
+        "maximum",
+        "exclusive_maximum",
+        "minimum",
+        "exclusive_minimum",
+        "max_length",
+        "min_length",
+        "pattern",
+        "max_items",
+        "min_items",
+        "unique_items",
+        "max_properties",
+        "min_properties",
+        "required",
+        "enum",
+        "_type",
+        "all_of",
+        "one_of",
+        "any_of",
+        "_not",
+        "items",
+        "properties",
+        "additional_properties",
+        "description",
+        "_format",
+        "default",
+        "nullable",
+        "discriminator",
+        "read_only",
+        "write_only",
+        "xml",
+        "external_docs",
+        "example",
+        "deprecated",
+        "x_frozen",
+    )
+
     Integer = None  # type: Schema
     """A pre-defined Integer Schema. Very simple, no properties other than `format` of `int64`."""
 
@@ -1341,87 +1858,90 @@ class Schema(OObject):  # pylint: disable=too-many-instance-attributes
         :param x_frozen: Specifies that no modifications should be applied to this instance. Default is false.
         """
 
-        # JSON Schema definition
-        _assert_type(title, (str,), "title", self.__class__)
-        _assert_type(multiple_of, (int,), "multiple_of", self.__class__)
-        _assert_type(maximum, (int, float), "maximum", self.__class__)
-        _assert_type(exclusive_maximum, (bool,), "exclusive_maximum", self.__class__)
-        _assert_type(minimum, (int, float), "minimum", self.__class__)
-        _assert_type(exclusive_minimum, (bool,), "exclusive_minimum", self.__class__)
-        _assert_type(max_length, (int,), "max_length", self.__class__)
-        _assert_type(min_length, (int,), "min_length", self.__class__)
-        _assert_type(pattern, (str,), "pattern", self.__class__)
-        _assert_type(max_items, (int,), "max_items", self.__class__)
-        _assert_type(min_items, (int,), "min_items", self.__class__)
-        _assert_type(unique_items, (bool,), "unique_items", self.__class__)
-        _assert_type(max_properties, (int,), "max_properties", self.__class__)
-        _assert_type(min_properties, (int,), "min_properties", self.__class__)
-        _assert_type(required, (list,), "required", self.__class__)
-        _assert_type(enum, (list,), "enum", self.__class__)
-
-        # JSON Schema definition but their definitions were adjusted to the OpenAPI Specification.
-        if not any((all_of, one_of, any_of, _not)):
-            _assert_type(_type, (str,), "_type as no all_of, one_of, any_of, _not", self.__class__)
-        _assert_type(all_of, (list,), "all_of", self.__class__)
-        _assert_type(one_of, (list,), "one_of", self.__class__)
-        _assert_type(any_of, (list,), "any_of", self.__class__)
-        _assert_type(_not, (list,), "_not", self.__class__)
-        _assert_type(items, (Schema, Reference,), "items", self.__class__)
-        _assert_type(properties, (dict,), "properties", self.__class__)
-        _assert_type(
-            additional_properties, (bool, Schema, Reference), "additional_properties", self.__class__,
-        )
-        _assert_type(description, (str,), "description", self.__class__)
-        _assert_type(_format, (str,), "_format", self.__class__)
-        _assert_type(default, (str, int, float, bool), "default", self.__class__)
-
-        # The OAS extensions
-        _assert_type(nullable, (bool,), "nullable", self.__class__)
-        _assert_type(discriminator, (Discriminator,), "discriminator", self.__class__)
-        _assert_type(read_only, (bool,), "read_only", self.__class__)
-        _assert_type(write_only, (bool,), "write_only", self.__class__)
-        _assert_type(xml, (XML,), "xml", self.__class__)
-        _assert_type(external_docs, (ExternalDocumentation,), "external_docs", self.__class__)
-        # Note: example is defined to have the type `Any`
-        _assert_type(deprecated, (bool,), "deprecated", self.__class__)
-        _assert_strictly_greater_than_zero(multiple_of, "multiple_of", self.__class__)
-        _assert_strictly_greater_than_zero(max_length, "max_length", self.__class__)
-        _assert_strictly_greater_than_zero(min_length, "min_length", self.__class__)
-        _assert_strictly_greater_than_zero(max_items, "max_items", self.__class__)
-        _assert_strictly_greater_than_zero(min_properties, "min_properties", self.__class__)
-
-        if required is not None:
-            assert required, "MUST have at least one element."
-            assert set(type(e) for e in required) == {
-                type("str")
-            }, "For `{}.required`, all elements MUST be strings.".format(self.__class__.__qualname__)
-            assert len(set(required)) == len(required), "For `{}.required`, all elements MUST be unique.".format(
-                self.__class__.__qualname__
+        if _VALIDATING:
+            # JSON Schema definition
+            _assert_type(title, (str,), "title", self.__class__)
+            _assert_type(multiple_of, (int,), "multiple_of", self.__class__)
+            _assert_type(maximum, (int, float), "maximum", self.__class__)
+            _assert_type(exclusive_maximum, (bool,), "exclusive_maximum", self.__class__)
+            _assert_type(minimum, (int, float), "minimum", self.__class__)
+            _assert_type(exclusive_minimum, (bool,), "exclusive_minimum", self.__class__)
+            _assert_type(max_length, (int,), "max_length", self.__class__)
+            _assert_type(min_length, (int,), "min_length", self.__class__)
+            _assert_type(pattern, (str,), "pattern", self.__class__)
+            _assert_type(max_items, (int,), "max_items", self.__class__)
+            _assert_type(min_items, (int,), "min_items", self.__class__)
+            _assert_type(unique_items, (bool,), "unique_items", self.__class__)
+            _assert_type(max_properties, (int,), "max_properties", self.__class__)
+            _assert_type(min_properties, (int,), "min_properties", self.__class__)
+            _assert_type(required, (list,), "required", self.__class__)
+            _assert_type(enum, (list,), "enum", self.__class__)
+
+            # JSON Schema definition but their definitions were adjusted to the OpenAPI Specification.
+            if not any((all_of, one_of, any_of, _not)):
+                _assert_type(_type, (str,), "_type as no all_of, one_of, any_of, _not", self.__class__)
+            _assert_type(all_of, (list,), "all_of", self.__class__)
+            _assert_type(one_of, (list,), "one_of", self.__class__)
+            _assert_type(any_of, (list,), "any_of", self.__class__)
+            _assert_type(_not, (list,), "_not", self.__class__)
+            _assert_type(items, (Schema, Reference,), "items", self.__class__)
+            _assert_type(properties, (dict,), "properties", self.__class__)
+            _assert_type(
+                additional_properties, (bool, Schema, Reference), "additional_properties", self.__class__,
             )
-        # if enum:
-        #     if not len(enum):
-        #         logger.warning(
-        #             "`{}.enum` SHOULD have at least one element. {}".format(
-        #                 self.__class__.__qualname__, self
-        #             )
-        #         )
-        if _type == "array":
-            _assert_required(items, "items", self.__class__, " as `type=array`.")
+            _assert_type(description, (str,), "description", self.__class__)
+            _assert_type(_format, (str,), "_format", self.__class__)
+            _assert_type(default, (str, int, float, bool), "default", self.__class__)
+
+            # The OAS extensions
+            _assert_type(nullable, (bool,), "nullable", self.__class__)
+            _assert_type(discriminator, (Discriminator,), "discriminator", self.__class__)
+            _assert_type(read_only, (bool,), "read_only", self.__class__)
+            _assert_type(write_only, (bool,), "write_only", self.__class__)
+            _assert_type(xml, (XML,), "xml", self.__class__)
+            _assert_type(external_docs, (ExternalDocumentation,), "external_docs", self.__class__)
+            # Note: example is defined to have the type `Any`
+            _assert_type(deprecated, (bool,), "deprecated", self.__class__)
+            _assert_strictly_greater_than_zero(multiple_of, "multiple_of", self.__class__)
+            _assert_strictly_greater_than_zero(max_length, "max_length", self.__class__)
+            _assert_strictly_greater_than_zero(min_length, "min_length", self.__class__)
+            _assert_strictly_greater_than_zero(max_items, "max_items", self.__class__)
+            _assert_strictly_greater_than_zero(min_properties, "min_properties", self.__class__)
+
+            if required is not None:
+                assert required, "MUST have at least one element."
+                assert set(type(e) for e in required) == {
+                    type("str")
+                }, "For `{}.required`, all elements MUST be strings.".format(self.__class__.__qualname__)
+                assert len(set(required)) == len(required), "For `{}.required`, all elements MUST be unique.".format(
+                    self.__class__.__qualname__
+                )
+            # if enum:
+            #     if not len(enum):
+            #         logger.warning(
+            #             "`{}.enum` SHOULD have at least one element. {}".format(
+            #                 self.__class__.__qualname__, self
+            #             )
+            #         )
+            if _type == "array":
+                _assert_required(items, "items", self.__class__, " as `type=array`.")
+
+            if properties is not None:
+                for property_name, property_value in properties.items():
+                    _assert_type(property_name, (str,), "properties.{} name".format(property_name), self.__class__)
+                    _assert_type(
+                        property_value, (Schema, Reference), "properties.{}".format(property_name), self.__class__
+                    )
+
+            for attr, attr_name in ((all_of, "all_of"), (one_of, "one_of"), (any_of, "any_of"), (_not, "_not")):
+                if attr:
+                    for idx, element in enumerate(attr):
+                        _assert_type(element, (Schema, Reference), "{}#{}".format(attr_name, idx), self.__class__)
 
         if additional_properties is None:
             if _type == "object":
                 additional_properties = True
 
-        if properties is not None:
-            for property_name, property_value in properties.items():
-                _assert_type(property_name, (str,), "properties.{} name".format(property_name), self.__class__)
-                _assert_type(property_value, (Schema, Reference), "properties.{}".format(property_name), self.__class__)
-
-        for attr, attr_name in ((all_of, "all_of"), (one_of, "one_of"), (any_of, "any_of"), (_not, "_not")):
-            if attr:
-                for idx, element in enumerate(attr):
-                    _assert_type(element, (Schema, Reference), "{}#{}".format(attr_name, idx), self.__class__)
-
         #  Assignment and docs
         self.title = title
         """
@@ -1710,6 +2230,21 @@ class Schema(OObject):  # pylint: disable=too-many-instance-attributes
         _clone.x_frozen = False
         return _clone
 
+    def freeze(self) -> None:
+        self.x_frozen = True
+        super().freeze()
+
+    def intern(self) -> "Schema":
+        """
+        The canonical instance of this schema: a frozen `Schema` that is shared by all of the structurally equal
+        schemas that are interned. This schema is never modified: unless it is frozen, and the schemas within it are
+        already interned, a frozen copy is interned instead. Any schemas within it, like its `items` or `properties`,
+        are interned too. Schemas holding values that cannot be compared structurally are not interned, and are
+        returned as-is.
+        """
+        canonical = _intern_schema(self)
+        return self if canonical is None else canonical
+
     @classmethod
     def get_enum_type(cls, enum: List) -> str:
         _assert_type(enum, (list,), "enum", cls)
@@ -1747,6 +2282,124 @@ Schema.Numbers = Schema(_type="array", items=Schema.Number, x_frozen=True)
 Schema.Strings = Schema(_type="array", items=Schema.String, x_frozen=True)
 Schema.Object = Schema(_type="object", additional_properties=True, x_frozen=True)
 
+_INTERNED_SCHEMAS: Dict[Tuple, Schema] = {}
+"""The canonical, frozen, schemas that `Schema.intern` has made, keyed by their structure."""
+
+_INTERN_SCHEMAS = False
+"""Whether the schemas given to, or made by, `doc.parameter` are interned. See `intern_schemas`."""
+
+
+def intern_schemas(enabled: bool = True) -> None:
+    """
+    Opt in (or back out) of interning the schemas of the `doc.parameter` decorators, so that all of the parameters with
+    structurally equal schemas, like the many `Schema(_type="integer", _format="int32", minimum=1)` or the same
+    `choices`, share one frozen `Schema`. Call it before the app's modules with the decorators are imported.
+
+    The schemas passed in are not modified: a frozen copy is shared instead.
+    """
+    global _INTERN_SCHEMAS  # pylint: disable=global-statement
+    _INTERN_SCHEMAS = enabled
+
+
+def interning_schemas() -> bool:
+    return _INTERN_SCHEMAS
+
+
+def _intern_schema(schema: Schema, visiting: Optional[Set[int]] = None) -> Optional[Schema]:
+    """
+    The canonical instance of the schema, see `Schema.intern`, or `None` when it cannot be interned.
+
+    :param visiting: The ids of the values that the schema is within, while their keys are made: a schema that is found
+        within itself, like one that is one of its own `properties`, is not interned.
+    """
+    visiting = set() if visiting is None else visiting
+    if id(schema) in visiting:
+        return None
+    visiting.add(id(schema))
+    try:
+        _key = tuple(
+            (name, _structural_key(value, visiting))
+            for name, value in schema._fields()  # pylint: disable=protected-access
+            if name != "x_frozen"
+        )
+    except TypeError:
+        return None
+    finally:
+        visiting.discard(id(schema))
+
+    canonical = _INTERNED_SCHEMAS.get(_key)
+    if canonical is None:
+        interned_fields = {
+            name: _interned_values(value)
+            for name, value in schema._fields()  # pylint: disable=protected-access
+            if isinstance(value, (Schema, list, dict))
+        }
+        if schema.x_frozen and all(value is getattr(schema, name) for name, value in interned_fields.items()):
+            # A frozen schema that already holds only interned schemas can be shared as it is.
+            canonical = schema
+        else:
+            # Otherwise, it is the copy, and never the schema passed in, that is modified and shared.
+            canonical = copy.copy(schema)
+            for name, value in interned_fields.items():
+                setattr(canonical, name, value)
+            canonical.x_frozen = True
+        canonical = _INTERNED_SCHEMAS.setdefault(_key, canonical)
+    return canonical
+
+
+def _interned_values(value: Any) -> Any:
+    """The value with the schemas within it interned: the value itself if they all already were, else a new one."""
+    if isinstance(value, Schema):
+        return value.intern()
+    if isinstance(value, list):
+        elements = [_interned_values(element) for element in value]
+        return value if all(new is old for new, old in zip(elements, value)) else elements
+    if isinstance(value, dict):
+        items = {key: _interned_values(element) for key, element in value.items()}
+        return value if all(items[key] is element for key, element in value.items()) else items
+    return value
+
+
+def _structural_key(value: Any, visiting: Set[int]) -> Any:
+    """
+    A hashable key for the value, equal for values that are structurally equal and that are serialized the same way.
+    The type is part of the key, as `1`, `1.0` and `True` are equal and have the same hash, but are not serialized the
+    same way. Raises `TypeError` for values that cannot be compared structurally, or that are found within themselves.
+    """
+    if isinstance(value, Schema):
+        # Interned schemas are shared, so the canonical instance itself is the key.
+        canonical = _intern_schema(value, visiting)
+        if canonical is None:
+            raise TypeError(value)
+        return id(canonical)
+    if isinstance(value, (OObject, list, dict)):
+        if id(value) in visiting:
+            raise TypeError(value)
+        visiting.add(id(value))
+        try:
+            if isinstance(value, OObject):
+                fields = value._fields()  # pylint: disable=protected-access
+                return value.__class__, tuple((name, _structural_key(element, visiting)) for name, element in fields)
+            if isinstance(value, list):
+                return list, tuple(_structural_key(element, visiting) for element in value)
+            return dict, tuple((key, _structural_key(element, visiting)) for key, element in value.items())
+        finally:
+            visiting.discard(id(value))
+    hash(value)
+    return value.__class__, value
+
+
+for _schema in (
+    Schema.Integer,
+    Schema.Number,
+    Schema.String,
+    Schema.Integers,
+    Schema.Numbers,
+    Schema.Strings,
+    Schema.Object,
+):
+    _schema.intern()
+
 
 class Parameter(OObject):  # pylint: disable=too-many-instance-attributes
     """
@@ -1768,6 +2421,22 @@ class Parameter(OObject):  # pylint: disable=too-many-instance-attributes
     - cookie - Used to pass a specific cookie value to the API.
     """
 
+    __slots__ = (
+        "name",
+        "description",
+        "_in",
+        "required",
+        "deprecated",
+        "allow_empty_value",
+        "style",
+        "explode",
+        "allow_reserved",
+        "schema",
+        "example",
+        "examples",
+        "content",
+    )
+
     def __init__(  # pylint: disable=too-many-arguments, too-many-locals, too-many-statements
         self,
         name: str,
@@ -1850,54 +2519,60 @@ class Parameter(OObject):  # pylint: disable=too-many-instance-attributes
 
         """
 
-        _assert_type(name, (str,), "name", self.__class__)
-        _assert_type(_in, (str,), "_in", self.__class__)
-        _assert_type(description, (str,), "description", self.__class__)
-        _assert_type(required, (bool,), "required", self.__class__)
-        _assert_type(deprecated, (bool,), "deprecated", self.__class__)
-        _assert_type(allow_empty_value, (bool,), "allow_empty_value", self.__class__)
-        _assert_type(style, (str,), "style", self.__class__)
-        _assert_type(explode, (bool,), "explode", self.__class__)
-        _assert_type(allow_reserved, (bool,), "allow_reserved", self.__class__)
-        _assert_type(schema, (Schema, Reference), "schema", self.__class__)
-        # Note: examples is specified to be "Any"
-        _assert_type(examples, (dict,), "examples", self.__class__)
-        _assert_type(content, (MediaType,), "content", self.__class__)
-
-        # validations
-        _assert_required(name, "name", self.__class__)
-        if _in == "requestBody":
-            raise AssertionError(
-                """For `{}`, the OpenAPI spec requires a `@doc.requestBody` and not a `@doc.parameter`""".format(name)
-            )
-        if _in not in ("query", "header", "path", "cookie"):
-            raise AssertionError(
-                """`{}._in` must be one of ("query", "header", "path" or "cookie"), not `{}`""".format(
-                    self.__class__.__qualname__, _in
+        if _VALIDATING:
+            _assert_type(name, (str,), "name", self.__class__)
+            _assert_type(_in, (str,), "_in", self.__class__)
+            _assert_type(description, (str,), "description", self.__class__)
+            _assert_type(required, (bool,), "required", self.__class__)
+            _assert_type(deprecated, (bool,), "deprecated", self.__class__)
+            _assert_type(allow_empty_value, (bool,), "allow_empty_value", self.__class__)
+            _assert_type(style, (str,), "style", self.__class__)
+            _assert_type(explode, (bool,), "explode", self.__class__)
+            _assert_type(allow_reserved, (bool,), "allow_reserved", self.__class__)
+            _assert_type(schema, (Schema, Reference), "schema", self.__class__)
+            # Note: examples is specified to be "Any"
+            _assert_type(examples, (dict,), "examples", self.__class__)
+            _assert_type(content, (MediaType,), "content", self.__class__)
+
+            # validations
+            _assert_required(name, "name", self.__class__)
+            if _in == "requestBody":
+                raise AssertionError(
+                    """For `{}`, the OpenAPI spec requires a `@doc.requestBody` and not a `@doc.parameter`""".format(
+                        name
+                    )
                 )
-            )
-        if _in == "path":
-            assert required is True
-        else:
-            required = required or False
-
-        assert not (example and examples)
-        if examples:
-            for ex_name, ex in examples.items():
-                if not isinstance(ex, (Example, Reference)):
-                    raise AssertionError(
-                        "For `{}.examples`, values must be either an `Example` or a `Reference`. {} is a {}".format(
-                            self.__class__.__qualname__, ex_name, type(ex)
-                        )
+            if _in not in ("query", "header", "path", "cookie"):
+                raise AssertionError(
+                    """`{}._in` must be one of ("query", "header", "path" or "cookie"), not `{}`""".format(
+                        self.__class__.__qualname__, _in
                     )
-        if content:
-            if len(content) != 1:
-                raise AssertionError("For `{}.content` MUST only contain one entry".format(self.__class__.__qualname__))
-            for c_name, _media_type in content.items():
-                if not isinstance(c_name, MediaType):
+                )
+            if _in == "path":
+                assert required is True
+
+            assert not (example and examples)
+            if examples:
+                for ex_name, ex in examples.items():
+                    if not isinstance(ex, (Example, Reference)):
+                        raise AssertionError(
+                            "For `{}.examples`, values must be either an `Example` or a `Reference`. {} is a {}".format(
+                                self.__class__.__qualname__, ex_name, type(ex)
+                            )
+                        )
+            if content:
+                if len(content) != 1:
                     raise AssertionError(
-                        "For `{}.content`, the value must be a `MediaType`".format(self.__class__.__qualname__)
+                        "For `{}.content` MUST only contain one entry".format(self.__class__.__qualname__)
                     )
+                for c_name, _media_type in content.items():
+                    if not isinstance(c_name, MediaType):
+                        raise AssertionError(
+                            "For `{}.content`, the value must be a `MediaType`".format(self.__class__.__qualname__)
+                        )
+
+        if _in != "path":
+            required = required or False
 
         # Assignments and docs
         self.name = name
@@ -1923,7 +2598,7 @@ class Parameter(OObject):  # pylint: disable=too-many-instance-attributes
         A brief description of the parameter. This could contain examples of use. CommonMark syntax MAY be used for rich 
         text representation.
         """
-        self.required: bool = required
+        self.required: Optional[bool] = required
         """
         Determines whether this parameter is mandatory. If the parameter _in is "path", this property is REQUIRED 
         and its value MUST be true. Otherwise, the property MAY be included and its default value is false.
@@ -1992,42 +2667,11 @@ class Parameter(OObject):  # pylint: disable=too-many-instance-attributes
         """
 
     def __add__(self, other):
+        """
+        This parameter, with what the other one - like its `doc.parameter` annotation - adds. See `merge_oobjects`.
+        """
         assert isinstance(other, Parameter)
-        _d = {}
-        for key, value in self.__dict__.items():  # pylint: disable=too-many-nested-blocks
-            if value:
-                _d[key] = value
-                other_value = getattr(other, key)
-                if other_value and value != other_value:
-                    # TODO - this should be done recursively. Move __add__ up to OObject?
-                    # eg: schema:
-                    # Schema{"type": "integer"} != Schema{"format": "int32", "minimum": 4, "type": "integer"}
-                    if isinstance(other_value, Reference):
-                        # Simple replace.
-                        # TODO - check that the ref actually exists in the components.
-                        # TODO - check that the ref is compatible
-                        _d[key] = other_value
-
-                    elif isinstance(value, OObject):
-                        v_d = {}
-                        for v_k, v_v in value.__dict__.items():
-                            if v_v:
-                                v_d[v_k] = v_v
-                                v_ov = getattr(other_value, v_k)
-                                if v_ov:
-                                    assert v_v == v_ov, "{}.{}: {} != {}".format(key, v_k, v_v, v_ov)
-
-                            else:
-                                v_d[v_k] = getattr(other_value, v_k)
-                        # TODO: this use of globals is _OK_ but it would be nice to not need it.
-                        _d[key] = globals()[value.__class__.__qualname__](**v_d)
-
-                    else:
-                        raise AssertionError("{}: {} != {}".format(key, getattr(self, key), other_value))
-
-            else:
-                _d[key] = getattr(other, key)
-        return Parameter(**_d)
+        return merge_oobjects(self, other)
 
 
 class Link(OObject):
@@ -2043,6 +2687,8 @@ class Link(OObject):
     values in an operation and using them as parameters while invoking the linked operation.
     """
 
+    __slots__ = ("operation_ref", "operation_id", "parameters", "request_body", "description", "server")
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         operation_ref: Optional[str] = None,
@@ -2125,6 +2771,8 @@ class Response(OObject):
     response.
     """
 
+    __slots__ = ("description", "headers", "content", "links")
+
     # This is reset from None to a Response directly after the class definition.
     DEFAULT_SUCCESS = None  # type: Response
     BAD_REQUEST = None  # type: Response
@@ -2155,21 +2803,22 @@ class Response(OObject):
             applicable. e.g. ``text/plain`` overrides ``text/*``.
         :param links: A map of operations links that can be followed from the response. The key of the map is a short
         """
-        _assert_type(description, (str,), "description", self.__class__)
-        _assert_type(headers, (dict,), "headers", self.__class__)
-        _assert_type(content, (dict,), "content", self.__class__)
-        _assert_type(links, (dict,), "links", self.__class__)
-
-        _assert_required(description, "description", self.__class__)
-        if headers:
-            for _header_name, header_spec in headers.items():
-                assert isinstance(header_spec, (Header, Reference))
-        if content:
-            for _media_type_name, media_type_spec in content.items():
-                assert isinstance(media_type_spec, MediaType)
-        if links:
-            for _link_name, link_spec in links.items():
-                assert isinstance(link_spec, (Link, Reference))
+        if _VALIDATING:
+            _assert_type(description, (str,), "description", self.__class__)
+            _assert_type(headers, (dict,), "headers", self.__class__)
+            _assert_type(content, (dict,), "content", self.__class__)
+            _assert_type(links, (dict,), "links", self.__class__)
+
+            _assert_required(description, "description", self.__class__)
+            if headers:
+                for _header_name, header_spec in headers.items():
+                    assert isinstance(header_spec, (Header, Reference))
+            if content:
+                for _media_type_name, media_type_spec in content.items():
+                    assert isinstance(media_type_spec, MediaType)
+            if links:
+                for _link_name, link_spec in links.items():
+                    assert isinstance(link_spec, (Link, Reference))
 
         # Assignment and docs
         self.description = description
@@ -2205,11 +2854,27 @@ Response.NOT_FOUND = Response(description="Not Found")
 Response.METHOD_NOT_ALLOWED = Response(description="Method Not Allowed")
 Response.GONE = Response(description="Gone")
 Response.INTERNAL_SERVER_ERROR = Response(description="Internal Server Error")
+for _response in (
+    Response.DEFAULT_SUCCESS,
+    Response.BAD_REQUEST,
+    Response.UNAUTHORIZED,
+    Response.FORBIDDEN,
+    Response.NOT_FOUND,
+    Response.METHOD_NOT_ALLOWED,
+    Response.GONE,
+    Response.INTERNAL_SERVER_ERROR,
+):
+    _response.freeze()
+
+_TRUSTED_CLASSES = frozenset({Schema, Parameter, Response, Header, MediaType})
+"""The OObject classes whose constructors do not validate their arguments when trusted, see `trust_oobjects`."""
 
 
 class RequestBody(OObject):
     """Describes a single request body."""
 
+    __slots__ = ("description", "content", "required")
+
     def __init__(
         self, content: Dict[str, MediaType], description: Optional[str] = None, required: bool = False,
     ):
@@ -2257,6 +2922,8 @@ class OAuthFlow(OObject):
     (possibly) REQUIRED values are presented.
     """
 
+    __slots__ = ("authorization_url", "token_url", "refresh_url", "scopes")
+
     def __init__(
         self, authorization_url: str, token_url: str, scopes: Dict[str, str], refresh_url: Optional[str] = None,
     ):
@@ -2303,6 +2970,8 @@ class OAuthFlow(OObject):
 class OAuthFlows(OObject):
     """Allows configuration of the supported OAuth Flows."""
 
+    __slots__ = ("implicit", "password", "client_credentials", "authorization_code")
+
     def __init__(
         self,
         implicit: Optional[OAuthFlow] = None,
@@ -2344,6 +3013,8 @@ class SecurityScheme(OObject):  # pylint: disable=too-many-instance-attributes
     application and access code) as defined in RFC6749, and OpenID Connect Discovery.
     """
 
+    __slots__ = ("_type", "description", "name", "_in", "scheme", "bearer_format", "flows", "openid_connect_url")
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         _type: str,
@@ -2550,6 +3221,13 @@ class Responses(OObject):
         "500": Response.INTERNAL_SERVER_ERROR,
     }
 
+    DEFAULT = None  # type: Responses
+    """
+    The frozen `Responses` of the operations that do not document any of their own, with a `Reference` to each of the
+    `DEFAULT_RESPONSES`. As it is shared, it is replaced by `Responses()` of their own, rather than modified, when a
+    `doc.response` is added.
+    """
+
     # TODO - may need to reimplement the ``serialise`` and ``schema``.
     def __init__(self, responses: Optional[Dict[str, Union[Response, Reference]]] = None, no_defaults: bool = False):
         """
@@ -2592,16 +3270,12 @@ class Responses(OObject):
                 _init_responses = responses
             else:
                 # Start with references ...
-                _init_responses = {
-                    key: Reference("#/components/responses/{}".format(key)) for key in Responses.DEFAULT_RESPONSES
-                }
+                _init_responses = {key: _default_response_reference(key) for key in Responses.DEFAULT_RESPONSES}
                 for status_code, response in responses.items():
                     _init_responses[str(status_code)] = response
         else:
             # Use references
-            _init_responses = {
-                key: Reference("#/components/responses/{}".format(key)) for key in Responses.DEFAULT_RESPONSES
-            }
+            _init_responses = {key: _default_response_reference(key) for key in Responses.DEFAULT_RESPONSES}
         self.__dict__ = _init_responses
 
     @property
@@ -2609,6 +3283,7 @@ class Responses(OObject):
         return self.__dict__
 
     def __setitem__(self, key, item):
+        self._assert_not_frozen()
         self.__dict__[key] = item
 
     def __getitem__(self, key):
@@ -2621,9 +3296,11 @@ class Responses(OObject):
         return len(self.__dict__)
 
     def __delitem__(self, key):
+        self._assert_not_frozen()
         del self.__dict__[key]
 
     def clear(self):
+        self._assert_not_frozen()
         return self.__dict__.clear()
 
     def copy(self):
@@ -2633,6 +3310,7 @@ class Responses(OObject):
         return k in self.__dict__
 
     def update(self, *args, **kwargs):
+        self._assert_not_frozen()
         return self.__dict__.update(*args, **kwargs)
 
     def keys(self):
@@ -2645,6 +3323,7 @@ class Responses(OObject):
         return self.__dict__.items()
 
     def pop(self, *args):
+        self._assert_not_frozen()
         return self.__dict__.pop(*args)
 
     # def __cmp__(self, other):
@@ -2656,6 +3335,21 @@ class Responses(OObject):
     def __iter__(self):
         return iter(self.__dict__)
 
+    def _assert_not_frozen(self):
+        assert getattr(self, "_frozen_yamlable", None) is None, "Please do not modify frozen Responses: {}".format(self)
+
+
+@functools.lru_cache(maxsize=None)
+def _default_response_reference(status_code: str) -> Reference:
+    """The frozen `Reference` to the default response of the status code, shared by all of the `Responses`."""
+    reference = Reference("#/components/responses/{}".format(status_code))
+    reference.freeze()
+    return reference
+
+
+Responses.DEFAULT = Responses()
+Responses.DEFAULT.freeze()
+
 
 class Components(OObject):  # pylint: disable=too-many-instance-attributes
     """
@@ -2664,6 +3358,18 @@ class Components(OObject):  # pylint: disable=too-many-instance-attributes
     components object.
     """
 
+    __slots__ = (
+        "schemas",
+        "responses",
+        "parameters",
+        "examples",
+        "request_bodies",
+        "headers",
+        "security_schemes",
+        "links",
+        "callbacks",
+    )
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         schemas: Optional[Mapping[str, Union[Schema, Reference]]] = None,
@@ -2820,6 +3526,22 @@ class SecurityRequirement(OObject):  # pylint: disable=missing-function-docstrin
 class Operation(OObject):  # pylint: disable=too-many-instance-attributes
     """Describes a single API operation on a path."""
 
+    __slots__ = (
+        "tags",
+        "summary",
+        "description",
+        "external_docs",
+        "operation_id",
+        "parameters",
+        "request_body",
+        "responses",
+        "callbacks",
+        "deprecated",
+        "security",
+        "servers",
+        "x_handler_route",
+    )
+
     OPERATION_NAMES = frozenset(("get", "put", "post", "delete", "options", "head", "patch", "trace"))
 
     def __init__(  # pylint: disable=too-many-arguments
@@ -2961,6 +3683,8 @@ class Tag(OObject):
     defined in the Operation Object instances.
     """
 
+    __slots__ = ("name", "description", "external_docs")
+
     def __init__(
         self, name: str, description: Optional[str] = None, external_docs: Optional[ExternalDocumentation] = None,
     ):
@@ -3009,6 +3733,29 @@ class PathItem(OObject):  # pylint: disable=too-many-instance-attributes
     available.
     """
 
+    __slots__ = (
+        "dollar_ref",
+        "summary",
+        "description",
+        "get",
+        "put",
+        "post",
+        "delete",
+        "options",
+        "head",
+        "patch",
+        "trace",
+        "servers",
+        "parameters",
+        "request_body",
+        "x_tags_holder",
+        "x_security_holder",
+        "x_deprecated_holder",
+        "x_responses_holder",
+        "x_external_docs_holder",
+        "x_exclude",
+    )
+
     def __init__(  # pylint: disable=too-many-locals, too-many-arguments
         self,
         dollar_ref: Optional[str] = None,
@@ -3135,7 +3882,8 @@ class PathItem(OObject):  # pylint: disable=too-many-instance-attributes
         self.x_tags_holder: List[Tag] = x_tags_holder if x_tags_holder is not None else []
         self.x_security_holder = x_security_holder
         self.x_deprecated_holder = x_deprecated_holder
-        self.x_responses_holder = Responses(x_responses_holder)
+        # The shared default, unless there are responses of its own: it is copied on write, see `doc.response`.
+        self.x_responses_holder = Responses(x_responses_holder) if x_responses_holder else Responses.DEFAULT
         self.x_external_docs_holder = x_external_docs_holder
         self.x_exclude = x_exclude
 
@@ -3150,6 +3898,8 @@ class Paths(OObject):
     from the Server Object in order to construct the full URL. The Paths MAY be empty, due to ACL constraints.
     """
 
+    __slots__ = ("locked", "_paths", "_index")
+
     def __init__(self, path_items: Optional[List[Tuple[str, PathItem]]] = None):
         """
         Holds the relative endpoints to the individual endpoints and their operations. The path is appended to the URL
@@ -3167,9 +3917,16 @@ class Paths(OObject):
         templated names MUST NOT exist as they are identical. In case of ambiguous matching, it's up to the tooling to 
         decide which one to use.
         """
+        self._index: Dict[Any, int] = {}
+        """
+        The index into `_paths` of the first path item for each key, so that the (many) lookups, like those made by
+        every `doc` decorator, do not need to scan `_paths`.
+        """
         if path_items:
             self.locked = True
             self._paths = path_items
+            for idx, (_parsed_uri, _path_item) in enumerate(path_items):
+                self._index.setdefault(_parsed_uri, idx)
 
     def __len__(self):
         return len(self._paths)
@@ -3181,17 +3938,18 @@ class Paths(OObject):
         :param item: What to find.
         """
 
-        for _parsed_uri, path_item in self._paths:
-            if _parsed_uri == item:
-                return path_item
+        idx = self._index.get(item)
+        if idx is not None:
+            return self._paths[idx][1]
         if not self.locked:
             path_item = PathItem()
+            self._index[item] = len(self._paths)
             self._paths.append((item, path_item))
-            return self._paths[-1][1]
+            return path_item
         raise KeyError(item)
 
     def __contains__(self, item):
-        return any(_parsed_uri == item for _parsed_uri, _path_item in self._paths)
+        return item in self._index
 
     def __iter__(self):
         yield from self._paths
@@ -3199,12 +3957,10 @@ class Paths(OObject):
     def __setitem__(self, key, value):
 
         if not self.locked:
-            for idx, _ in enumerate(self._paths):
-                if self._paths[idx][0] == key:
-                    self._paths[idx] = (key, value)
-                    break
-            else:
+            idx = self._index.get(key)
+            if idx is None:
                 raise KeyError(key)
+            self._paths[idx] = (key, value)
         else:
             raise ValueError("locked")
 
@@ -3212,6 +3968,8 @@ class Paths(OObject):
 class OpenAPIv3(OObject):  # pylint: disable=too-many-instance-attributes
     """The root document object of the OpenAPI document."""
 
+    __slots__ = ("openapi", "info", "paths", "servers", "components", "security", "tags", "external_docs")
+
     version = "3.0.2"
 
     def __init__(  # pylint: disable=too-many-arguments
@@ -3305,6 +4063,5 @@ class OpenAPIv3(OObject):  # pylint: disable=too-many-instance-attributes
         """Additional external documentation."""
 
     def as_yamlable_object(self, sort=False, opt_key: Optional[str] = None):
-        # This one is here to allow mypy to accept that the root `yaml`-able object really is always a dict. That
-        # annotation is found near the top of `openapi.py`.
+        # This one is here to allow mypy to accept that the root `yaml`-able object really is always a dict.
         return super().as_yamlable_object(sort=False, opt_key=".")
@@ -8,8 +8,11 @@ Known limitations:
 * Parameters are documented at the PathItem level, not at the underlying Operation level.
 
 """
+import asyncio
 import copy
-import re
+import functools
+import mmap
+import os
 from collections import OrderedDict
 from itertools import repeat
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
@@ -19,8 +22,8 @@ import sanic.exceptions
 import sanic.request
 import sanic.response
 import sanic.router
-import yaml
 from sanic.blueprints import Blueprint
+from sanic.log import logger
 from sanic.views import CompositionView
 
 from .doc import (
@@ -43,6 +46,33 @@ from .doc import (
     endpoints,
 )
 from .doc import module_tags as doc_tags  # these originate in oas_types
+from .doc import parse_sanic_uri, trusting_oobjects, validate_oobjects
+from .prebuilt import (
+    cache_rendered_specs,
+    fingerprint_openapi_specs,
+    read_cached_specs,
+    read_rendered_specs,
+    write_rendered_specs,
+)
+from .rendering import (
+    DEFAULT_COMPRESSION_LEVEL,
+    IDENTITY,
+    RenderedSpec,
+    etag_matches,
+    negotiate_encoding,
+)
+from .state import (
+    DEFAULT_CACHE_CONTROL,
+    DEFAULT_RETRY_AFTER,
+    _ClassifiedOperation,
+    _ClassifiedPath,
+    _ClassifiedSpec,
+    _openapi_state,
+    _OpenAPIState,
+    _routes_added,
+    _SpecSources,
+    _track_routes,
+)
 from .swagger import blueprint as swagger_bp
 
 blueprint = Blueprint("openapi", url_prefix="openapi")
@@ -50,85 +80,366 @@ blueprint = Blueprint("openapi", url_prefix="openapi")
 NOT_YET_IMPLEMENTED = None
 DEFAULT_YAML_CONTENT_TYPE = "application/x-yaml"
 YAML_CONTENT_TYPE = "application/x-yaml"
+SPEC = "spec"
+UNCLOAKED = "uncloaked"
+ALL = "all"
 
+_FILE_NAMES = {SPEC: "spec", UNCLOAKED: "uncloaked", ALL: "spec.all"}
+"""The names of the prebuilt files of each variant, as in their routes. See `write_openapi_specs`."""
 
-_OPENAPI: Dict[str, Any] = {}
-"""
-Module-level container to hold the OAS spec that will be served-up on request. See `_build_openapi_spec` for how it is
-built. It does not contain `cloaked` nor `exclude`d endpoints.
-"""
 
-_OPENAPI_UNCLOAKED: Dict[str, Any] = {}
-"""
-Module-level container to hold the OAS spec that will be served-up on request. The difference with this one is that it
-contains `cloaked` but not `exclude`d endpoints.
-"""
+CAST_2_SCHEMA = {int: Schema.Integer, float: Schema.Number, str: Schema.String}
 
-_OPENAPI_ALL: Dict[str, Any] = {}
-"""
-Module-level container to hold the OAS spec that may be served-up on request. The difference with this one is that it 
-contains all endpoints, including `cloaked` and those marked as `exclude`d.
-"""
 
+@blueprint.listener("before_server_start")
+def build_openapi_spec(app: sanic.app.Sanic, loop: Optional[asyncio.AbstractEventLoop]):
+    global YAML_CONTENT_TYPE  # pylint: disable=global-statement
+    YAML_CONTENT_TYPE = app.config.get("OPENAPI_YAML_CONTENTTYPE", DEFAULT_YAML_CONTENT_TYPE)
+    state = _openapi_state(app)
+    state.cache_control = app.config.get("OPENAPI_CACHE_CONTROL", DEFAULT_CACHE_CONTROL)
+
+    state.retry_after = app.config.get("OPENAPI_RETRY_AFTER", DEFAULT_RETRY_AFTER)
+
+    state.build = state.update = None
+    if state.shared is not None:
+        # Already built, by `share_openapi_spec`, in the main process that this worker was forked from.
+        return
+    if app.config.get("OPENAPI_SHARE_SPECS", False):
+        logger.warning(
+            "OPENAPI_SHARE_SPECS is set, but the specs were not built by `share_openapi_spec` in the main process, and "
+            "so each worker builds its own. Call `sanic_openapi3e.openapi.share_openapi_spec(app, None)` just before "
+            "`app.run`, on a platform with shared memory maps (not Windows)."
+        )
+    lazy = app.config.get("OPENAPI_LAZY_VARIANTS", False)
+    if app.config.get("OPENAPI_BACKGROUND_BUILD", False):
+        # Built in a thread, rather than a process, as the app and its handlers are what the specs are built from. The
+        # server starts accepting connections meanwhile.
+        state.build = (loop or asyncio.get_event_loop()).run_in_executor(
+            None, _build_openapi_specs_in_background, app, lazy
+        )
+    else:
+        _build_openapi_specs(app, lazy=lazy)
 
-CAST_2_SCHEMA = {int: Schema.Integer, float: Schema.Number, str: Schema.String}
 
+def _build_openapi_specs_in_background(app: sanic.app.Sanic, lazy: bool):
+    """Build the specs, see `build_openapi_spec`. Should that fail, it is logged, here, once, and not per request."""
+    try:
+        _build_openapi_specs(app, lazy)
+    except Exception:
+        logger.exception("The OpenAPI specs could not be built.")
+        raise
 
-@blueprint.listener("before_server_start")
-def build_openapi_spec(app: sanic.app.Sanic, _):
+
+def is_openapi_spec_ready(app: sanic.app.Sanic) -> bool:
+    """Whether the specs of the app are built, and served. They are only not while they are built in the background."""
+    build = _openapi_state(app).build
+    return build is None or build.done()
+
+
+async def openapi_spec_ready(app: sanic.app.Sanic):
+    """
+    Wait until the specs of the app are built, and served, as for a readiness check. Should the build in the background
+    have failed, this raises what it failed with.
+    """
+    build = _openapi_state(app).build
+    if build is not None:
+        # Shielded, so that a check that times out does not cancel the build.
+        await asyncio.shield(build)
+
+
+def share_openapi_spec(app: sanic.app.Sanic, _):
+    """
+    With `app.config.OPENAPI_SHARE_SPECS`, build the specs once, in the main process, before the workers are forked
+    from it. The renderings are then moved into a shared memory map (see `RenderedSpec.share`) that every worker
+    inherits, and so neither the memory for the specs nor the time to build them grows with the number of workers.
+
+    It is not a listener, as sanic 20.12 has no `main_process_start` event: call it, as `share_openapi_spec(app, None)`,
+    just before `app.run`. Where it is not called, or where there are no shared memory maps, like on Windows, each
+    worker builds its own specs, as always, and warns about it.
+    """
+    if not app.config.get("OPENAPI_SHARE_SPECS", False) or not hasattr(mmap, "MAP_SHARED"):
+        return
+
+    state = _openapi_state(app)
+    _build_openapi_specs(app)
+    state.shared = RenderedSpec.share(state.rendered.values())
+
+    # Only the renderings are served, so the specs themselves are not kept for each of the workers to inherit (and,
+    # with their reference counts, to soon have copies of).
+    state.specs.clear()
+    state.sources = None
+
+
+def _build_openapi_specs(app: sanic.app.Sanic, lazy: bool = False):
+    show_excluded = app.config.get("SHOW_OPENAPI_EXCLUDED", False)
+    prebuilt_specs = app.config.get("OPENAPI_PREBUILT_SPECS")
+    cache_dir = app.config.get("OPENAPI_CACHE_DIR")
+    if prebuilt_specs:
+        _read_openapi_specs(app, prebuilt_specs, show_excluded)
+    elif cache_dir:
+        _cached_openapi_specs(app, cache_dir, show_excluded)
+    else:
+        _render_openapi_specs(app, show_excluded, lazy=lazy)
+
+
+def _render_openapi_specs(app: sanic.app.Sanic, show_excluded: bool, lazy: bool = False):
     hide_openapi_self = app.config.get("HIDE_OPENAPI_SELF", True)
     hide_sanic_static = app.config.get("HIDE_SANIC_STATIC", True)
-    show_excluded = app.config.get("SHOW_OPENAPI_EXCLUDED", False)
     show_unused_tags = app.config.get("SHOW_OPENAPI_UNUSED_TAGS", False)
     operation_id_fn = app.config.get("OPENAPI_OPERATION_ID_FN", default_operation_id_fn)
 
     assert callable(operation_id_fn), operation_id_fn
     cloak_fn = app.config.get("OPENAPI_CLOAK_FN")
-    global YAML_CONTENT_TYPE  # pylint: disable=global-statement
-    YAML_CONTENT_TYPE = app.config.get("OPENAPI_YAML_CONTENTTYPE", DEFAULT_YAML_CONTENT_TYPE)
-
-    openapi = _build_openapi_spec(
-        app,
-        operation_id_fn,
-        hide_openapi_self=hide_openapi_self,
-        hide_excluded=True,
-        show_unused_tags=show_unused_tags,
-        hide_sanic_static=hide_sanic_static,
-        cloak_fn=cloak_fn,
-        hide_cloaked=True,
-    )
-    global _OPENAPI  # pylint: disable=global-statement
-    _OPENAPI = openapi.as_yamlable_object()
-
-    openapi_uncloaked = _build_openapi_spec(
-        app,
-        operation_id_fn,
-        hide_openapi_self=hide_openapi_self,
-        hide_excluded=True,
-        show_unused_tags=False,
-        hide_sanic_static=False,
-        cloak_fn=cloak_fn,
-        hide_cloaked=False,
-    )
-    global _OPENAPI_UNCLOAKED  # pylint: disable=global-statement
-    _OPENAPI_UNCLOAKED = openapi_uncloaked.as_yamlable_object()
-
-    if show_excluded:
-        openapi_all = _build_openapi_spec(
-            app,
-            operation_id_fn,
+    compression_level = app.config.get("OPENAPI_COMPRESSION_LEVEL", DEFAULT_COMPRESSION_LEVEL)
+    processes = app.config.get("OPENAPI_BUILD_PROCESSES", 1)
+    validate = trusting_oobjects() and app.config.get("OPENAPI_VALIDATE_SPECS", True)
+    track_routes = app.config.get("OPENAPI_TRACK_ROUTES", False)
+    if track_routes:
+        _track_routes(app.router)
+        # Before the routes are walked, so that any that are added meanwhile are in the next update.
+        routes_added = _routes_added(app.router)
+        routes = dict(app.router.routes_all)
+
+    # The routes are walked, and each of their operations built and classified, only once for all of the variants.
+    classified = _classify_openapi_spec(app, operation_id_fn, hide_openapi_self=hide_openapi_self, cloak_fn=cloak_fn)
+    if validate:
+        # The trusted OObjects were not validated as they were made, so they all are now, in one go.
+        validate_oobjects(classified)
+
+    # Each variant is rendered a piece at a time, so that only the bytes, and not also the `yaml`-able form, of the
+    # whole spec are ever held.
+    state = _openapi_state(app)
+    state.rendered.clear()
+    state.specs.clear()
+    state.lazy_variants.clear()
+    state.lazy_builds.clear()
+    variants = {
+        SPEC: dict(
+            hide_excluded=True,
+            show_unused_tags=show_unused_tags,
+            hide_sanic_static=hide_sanic_static,
+            hide_cloaked=True,
+        ),
+        UNCLOAKED: dict(hide_excluded=True, show_unused_tags=False, hide_sanic_static=False, hide_cloaked=False),
+        ALL: dict(hide_excluded=False, show_unused_tags=True, hide_sanic_static=False, hide_cloaked=False),
+    }
+    if not show_excluded:
+        del variants[ALL]
+    for variant, settings in variants.items():
+        if lazy and variant != SPEC:
+            # Built on their first request, see `_rendered_variant`.
+            state.lazy_variants[variant] = functools.partial(
+                _render_openapi_variant,
+                state,
+                variant,
+                classified,
+                compression_level,
+                processes,
+                track_routes,
+                **settings,
+            )
+        else:
+            _render_openapi_variant(state, variant, classified, compression_level, processes, track_routes, **settings)
+
+    state.sources = None
+    if track_routes:
+        state.sources = _SpecSources(
+            routes=routes,
+            routes_added=routes_added,
+            classified=classified,
             hide_openapi_self=hide_openapi_self,
-            hide_excluded=False,
-            show_unused_tags=True,
-            hide_sanic_static=False,
-            cloak_fn=None,
-            hide_cloaked=False,
+            operation_id_fn=operation_id_fn,
+            cloak_fn=cloak_fn,
+            compression_level=compression_level,
+            processes=processes,
+            variants=variants,
+            validate=validate,
         )
-        global _OPENAPI_ALL  # pylint: disable=global-statement
-        _OPENAPI_ALL = openapi_all.as_yamlable_object()
 
 
-def _build_openapi_spec(  # pylint: disable=too-many-arguments, too-many-locals
+def _update_openapi_specs(app: sanic.app.Sanic):
+    """
+    Bring the specs up to date with the app's routes, as with routes that were added, or blueprints that were
+    registered, after the server started. Only the operations of the routes that have been added or changed since the
+    specs were built are built again: the others, and the `Components`, `Info` and such, are reused. Each variant that
+    was built is then rendered again, but only the paths of those routes, and the rest of the spec, like its tags:
+    the renderings of the other paths are copied, see `render_by_path`. Its bytes, compressed again, and `ETag`s are
+    then replaced in one go. The lazy variants, which share the classified spec, are brought up to date too.
+    """
+    state = _openapi_state(app)
+    sources = state.sources
+    if sources is None:
+        return
+
+    with state.lock:
+        routes_added = _routes_added(app.router)
+        routes = dict(app.router.routes_all)
+        if routes != sources.routes:
+            classified_paths = {classified_path.uri: classified_path for classified_path in sources.classified.paths}
+            handler_blueprint_names: Optional[Dict[Callable, str]] = None
+            for _uri, _route in routes.items():
+                if sources.routes.get(_uri) is _route:
+                    continue
+                if handler_blueprint_names is None:
+                    handler_blueprint_names = _build_openapi_handler_blueprint_names(app)
+                classified_paths.pop(_uri, None)
+                classified_path = _classify_openapi_path(
+                    _uri,
+                    _route,
+                    sources.classified.components,
+                    handler_blueprint_names,
+                    sources.hide_openapi_self,
+                    sources.operation_id_fn,
+                    sources.cloak_fn,
+                )
+                if classified_path:
+                    if sources.validate:
+                        validate_oobjects(classified_path)
+                    classified_paths[_uri] = classified_path
+            # In the order of the routes, as when built in full, and without those that have been removed.
+            sources.classified.paths[:] = [classified_paths[_uri] for _uri in routes if _uri in classified_paths]
+
+            for variant, settings in sources.variants.items():
+                if variant in state.rendered:
+                    _render_openapi_variant(
+                        state,
+                        variant,
+                        sources.classified,
+                        sources.compression_level,
+                        sources.processes,
+                        True,
+                        **settings,
+                    )
+        state.sources = sources._replace(routes=routes, routes_added=routes_added)
+
+
+def _render_openapi_variant(  # pylint: disable=too-many-arguments
+    state: _OpenAPIState,
+    variant: str,
+    classified: _ClassifiedSpec,
+    compression_level: int,
+    processes: int,
+    by_path: bool = False,
+    **settings: bool,
+):
+    """
+    Build the variant of the spec, see `_build_openapi_variant`, and render it into the app's state, in as many
+    processes as `app.config.OPENAPI_BUILD_PROCESSES`, see `RenderedSpec`.
+
+    With `by_path`, as with `app.config.OPENAPI_TRACK_ROUTES`, each of the paths is rendered on its own, and those that
+    are unchanged since the variant was last rendered are copied from that rendering rather than rendered again.
+    """
+    spec = state.specs[variant] = _build_openapi_variant(classified, **settings)
+    previous = state.rendered.get(variant) if by_path else None
+    state.rendered[variant] = RenderedSpec(spec, compression_level, processes, by_path=by_path, previous=previous)
+
+
+def _build_lazy_variant(app: sanic.app.Sanic, variant: str):
+    """Build the lazy variant, unless it already was. This is run in an executor, see `_rendered_variant`."""
+    state = _openapi_state(app)
+    with state.lock:
+        # The variants share some of their objects, so they are only ever built one at a time.
+        render = state.lazy_variants.get(variant)
+        if render is not None:
+            render()
+            del state.lazy_variants[variant]
+
+
+def _updated_openapi_specs(state: _OpenAPIState, update: "asyncio.Future[None]"):
+    """The update of the specs is done, see `_rendered_variant`. Should it have failed, the next request tries again."""
+    if state.update is update:
+        state.update = None
+
+
+async def _rendered_variant(app: sanic.app.Sanic, variant: str) -> Optional[RenderedSpec]:
+    """
+    The rendering of the variant, first building it if it is one of the lazy variants. All of the requests that
+    come in while it is being built wait for that one build, which is run in an executor so that the event loop can
+    serve everything else, including the public spec, meanwhile.
+
+    With `app.config.OPENAPI_TRACK_ROUTES`, the specs are brought up to date with the app's routes, in an executor too.
+    The specs as they were are served until that is done.
+    """
+    state = _openapi_state(app)
+    # Only whether any routes were added is checked here, rather than all of them, which is left to the update.
+    if (
+        state.update is None
+        and state.sources is not None
+        and _routes_added(app.router) != state.sources.routes_added
+        and is_openapi_spec_ready(app)
+    ):
+        state.update = asyncio.get_event_loop().run_in_executor(None, _update_openapi_specs, app)
+        state.update.add_done_callback(functools.partial(_updated_openapi_specs, state))
+    rendered = state.rendered.get(variant)
+    if rendered is None and variant in state.lazy_variants:
+        build = state.lazy_builds.get(variant)
+        if build is None:
+            build = asyncio.get_event_loop().run_in_executor(None, _build_lazy_variant, app, variant)
+            state.lazy_builds[variant] = build
+            # Should it fail, the next request tries again.
+            build.add_done_callback(lambda _: state.lazy_builds.pop(variant, None))
+        # Shielded, so that a request that goes away does not cancel the build for the others.
+        await asyncio.shield(build)
+        rendered = state.rendered.get(variant)
+    return rendered
+
+
+def write_openapi_specs(app: sanic.app.Sanic, directory: str) -> Dict[str, str]:
+    """
+    Build the specs of the app, as `build_openapi_spec` would, but without starting a server, and write every variant
+    (including `spec.all`), as JSON, YAML and their compressed encodings, to the directory. A `manifest.json` with the
+    sha256 of each file is written too.
+
+    Setting `app.config.OPENAPI_PREBUILT_SPECS` to the directory then serves these files, as they are, rather than
+    building the specs when the server starts. This is what `python -m sanic_openapi3e build` does.
+
+    :param app: The sanic app, with all of its routes added.
+    :param directory: Where to write the files to. It is created if need be.
+    :return: The sha256 hex digest of each of the files, keyed by file name.
+    """
+    _render_openapi_specs(app, show_excluded=True)
+    os.makedirs(directory, exist_ok=True)
+    return write_rendered_specs(_file_renderings(app), directory)
+
+
+def _file_renderings(app: sanic.app.Sanic) -> Dict[str, RenderedSpec]:
+    """The renderings of the app's specs, keyed by the names of their prebuilt files."""
+    return {_FILE_NAMES[variant]: rendered for variant, rendered in _openapi_state(app).rendered.items()}
+
+
+def _read_openapi_specs(app: sanic.app.Sanic, directory: str, show_excluded: bool):
+    variants = (SPEC, UNCLOAKED, ALL) if show_excluded else (SPEC, UNCLOAKED)
+    _use_file_renderings(app, variants, read_rendered_specs(directory, [_FILE_NAMES[v] for v in variants]))
+
+
+def _cached_openapi_specs(app: sanic.app.Sanic, cache_dir: str, show_excluded: bool):
+    """
+    The specs, from the cache directory if they were already built for the very same routes, `doc` decorators and
+    config (see `fingerprint_openapi_specs`), or else built and added to it. So the specs are built again as soon as
+    anything that they are built from changes.
+    """
+    fingerprint = fingerprint_openapi_specs(app)
+    variants = (SPEC, UNCLOAKED, ALL) if show_excluded else (SPEC, UNCLOAKED)
+    renderings = read_cached_specs(cache_dir, fingerprint, [_FILE_NAMES[v] for v in variants])
+    if renderings is not None:
+        _use_file_renderings(app, variants, renderings)
+        return
+
+    _render_openapi_specs(app, show_excluded)
+    cache_rendered_specs(_file_renderings(app), cache_dir, fingerprint)
+
+
+def _use_file_renderings(app: sanic.app.Sanic, variants: Tuple[str, ...], renderings: Dict[str, RenderedSpec]):
+    """Serve the renderings, keyed by the names of their prebuilt files, rather than building them."""
+    state = _openapi_state(app)
+    state.rendered.clear()
+    state.lazy_variants.clear()
+    state.sources = None
+    for variant in variants:
+        state.rendered[variant] = renderings[_FILE_NAMES[variant]]
+
+
+def _build_openapi_spec(  # pylint: disable=too-many-arguments
     app: sanic.app.Sanic,
     operation_id_fn: Callable[[str, str, sanic.router.Route], str],
     hide_openapi_self=True,
@@ -141,32 +452,64 @@ def _build_openapi_spec(  # pylint: disable=too-many-arguments, too-many-locals
     """
     Build the OpenAPI spec.
     """
+    classified = _classify_openapi_spec(app, operation_id_fn, hide_openapi_self=hide_openapi_self, cloak_fn=cloak_fn)
+    return _build_openapi_variant(
+        classified,
+        hide_excluded=hide_excluded,
+        show_unused_tags=show_unused_tags,
+        hide_sanic_static=hide_sanic_static,
+        hide_cloaked=hide_cloaked,
+    )
+
+
+def _classify_openapi_spec(
+    app: sanic.app.Sanic,
+    operation_id_fn: Callable[[str, str, sanic.router.Route], str],
+    hide_openapi_self=True,
+    cloak_fn: Optional[Callable[[str, str, sanic.router.Route], bool]] = None,
+) -> _ClassifiedSpec:
+    """
+    Walk the app's routes, building and classifying each operation once, ready for `_build_openapi_variant`.
+    """
 
     # We may reuse this later
     assert callable(operation_id_fn), operation_id_fn
 
     components: Components = _build_openapi_components(app)
-    oas_paths = _buld_openapi_paths(
-        app, components, hide_excluded, hide_openapi_self, hide_sanic_static, operation_id_fn, cloak_fn, hide_cloaked
-    )
-    paths: Paths = Paths(oas_paths)
+    paths = _classify_openapi_paths(app, components, hide_openapi_self, operation_id_fn, cloak_fn)
     contact = _build_openapi_contact(app)
     _license = _build_openapi_license(app)
-    info = _buld_openapi_info(app, contact, _license)
-    tags = _build_openapi_tags(oas_paths, show_unused_tags)
-    servers = _build_openapi_servers(app)
-    security = _build_openapi_security(app)
-    external_docs = _build_openapi_externaldocs(app)
+    return _ClassifiedSpec(
+        paths=paths,
+        components=components,
+        info=_buld_openapi_info(app, contact, _license),
+        servers=_build_openapi_servers(app),
+        security=_build_openapi_security(app),
+        external_docs=_build_openapi_externaldocs(app),
+    )
 
+
+def _build_openapi_variant(
+    classified: _ClassifiedSpec,
+    hide_excluded=True,
+    show_unused_tags=False,
+    hide_sanic_static=True,
+    hide_cloaked: bool = True,
+) -> OpenAPIv3:
+    """
+    Build one variant of the OpenAPI spec from the classified operations. All of the variants share the same objects
+    for everything but the `OpenAPIv3`, its `Paths` and `tags`, and those `PathItem`s whose operations differ.
+    """
+    oas_paths = _build_openapi_variant_paths(classified.paths, hide_excluded, hide_sanic_static, hide_cloaked)
     return OpenAPIv3(
         openapi=OpenAPIv3.version,
-        info=info,
-        paths=paths,
-        servers=servers,
-        components=components,
-        security=security,
-        tags=tags,
-        external_docs=external_docs,
+        info=classified.info,
+        paths=Paths(oas_paths),
+        servers=classified.servers,
+        components=classified.components,
+        security=classified.security,
+        tags=_build_openapi_tags(oas_paths, show_unused_tags),
+        external_docs=classified.external_docs,
     )
 
 
@@ -254,124 +597,178 @@ def _build_openapi_contact(app: sanic.app.Sanic) -> Optional[Contact]:
     return contact
 
 
-def _buld_openapi_paths(  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches.too-many-statements
+def _classify_openapi_paths(
     app: sanic.app.Sanic,
     components: Components,
-    hide_excluded: bool,
     hide_openapi_self: bool,
-    hide_sanic_static: bool,
     operation_id_fn: Callable[[str, str, sanic.router.Route], str],
     cloak_fn: Optional[Callable[[str, str, sanic.router.Route], bool]] = None,
-    hide_cloaked: bool = True,
-) -> List[Tuple[str, PathItem]]:
-    paths: List[Tuple[str, PathItem]] = []
+) -> List[_ClassifiedPath]:
+    paths: List[_ClassifiedPath] = []
+    handler_blueprint_names = _build_openapi_handler_blueprint_names(app)
     for _uri, _route in app.router.routes_all.items():
-        # paranoia
-        assert isinstance(_uri, str)
-        assert isinstance(_route, sanic.router.Route), type(_route)
+        classified_path = _classify_openapi_path(
+            _uri, _route, components, handler_blueprint_names, hide_openapi_self, operation_id_fn, cloak_fn
+        )
+        if classified_path:
+            paths.append(classified_path)
+    return paths
 
-        # NOTE: TODO: there's no order here at all to either the _uri nor the _route. OAS specs do not define an order
-        # NOTE: TODO: but people do rather like having at least document order for the routes.
 
-        if _build_openapi_path_should_be_skipped(_uri, hide_excluded, hide_openapi_self):
-            continue
+def _classify_openapi_path(  # pylint: disable=too-many-arguments,too-many-locals
+    _uri: str,
+    _route: sanic.router.Route,
+    components: Components,
+    handler_blueprint_names: Dict[Callable, str],
+    hide_openapi_self: bool,
+    operation_id_fn: Callable[[str, str, sanic.router.Route], str],
+    cloak_fn: Optional[Callable[[str, str, sanic.router.Route], bool]] = None,
+) -> Optional[_ClassifiedPath]:
+    """Build and classify each of the operations of the route, or `None` if it is not to be documented at all."""
+    # paranoia
+    assert isinstance(_uri, str)
+    assert isinstance(_route, sanic.router.Route), type(_route)
+
+    # NOTE: TODO: there's no order here at all to either the _uri nor the _route. OAS specs do not define an order
+    # NOTE: TODO: but people do rather like having at least document order for the routes.
+
+    if hide_openapi_self and _build_openapi_path_is_self(_uri):
+        return None
+
+    # We document the parameters at the PathItem, not at the Operation. First get the route parameters (if any)
+    route_parameters, uri_parsed = _build_openapi_paths_routeparameters_and_uri(_uri)
+
+    handler_type = type(_route.handler)
+    if handler_type is CompositionView:
+        view = _route.handler
+        pathitem_operations = view.handlers.items()
+    else:
+        pathitem_operations = zip(_route.methods, repeat(_route.handler))
+
+    operations: List[_ClassifiedOperation] = []
+    for _method, _func in pathitem_operations:
+        path_item: PathItem = endpoints[_func]
+        assert isinstance(path_item, PathItem)
+
+        excluded = bool(path_item.x_exclude)
+        static = str(_func.__module__) == "sanic.static"
+        # Cloaking never applies to the variant that shows the excluded operations.
+        cloaked = bool(cloak_fn(_method, _uri, _route)) if cloak_fn and not excluded else False
+
+        path_item_summary: Optional[str] = path_item.summary
+        if excluded:
+            # Excluded operations are only ever shown in the variant that shows them as such.
+            path_item_summary = "[excluded] " + (path_item.summary or "")
+
+        _op_parameters = _build_openapi_paths_opparameters(path_item, route_parameters, components)
+        pathitem_tag_names: Set[str] = _build_openapi_paths_operations_tagnames(
+            path_item, _func, handler_blueprint_names
+        )
 
-        # We document the parameters at the PathItem, not at the Operation. First get the route parameters (if any)
-        route_parameters, uri_parsed = _build_openapi_paths_routeparameters_and_uri(_route, _uri)
+        operation_id = operation_id_fn(_method, _uri, _route)
+
+        operation = Operation(
+            operation_id=operation_id,
+            deprecated=path_item.x_deprecated_holder,
+            description=path_item.description,
+            external_docs=path_item.x_external_docs_holder,
+            parameters=_op_parameters,
+            request_body=path_item.request_body,
+            responses=path_item.x_responses_holder,
+            servers=path_item.servers,
+            summary=path_item_summary,
+            tags=sorted(pathitem_tag_names),
+            security=path_item.x_security_holder,
+            # TODO
+            callbacks=NOT_YET_IMPLEMENTED,
+        )
+        operations.append(_ClassifiedOperation(_method.lower(), operation, excluded, static, cloaked))
 
-        handler_type = type(_route.handler)
-        if handler_type is CompositionView:
-            view = _route.handler
-            pathitem_operations = view.handlers.items()
-        else:
-            pathitem_operations = zip(_route.methods, repeat(_route.handler))
-
-        operations = OrderedDict()
-        for _method, _func in pathitem_operations:
-            path_item: PathItem = endpoints[_func]
-            assert isinstance(path_item, PathItem)
-
-            if _build_openapi_paths_operations_should_be_skipped(
-                _route, path_item, _method, _func, _uri, cloak_fn, hide_cloaked, hide_excluded, hide_sanic_static
-            ):
-                continue
-
-            path_item_summary: Optional[str] = path_item.summary
-            if path_item.x_exclude and not hide_excluded:
-                path_item_summary = "[excluded] " + (path_item.summary or "")
-
-            _op_parameters = _build_openapi_paths_opparameters(path_item, route_parameters, components)
-            pathitem_tag_names: Set[str] = _build_openapi_paths_operations_tagnames(app, path_item, _func)
-
-            operation_id = operation_id_fn(_method, _uri, _route)
-
-            operations[_method.lower()] = Operation(
-                operation_id=operation_id,
-                deprecated=path_item.x_deprecated_holder,
-                description=path_item.description,
-                external_docs=path_item.x_external_docs_holder,
-                parameters=_op_parameters,
-                request_body=path_item.request_body,
-                responses=path_item.x_responses_holder,
-                servers=path_item.servers,
-                summary=path_item_summary,
-                tags=sorted(pathitem_tag_names),
-                security=path_item.x_security_holder,
-                # TODO
-                callbacks=NOT_YET_IMPLEMENTED,
-            )
+    return _ClassifiedPath(_uri, uri_parsed, operations, {})
 
-            _path = PathItem(**operations)
-            paths.append((uri_parsed, _path))
-    return paths
 
+def _build_openapi_variant_paths(
+    classified_paths: List[_ClassifiedPath], hide_excluded: bool, hide_sanic_static: bool, hide_cloaked: bool
+) -> List[Tuple[str, PathItem]]:
+    paths: List[Tuple[str, PathItem]] = []
+    for classified_path in classified_paths:
+        if hide_excluded and "<file_uri" in classified_path.uri:
+            continue
 
-def _build_openapi_paths_operations_should_be_skipped(  # pylint: disable=too-many-arguments
-    route: sanic.router.Route,
-    path_item: PathItem,
-    method: str,
-    handler_func,  # TODO - how should this be type hinted?
-    uri: str,
-    cloak_fn: Optional[Callable[[str, str, sanic.router.Route], bool]],
-    hide_cloaked: bool,
-    hide_excluded: bool,
-    hide_sanic_static: bool,
-):
+        operations = OrderedDict(
+            (classified.method, classified.operation)
+            for classified in classified_path.operations
+            if not (
+                (classified.excluded and hide_excluded)
+                or (classified.static and hide_sanic_static)
+                or (classified.cloaked and hide_cloaked)
+            )
+        )
+        if not operations:
+            continue
 
-    if path_item.x_exclude and hide_excluded:
-        return True
-    if str(handler_func.__module__) == "sanic.static" and hide_sanic_static:
-        return True
-    cloak = cloak_fn(method, uri, route) if cloak_fn else False
-    return bool(cloak and hide_cloaked)
+        methods = tuple(operations)
+        _path = classified_path.path_items.get(methods)
+        if _path is None:
+            _path = classified_path.path_items[methods] = PathItem(**operations)
+        paths.append((classified_path.uri_parsed, _path))
+    return paths
 
 
 def _build_openapi_paths_opparameters(
     path_item: PathItem, route_parameters: List[Parameter], components: Components
 ) -> List[Union[Parameter, Reference]]:
-    # Create a per-operation copy of the route params.
+    # Create a per-operation copy of the route params, and index them - all in the path - by their (name, in).
     _op_parameters: List[Union[Parameter, Reference]] = [*route_parameters]
+    # pylint: disable=protected-access
+    _route_parameters_index: Dict[Tuple[str, str], int] = {
+        (p.name, p._in): idx for idx, p in enumerate(route_parameters)
+    }
+    # A (name, in) MUST be unique.
+    _documented: Set[Tuple[str, str]] = set()
     for _op_parameter in path_item.parameters:
 
         # Swagger v3.21.0 doesn't show the description for schema references, so lets try add some.
         _op_parameter = _upgrade_parameter_schema_description(_op_parameter, components)
+        if not isinstance(_op_parameter, Parameter):
+            _op_parameters.append(_op_parameter)
+            continue
+
+        _key = (_op_parameter.name, _op_parameter._in)
+        if _key in _documented:
+            raise AssertionError("The `{}` parameter in `{}` is documented more than once.".format(*_key))
+        _documented.add(_key)
 
         # Is this _op_parameter something new - like a query param - or an "upgrade annotation" for one of the
         # original route params?
-        _orig_parameters = {
-            (idx, p)
-            for idx, p in enumerate(route_parameters)
-            if isinstance(_op_parameter, Parameter) and p.name == _op_parameter.name
-        }
-        if _orig_parameters:
-            assert len(_orig_parameters) == 1, (len(_orig_parameters), _orig_parameters)
-            _orig_parameter_idx, _orig_parameter = _orig_parameters.pop()
-            _op_parameters[_orig_parameter_idx] = _orig_parameter + _op_parameter
-        else:
+        _orig_parameter_idx = _route_parameters_index.get(_key)
+        if _orig_parameter_idx is None:
             _op_parameters.append(_op_parameter)
+        else:
+            _orig_parameter = route_parameters[_orig_parameter_idx]
+            _op_parameters[_orig_parameter_idx] = _merge_route_parameter(_orig_parameter, _op_parameter)
     return _op_parameters
 
 
+def _merge_route_parameter(route_parameter: Parameter, annotation: Parameter) -> Parameter:
+    """
+    The route parameter with what its `doc.parameter` annotation adds. When the annotation is frozen, see
+    `OObject.freeze`, as those of `doc.parameter` are, this is merged once per (route parameter, annotation) pair: the
+    route parameters are shared, and frozen, see `_route_parameter`, so every method and every route of the handler,
+    and every later build, re-uses the same merged parameter while it is cached. Any other annotation may have been
+    modified since, and so is merged again.
+    """
+    if annotation.is_frozen():
+        return _merge_frozen_route_parameter(route_parameter, annotation)
+    return route_parameter + annotation
+
+
+@functools.lru_cache(maxsize=1024)
+def _merge_frozen_route_parameter(route_parameter: Parameter, annotation: Parameter) -> Parameter:
+    # The cache is bounded, as it keeps the parameters alive.
+    return route_parameter + annotation
+
+
 def _upgrade_parameter_schema_description(
     _op_parameter: Union[Parameter, Reference], components: Components
 ) -> Union[Parameter, Reference]:
@@ -382,70 +779,107 @@ def _upgrade_parameter_schema_description(
             if components and components.schemas:
                 ref = components.schemas.get(_op_parameter.name)
                 if isinstance(ref, Schema):
-                    _parameter = copy.deepcopy(_op_parameter)
-                    _parameter.description = ref.description
-                    return _parameter
+                    return _described_parameter(_op_parameter, ref.description)
     return _op_parameter
 
 
-def _build_openapi_path_should_be_skipped(_uri: str, hide_excluded: bool, hide_openapi_self: bool):
+def _described_parameter(parameter: Parameter, description: Optional[str]) -> Parameter:
+    # A shallow copy is enough: only the description differs, so the schema, examples and content are shared with - and
+    # left as they are in - the documented parameter.
+    if parameter.is_frozen():
+        return _described_frozen_parameter(parameter, description)
+    _parameter = copy.copy(parameter)
+    _parameter.description = description
+    return _parameter
 
-    if hide_openapi_self:
-        if (_uri.startswith("/" + blueprint.url_prefix) if blueprint.url_prefix else True) and any(
-            bp_uri in _uri for bp_uri in [r.uri for r in blueprint.routes]
-        ):
-            # Remove self-documentation from the spec
-            return True
-        if (_uri.startswith("/" + swagger_bp.url_prefix) if swagger_bp.url_prefix else True) and any(
-            [bp_uri in _uri for bp_uri in [r.uri for r in swagger_bp.routes]] + [not bool(swagger_bp.routes)]
-        ):
-            # Remove self-documentation from the spec by not adding.
-            return True
-    return "<file_uri" in _uri and hide_excluded
 
+@functools.lru_cache(maxsize=1024)
+def _described_frozen_parameter(parameter: Parameter, description: Optional[str]) -> Parameter:
+    # Made once, and frozen too, so that it can be merged once too. The cache is bounded, as it keeps the parameters
+    # alive, and the routes of a handler (and its methods) are built one after the other anyway.
+    _parameter = copy.copy(parameter)
+    _parameter.description = description
+    _parameter.freeze()
+    return _parameter
 
-def _build_openapi_paths_routeparameters_and_uri(_route, _uri: str) -> Tuple[List[Parameter], str]:
-    uri_parsed: str = _uri
-    route_parameters: List[Parameter] = []
-    for _route_parameter in _route.parameters:
-        uri_parsed = re.sub("<" + _route_parameter.name + ".*?>", "{" + _route_parameter.name + "}", uri_parsed)
 
+def _build_openapi_path_is_self(_uri: str) -> bool:
+    if (_uri.startswith("/" + blueprint.url_prefix) if blueprint.url_prefix else True) and any(
+        bp_uri in _uri for bp_uri in [r.uri for r in blueprint.routes]
+    ):
+        # Remove self-documentation from the spec
+        return True
+    if (_uri.startswith("/" + swagger_bp.url_prefix) if swagger_bp.url_prefix else True) and any(
+        [bp_uri in _uri for bp_uri in [r.uri for r in swagger_bp.routes]] + [not bool(swagger_bp.routes)]
+    ):
+        # Remove self-documentation from the spec by not adding.
+        return True
+    return False
+
+
+def _build_openapi_paths_routeparameters_and_uri(_uri: str) -> Tuple[List[Parameter], str]:
+    uri_template = parse_sanic_uri(_uri)
+    route_parameters: List[Parameter] = []
+    for _name, _cast in zip(uri_template.parameter_names, uri_template.parameter_casts):
         # Sanic route parameters can give us a name, we know that it is in the path and we may be able to establish
         # the basic schema.
-        parameter = Parameter(
-            name=_route_parameter.name,
-            _in="path",
-            description=None,
-            required=True,
-            deprecated=None,
-            allow_empty_value=None,
-            style=None,
-            explode=None,
-            allow_reserved=None,
-            schema=CAST_2_SCHEMA.get(_route_parameter.cast),
-            example=None,
-            examples=None,
-            content=None,
-        )
-        route_parameters.append(parameter)
-    return route_parameters, uri_parsed
+        route_parameters.append(_route_parameter(_name, _cast))
+    return route_parameters, uri_template.oas_uri
+
+
+@functools.lru_cache(maxsize=None)
+def _route_parameter(name: str, cast: Any) -> Parameter:
+    """
+    The parameter for a sanic route parameter, shared by all of the routes with a parameter of that name and cast: it
+    is frozen, and only ever merged with, see `_merge_route_parameter`.
+    """
+    route_parameter = Parameter(
+        name=name,
+        _in="path",
+        description=None,
+        required=True,
+        deprecated=None,
+        allow_empty_value=None,
+        style=None,
+        explode=None,
+        allow_reserved=None,
+        schema=CAST_2_SCHEMA.get(cast),
+        example=None,
+        examples=None,
+        content=None,
+    )
+    route_parameter.freeze()
+    return route_parameter
 
 
-def _build_openapi_paths_operations_tagnames(app: sanic.app.Sanic, path_item: PathItem, _func: Callable) -> Set[str]:
+def _build_openapi_handler_blueprint_names(app: sanic.app.Sanic) -> Dict[Callable, str]:
+    """
+    Map each handler of the app's blueprints to the name of the (first) blueprint it is in, including the handlers of
+    any `CompositionView`s, so that `_build_openapi_paths_operations_tagnames` does not need to search the blueprints.
+    """
+    handler_blueprint_names: Dict[Callable, str] = {}
+    for _blueprint in app.blueprints.values():
+        if not hasattr(_blueprint, "routes"):
+            # QQ: when was it last possible for a blueprint to not have routes ... ?
+            continue
+
+        for _bproute in _blueprint.routes:
+            handler_blueprint_names.setdefault(_bproute.handler, _blueprint.name)
+            if type(_bproute.handler) is CompositionView:
+                for _handler in _bproute.handler.handlers.values():
+                    handler_blueprint_names.setdefault(_handler, _blueprint.name)
+    return handler_blueprint_names
+
+
+def _build_openapi_paths_operations_tagnames(
+    path_item: PathItem, _func: Callable, handler_blueprint_names: Dict[Callable, str]
+) -> Set[str]:
     pathitem_tag_names: Set[str] = {t.name for t in path_item.x_tags_holder}
     if not pathitem_tag_names:
         # If the route does not have a tag, use the blueprint's name.
-        for _blueprint in app.blueprints.values():
-            if not hasattr(_blueprint, "routes"):
-                # QQ: when was it last possible for a blueprint to not have routes ... ?
-                continue
-
-            for _bproute in _blueprint.routes:
-                if _bproute.handler == _func:
-                    pathitem_tag_names.add(_blueprint.name)
-                    break
-            if pathitem_tag_names:
-                break
+        blueprint_name = handler_blueprint_names.get(_func)
+        if blueprint_name:
+            pathitem_tag_names.add(blueprint_name)
     return pathitem_tag_names
 
 
@@ -468,25 +902,25 @@ def _build_openapi_tags(_paths: List[Tuple[str, PathItem]], show_unused_tags: bo
 # ======================================================================================================================
 # spec.json & spec.yml
 @blueprint.route("/spec.json")
-async def spec_v3_json(_):
-    return await serve_spec(_OPENAPI, "json")
+async def spec_v3_json(request: sanic.request.Request):
+    return await serve_spec(request, await _rendered_variant(request.app, SPEC), "json")
 
 
 @blueprint.route("/spec.yml")
 async def spec_v3_yaml(request: sanic.request.Request):
     as_text = "as_text" in request.query_string
-    return await serve_spec(_OPENAPI, "yaml", as_text)
+    return await serve_spec(request, await _rendered_variant(request.app, SPEC), "yaml", as_text)
 
 
 @blueprint.route("/uncloaked.json")
-async def spec_v3_uncloaked_json(_):
-    return await serve_spec(_OPENAPI_UNCLOAKED, "json")
+async def spec_v3_uncloaked_json(request: sanic.request.Request):
+    return await serve_spec(request, await _rendered_variant(request.app, UNCLOAKED), "json")
 
 
 @blueprint.route("/uncloaked.yml")
 async def spec_v3_uncloaked_yaml(request: sanic.request.Request):
     as_text = "as_text" in request.query_string
-    return await serve_spec(_OPENAPI_UNCLOAKED, "yaml", as_text)
+    return await serve_spec(request, await _rendered_variant(request.app, UNCLOAKED), "yaml", as_text)
 
 
 # ======================================================================================================================
@@ -494,28 +928,49 @@ async def spec_v3_uncloaked_yaml(request: sanic.request.Request):
 
 
 @blueprint.route("/spec.all.json")
-async def spec_all_json(_):
-    return await serve_spec(_OPENAPI_ALL, "json")
+async def spec_all_json(request: sanic.request.Request):
+    return await serve_spec(request, await _rendered_variant(request.app, ALL), "json")
 
 
 @blueprint.route("/spec.all.yml")
 async def spec_all_yml(request: sanic.request.Request):
     as_text = "as_text" in request.query_string
-    return await serve_spec(_OPENAPI_ALL, "yaml", as_text)
+    return await serve_spec(request, await _rendered_variant(request.app, ALL), "yaml", as_text)
 
 
 # ======================================================================================================================
 
 
-async def serve_spec(spec: Dict, json_yaml: str, yaml_as_text: bool = False):
-    if not spec:
-        # ... including empty dicts in this if block
+async def serve_spec(
+    request: sanic.request.Request, rendered: Optional[RenderedSpec], json_yaml: str, yaml_as_text: bool = False
+):
+    state = _openapi_state(request.app)
+    if state.build is not None:
+        if not state.build.done():
+            return sanic.response.text(
+                "The OpenAPI specs are still being built.", status=503, headers={"Retry-After": str(state.retry_after)}
+            )
+        if state.build.cancelled() or state.build.exception() is not None:
+            # Already logged, by the build in the background.
+            return sanic.response.text("The OpenAPI specs could not be built.", status=500)
+
+    if not rendered:
+        # ... including the specs that were not built, like `spec.all` without `SHOW_OPENAPI_EXCLUDED`
         raise sanic.exceptions.NotFound("Not found")
 
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"), rendered.encodings)
+    etag = rendered.etag(json_yaml, encoding)
+    headers = {"ETag": etag, "Cache-Control": state.cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return sanic.response.HTTPResponse(status=304, headers=headers)
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+
     if json_yaml == "json":
-        return sanic.response.json(spec)
+        content_type = "application/json"
+    else:
+        content_type = "text/plain" if yaml_as_text else YAML_CONTENT_TYPE
 
     return sanic.response.HTTPResponse(
-        content_type="text/plain" if yaml_as_text else YAML_CONTENT_TYPE,
-        body=yaml.dump(spec, Dumper=yaml.CDumper, default_flow_style=False, explicit_start=False, sort_keys=False),
+        body=rendered.body(json_yaml, encoding), headers=headers, content_type=content_type
     )
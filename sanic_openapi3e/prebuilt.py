@@ -0,0 +1,169 @@
+"""
+Specs that are built ahead of time.
+
+The renderings of the specs (see ``rendering.RenderedSpec``) can be written to a directory, with a manifest of their
+sha256 digests, and read back, so that they are built once per deployment rather than once per server start. This is
+what ``python -m sanic_openapi3e build`` and ``app.config.OPENAPI_PREBUILT_SPECS`` use.
+
+They can also be cached on disk, in a sub-directory named after a fingerprint of everything that they are built from,
+so that a server that starts with the very same routes, ``doc`` decorators and config reads them rather than builds
+them. This is what ``app.config.OPENAPI_CACHE_DIR`` uses.
+"""
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import types
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Sequence
+
+import sanic
+import sanic.app
+import yaml
+from sanic.views import CompositionView
+
+from .doc import OObject, endpoints
+from .rendering import RenderedSpec
+
+MANIFEST = "manifest.json"
+"""The file, in the directory of prebuilt specs, with the sha256 of each of the other files."""
+
+
+def write_rendered_specs(renderings: Dict[str, RenderedSpec], directory: str) -> Dict[str, str]:
+    """
+    Write the renderings, keyed by the name of their files (see `RenderedSpec.write`), to the directory, and then the
+    `MANIFEST` of them.
+
+    :return: The sha256 hex digest of each of the files, keyed by file name.
+    """
+    digests: Dict[str, str] = {}
+    for name, rendered in renderings.items():
+        digests.update(rendered.write(directory, name))
+
+    # Written last, so that the files it lists are all complete.
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as manifest:
+        json.dump({"files": digests}, manifest, indent=2, sort_keys=True)
+    return digests
+
+
+def read_rendered_specs(directory: str, names: Iterable[str], memory_map: bool = False) -> Dict[str, RenderedSpec]:
+    """
+    Read the renderings that `write_rendered_specs` wrote to the directory back, keyed by the name of their files. Each
+    file is checked against the `MANIFEST`: a `ValueError` is raised for any that is missing or modified.
+    """
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as manifest:
+        digests = json.load(manifest)["files"]
+    return {name: RenderedSpec.read(directory, name, digests, memory_map=memory_map) for name in names}
+
+
+def read_cached_specs(cache_dir: str, fingerprint: str, names: Iterable[str]) -> Optional[Dict[str, RenderedSpec]]:
+    """
+    The renderings that `cache_rendered_specs` cached for the fingerprint, memory-mapped, or `None` if there are none.
+    Older builds, of other fingerprints, are never used again, and can be deleted at any time.
+    """
+    directory = os.path.join(cache_dir, fingerprint)
+    if os.path.exists(os.path.join(directory, MANIFEST)):
+        try:
+            return read_rendered_specs(directory, names, memory_map=True)
+        except (OSError, ValueError, KeyError):
+            # Damaged, so to be built and cached again.
+            shutil.rmtree(directory, ignore_errors=True)
+    return None
+
+
+def cache_rendered_specs(renderings: Dict[str, RenderedSpec], cache_dir: str, fingerprint: str) -> None:
+    """Cache the renderings, keyed by the name of their files, for the fingerprint. See `read_cached_specs`."""
+    # Each worker that builds them writes its own copy, and the first to be complete is moved in place.
+    os.makedirs(cache_dir, exist_ok=True)
+    building = tempfile.mkdtemp(prefix=".{}-".format(fingerprint), dir=cache_dir)
+    try:
+        write_rendered_specs(renderings, building)
+        os.rename(building, os.path.join(cache_dir, fingerprint))
+    except OSError:
+        shutil.rmtree(building, ignore_errors=True)
+
+
+def fingerprint_openapi_specs(app: sanic.app.Sanic) -> str:
+    """
+    A digest of everything that the specs are built from: the app's routes (their URIs, methods and handlers), the
+    config that is used to build the specs, what the `doc` decorators have recorded for each handler, and the versions
+    of the code that builds and renders them.
+    """
+    from . import __version__  # pylint: disable=import-outside-toplevel,cyclic-import
+
+    parts: List[Any] = [__version__, sanic.__version__, yaml.__version__]
+    for _uri, _route in app.router.routes_all.items():
+        parts.append((_uri, sorted(_route.methods), _route.name, _fingerprint_value(_route.handler, {})))
+    for key in sorted(app.config):
+        if key.startswith(("API_", "OPENAPI_")) or key in _FINGERPRINT_CONFIG:
+            parts.append((key, _fingerprint_value(app.config[key], {})))
+    seen: Dict[int, int] = {}
+    for func, path_item in endpoints:
+        parts.append((_fingerprint_value(func, seen), _fingerprint_value(path_item, seen)))
+    return hashlib.sha256(repr(parts).encode("utf8")).hexdigest()
+
+
+_FINGERPRINT_CONFIG = ("HIDE_OPENAPI_SELF", "HIDE_SANIC_STATIC", "SHOW_OPENAPI_EXCLUDED", "SHOW_OPENAPI_UNUSED_TAGS")
+"""The config, other than the `API_*` and `OPENAPI_*` keys, that the specs are built from."""
+
+
+@functools.singledispatch
+def _fingerprint_value(value: Any, seen: Dict[int, int]) -> Any:
+    """
+    A repr-able, and so digestable, form of the value that only depends on what it holds. Unlike their `repr`, this
+    includes the `x_` fields of the OObjects, and it does not include the memory addresses of any objects. The forms of
+    the containers, OObjects and such are registered for their types, below.
+
+    :param value: What to fingerprint.
+    :param seen: The `id` of each of the OObjects already fingerprinted, with the order that they were found in: any
+        that are found again are only given by that order.
+    """
+    code = getattr(value, "__code__", None)
+    if code is not None:
+        # The name of a function is not enough (think lambdas), so its code is in there too.
+        return (value.__module__, value.__qualname__, _fingerprint_value(code, seen))
+    if callable(value) and not isinstance(value, type):
+        return ("callable", value.__class__.__module__, value.__class__.__qualname__)
+    return value if isinstance(value, (str, bytes, int, float, bool, type(None))) else repr(value)
+
+
+@_fingerprint_value.register(OObject)
+def _fingerprint_oobject(value: OObject, seen: Dict[int, int]) -> Any:
+    if id(value) in seen:
+        return ("seen", seen[id(value)])
+    seen[id(value)] = len(seen)
+    return (value.__class__.__qualname__, [(key, _fingerprint_value(val, seen)) for key, val in value._fields()])
+
+
+@_fingerprint_value.register(list)
+@_fingerprint_value.register(tuple)
+def _fingerprint_sequence(value: Sequence, seen: Dict[int, int]) -> Any:
+    return [_fingerprint_value(element, seen) for element in value]
+
+
+@_fingerprint_value.register(dict)
+def _fingerprint_dict(value: Dict, seen: Dict[int, int]) -> Any:
+    return [(key, _fingerprint_value(element, seen)) for key, element in value.items()]
+
+
+@_fingerprint_value.register(CompositionView)
+def _fingerprint_composition_view(value: CompositionView, seen: Dict[int, int]) -> Any:
+    return [(method, _fingerprint_value(handler, seen)) for method, handler in value.handlers.items()]
+
+
+@_fingerprint_value.register(set)
+@_fingerprint_value.register(frozenset)
+def _fingerprint_set(value: AbstractSet, seen: Dict[int, int]) -> Any:
+    # Sorted, as their order changes with the hash seed of each process.
+    return sorted(repr(_fingerprint_value(element, seen)) for element in value)
+
+
+@_fingerprint_value.register(functools.partial)
+def _fingerprint_partial(value: functools.partial, seen: Dict[int, int]) -> Any:
+    return ("partial", [_fingerprint_value(part, seen) for part in (value.func, value.args, value.keywords)])
+
+
+@_fingerprint_value.register(types.CodeType)
+def _fingerprint_code(value: types.CodeType, seen: Dict[int, int]) -> Any:
+    return (value.co_code, [_fingerprint_value(const, seen) for const in value.co_consts])
@@ -0,0 +1,650 @@
+"""
+Pre-rendered forms of the OpenAPI specs.
+
+Once ``build_openapi_spec`` has run, the specs never change. Each spec variant is therefore rendered once, at build
+time, into immutable ``bytes`` and every later request is served straight from those bytes. The renderings can also be
+written to files, and read back, so that they are built once per deployment rather than once per server start.
+
+Each rendering also has a strong ``ETag``, so that the many clients which poll the specs can make conditional requests
+and be answered with a ``304 Not Modified``.
+
+Specs compress very well, so the ``gzip`` and ``deflate`` encodings of each rendering are also made once, at build time,
+and the one to send is picked per request from its ``Accept-Encoding`` header.
+
+The renderings are written a piece at a time, straight from the ``OpenAPIv3`` object (see ``write_json`` and
+``write_yaml``), so that the `yaml`-able form of the whole spec never needs to be held at once.
+"""
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import yaml
+from sanic.response import json_dumps
+from yaml.events import (
+    DocumentEndEvent,
+    DocumentStartEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    ScalarEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+)
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+from .oas_types import Components, DeferredYamlable, OObject, OpenAPIv3, yamlable_object
+
+IDENTITY = "identity"
+GZIP = "gzip"
+DEFLATE = "deflate"
+ENCODINGS = (GZIP, DEFLATE, IDENTITY)
+"""The content-codings that are available, in order of preference when a client accepts several equally."""
+
+DEFAULT_COMPRESSION_LEVEL = 9
+"""The `zlib` compression level. As the compression is only done once per build, the slowest but smallest is used."""
+
+Body = Union[bytes, memoryview]
+"""A rendering: `bytes`, or a `memoryview` of a memory-mapped file, see `RenderedSpec.read`."""
+
+FILE_SUFFIXES = {"json": ".json", "yaml": ".yml", IDENTITY: "", GZIP: ".gz", DEFLATE: ".zz"}
+"""The suffixes of the files that `RenderedSpec.write` writes the renderings to, for the formats and content-codings."""
+
+
+class _NoAliasDumper(yaml.CDumper):  # pylint: disable=too-many-ancestors
+    """
+    The `yaml`-able forms of the specs can share sub-trees (see `OObject.freeze` and `yamlable_object`). These are
+    rendered in full wherever they appear, rather than as YAML anchors and aliases, which is what the specs were always
+    rendered as.
+    """
+
+    def ignore_aliases(self, data):
+        return True
+
+
+class RenderedSpec:
+    """The JSON and YAML renderings of a single spec variant, in each of the available content-codings."""
+
+    def __init__(  # pylint: disable=too-many-locals
+        self,
+        spec: Union[OpenAPIv3, Dict[str, Any]],
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        processes: int = 1,
+        by_path: bool = False,
+        previous: Optional["RenderedSpec"] = None,
+    ):
+        """
+        The JSON and YAML renderings of a single spec variant, in each of the available content-codings.
+
+        :param spec: The spec, or its `yaml`-able form as made by `OpenAPIv3.as_yamlable_object`.
+        :param compression_level: The `zlib` compression level, from 1 (fastest) to 9 (smallest), for the `gzip` and
+            `deflate` encodings. Use 0 to not make any compressed encodings.
+        :param processes: With more than one, the paths of the spec are rendered in that many processes (see
+            `render_in_parallel`), and the content-codings made in as many threads. The renderings are the same.
+        :param by_path: Render each of the paths on its own, and keep where it is in the renderings (see
+            `render_by_path`), so that a later rendering of the spec, with some of its paths added or changed, can
+            reuse the others.
+        :param previous: A rendering, made `by_path`, of the spec as it was: the paths that are unchanged since are not
+            rendered again, but copied from it. This also renders `by_path`.
+        """
+        assert 0 <= compression_level <= 9, compression_level
+
+        parallel = processes > 1 and isinstance(spec, OpenAPIv3) and spec.paths
+        path_spans: Dict[Tuple[str, Any], Tuple[int, int, int, int]] = {}
+        if (by_path or previous is not None) and isinstance(spec, OpenAPIv3) and spec.paths:
+            json_body, yaml_body, path_spans = render_by_path(spec, previous)
+        elif parallel:
+            assert isinstance(spec, OpenAPIv3)
+            json_body, yaml_body = render_in_parallel(spec, processes)
+        else:
+            stream = io.BytesIO()
+            write_json(spec, stream)
+            json_body = stream.getvalue()
+
+            stream = io.BytesIO()
+            write_yaml(spec, stream)
+            yaml_body = stream.getvalue()
+            del stream
+
+        self.json: Body = json_body
+        """The spec as JSON, exactly as `sanic.response.json` would have rendered it."""
+
+        self.yaml: Body = yaml_body
+        """The spec as YAML. This is also what is served for the YAML-as-text requests."""
+
+        self.path_spans = path_spans
+        """
+        Where each of the paths is in `json` and `yaml`, as their (start, end) in each, keyed by its URI and `PathItem`,
+        when rendered `by_path`.
+        """
+
+        self.bodies: Dict[Tuple[str, str], Body] = {}
+        """The rendered bytes, keyed by ("json" or "yaml", content-coding)."""
+
+        self.etags: Dict[Tuple[str, str], str] = {}
+        """The strong `ETag` of each of the `bodies`, with the same keys."""
+
+        identities = {"json": self.json, "yaml": self.yaml}
+        compressors: Dict[str, Callable[[bytes, int], bytes]] = (
+            {GZIP: gzip_compress, DEFLATE: zlib.compress} if compression_level else {}
+        )
+        keys = [(json_yaml, encoding) for json_yaml in identities for encoding in (IDENTITY, *compressors)]
+
+        def encode(key: Tuple[str, str]) -> bytes:
+            json_yaml, encoding = key
+            if encoding == IDENTITY:
+                return identities[json_yaml]
+            return compressors[encoding](identities[json_yaml], compression_level)
+
+        if processes > 1:
+            # `zlib` does not hold the GIL while it compresses.
+            with ThreadPoolExecutor(processes) as executor:
+                self.bodies.update(zip(keys, executor.map(encode, keys)))
+        else:
+            self.bodies.update(zip(keys, map(encode, keys)))
+        self._set_etags()
+
+    def _set_etags(self):
+        for json_yaml in ("json", "yaml"):
+            content_hash = hashlib.sha256(self.bodies[(json_yaml, IDENTITY)]).hexdigest()
+            self.etags[(json_yaml, IDENTITY)] = '"{}"'.format(content_hash)
+            for encoding in (GZIP, DEFLATE):
+                if (json_yaml, encoding) in self.bodies:
+                    # A strong ETag must differ for each content-coding of the same resource.
+                    self.etags[(json_yaml, encoding)] = '"{}-{}"'.format(content_hash, encoding)
+
+    @staticmethod
+    def file_name(name: str, json_yaml: str, encoding: str = IDENTITY) -> str:
+        """The name of the file for the rendering, like `spec.json` or `spec.all.yml.gz`."""
+        return name + FILE_SUFFIXES[_json_or_yaml(json_yaml)] + FILE_SUFFIXES[encoding]
+
+    def write(self, directory: str, name: str) -> Dict[str, str]:
+        """
+        Write each of the renderings to its own file in the directory, see `file_name`.
+
+        :param directory: Where to write the files to. It must exist.
+        :param name: The name of the spec variant, which the file names start with.
+        :return: The sha256 hex digest of each of the files, keyed by file name, as `read` needs them.
+        """
+        digests = {}
+        for (json_yaml, encoding), body in self.bodies.items():
+            file_name = self.file_name(name, json_yaml, encoding)
+            with open(os.path.join(directory, file_name), "wb") as file:
+                file.write(body)
+            digests[file_name] = hashlib.sha256(body).hexdigest()
+        return digests
+
+    @classmethod
+    def read(cls, directory: str, name: str, digests: Dict[str, str], memory_map: bool = False) -> "RenderedSpec":
+        """
+        Read back the renderings that `write` wrote, rather than rendering the spec again.
+
+        :param directory: Where the files were written to.
+        :param name: The name of the spec variant, which the file names start with.
+        :param digests: The sha256 hex digests that `write` returned. Only the renderings that have one are read, and
+            each must match, so that what is served is exactly what was built.
+        :param memory_map: Map the files into memory, read-only, rather than reading them. The workers of a server then
+            all share the one copy of each in the page cache. The renderings are then `memoryview`s, not `bytes`.
+        """
+        rendered = cls.__new__(cls)
+        rendered.bodies = {}
+        rendered.etags = {}
+        rendered.path_spans = {}
+        for json_yaml in ("json", "yaml"):
+            for encoding in ENCODINGS:
+                file_name = cls.file_name(name, json_yaml, encoding)
+                if file_name not in digests:
+                    if encoding == IDENTITY:
+                        raise ValueError("The prebuilt {} is missing from {}".format(file_name, directory))
+                    continue
+                with open(os.path.join(directory, file_name), "rb") as file:
+                    body: Body
+                    if memory_map:
+                        body = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+                    else:
+                        body = file.read()
+                if hashlib.sha256(body).hexdigest() != digests[file_name]:
+                    raise ValueError("The prebuilt {} in {} has been modified".format(file_name, directory))
+                rendered.bodies[(json_yaml, encoding)] = body
+        rendered.json = rendered.bodies[("json", IDENTITY)]
+        rendered.yaml = rendered.bodies[("yaml", IDENTITY)]
+        rendered._set_etags()  # pylint: disable=protected-access
+        return rendered
+
+    @staticmethod
+    def share(renderings: Iterable["RenderedSpec"]) -> mmap.mmap:
+        """
+        Move the renderings into a single anonymous, shared, memory map. The processes that are forked afterwards, like
+        the workers of a server, all inherit that one copy rather than their own. The renderings are then `memoryview`s
+        of it, not `bytes`, and must not be written to. Only where there is a `mmap.MAP_SHARED`, so not on Windows.
+
+        :param renderings: The renderings to share. They are changed in place.
+        :return: The memory map, which must be kept open for as long as the renderings are used.
+        """
+        renderings = list(renderings)
+        size = sum(len(body) for rendered in renderings for body in rendered.bodies.values())
+        shared = mmap.mmap(-1, max(size, 1), flags=mmap.MAP_SHARED)
+        view = memoryview(shared)
+        offset = 0
+        for rendered in renderings:
+            for key, body in rendered.bodies.items():
+                shared[offset : offset + len(body)] = body
+                rendered.bodies[key] = view[offset : offset + len(body)]
+                offset += len(body)
+            rendered.json = rendered.bodies[("json", IDENTITY)]
+            rendered.yaml = rendered.bodies[("yaml", IDENTITY)]
+        return shared
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        return tuple(encoding for encoding in ENCODINGS if ("json", encoding) in self.bodies)
+
+    def body(self, json_yaml: str, encoding: str = IDENTITY) -> Body:
+        return self.bodies[(_json_or_yaml(json_yaml), encoding)]
+
+    def etag(self, json_yaml: str, encoding: str = IDENTITY) -> str:
+        return self.etags[(_json_or_yaml(json_yaml), encoding)]
+
+
+def _json_or_yaml(json_yaml: str) -> str:
+    return "json" if json_yaml == "json" else "yaml"
+
+
+_STREAMED_CLASSES = (OpenAPIv3, Components)
+"""
+The OObjects that are rendered a field at a time. Any other OObject, like a `PathItem` or a component's `Schema`, is
+small enough to be made `yaml`-able in full, and so rendered in one go.
+"""
+
+_BUFFER_SIZE = 64 * 1024
+"""How much of a rendering is gathered before it is written out to the stream."""
+
+# The tokens of a spec, as made by `_yamlable_tokens`.
+_START_MAPPING, _KEY, _END_MAPPING, _START_SEQUENCE, _END_SEQUENCE, _VALUE = range(6)
+
+
+def _yamlable_tokens(value: Any, pointer: str) -> Iterator[Tuple[int, Any]]:
+    """
+    The spec as a stream of tokens, each holding at most one `yaml`-able value, from which the JSON and YAML are
+    written. Only the `_STREAMED_CLASSES`, and the lists and dicts within them, are broken down into more tokens, so
+    only one `PathItem` (or component) is ever held in its `yaml`-able form at a time.
+
+    The `pointer` is the JSON pointer to the value, for any `$ref`s that `yamlable_object` makes within it.
+    """
+    if isinstance(value, DeferredYamlable):
+        value, sort, opt_key = value
+        if isinstance(value, _STREAMED_CLASSES):
+            value = value.as_shallow_yamlable_object(sort=sort, opt_key=opt_key)
+        elif isinstance(value, OObject):
+            yield _VALUE, yamlable_object(value, sort=sort, opt_key=opt_key, pointer=pointer)
+            return
+        elif isinstance(value, list):
+            value = [DeferredYamlable(element, sort, opt_key) for element in (sorted(value) if sort else value)]
+        elif isinstance(value, dict):
+            items = sorted(value.items()) if sort else value.items()
+            value = {key: DeferredYamlable(element, sort, f"{opt_key}.{key}") for key, element in items}
+        else:
+            yield _VALUE, OObject._as_yamlable_object(value, sort, opt_key)  # pylint: disable=protected-access
+            return
+
+    if isinstance(value, dict):
+        yield _START_MAPPING, None
+        for key, element in value.items():
+            yield _KEY, key
+            yield from _yamlable_tokens(element, pointer + "/" + str(key).replace("~", "~0").replace("/", "~1"))
+        yield _END_MAPPING, None
+    elif isinstance(value, list):
+        yield _START_SEQUENCE, None
+        for idx, element in enumerate(value):
+            yield from _yamlable_tokens(element, f"{pointer}/{idx}")
+        yield _END_SEQUENCE, None
+    else:
+        yield _VALUE, value
+
+
+def _spec_tokens(spec: Union[OpenAPIv3, Dict[str, Any]]) -> Iterator[Tuple[int, Any]]:
+    if isinstance(spec, OObject):
+        # As `OpenAPIv3.as_yamlable_object` does.
+        return _yamlable_tokens(DeferredYamlable(spec, False, "."), "#")
+    return iter(((_VALUE, spec),))
+
+
+def write_json(spec: Union[OpenAPIv3, Dict[str, Any]], stream: BinaryIO) -> None:
+    """
+    Write the spec as JSON, byte for byte as `sanic.response.json` would have rendered its `yaml`-able form, into the
+    binary stream (like an `io.BytesIO`, a file or a chunked response), a piece at a time.
+    """
+    _write_json_tokens(_spec_tokens(spec), stream)
+
+
+def _write_json_tokens(tokens: Iterable[Tuple[int, Any]], stream: BinaryIO) -> None:
+    parts: List[str] = []
+    size = 0
+    comma = False
+    for token, value in tokens:
+        if token == _KEY:
+            if not isinstance(value, str):
+                # As `json.dumps` does for the keys that are not strings.
+                value = json_dumps(value)
+            part = ("," if comma else "") + json_dumps(value) + ":"
+            comma = False
+        elif token == _VALUE:
+            part = ("," if comma else "") + json_dumps(value)
+            comma = True
+        elif token in (_START_MAPPING, _START_SEQUENCE):
+            part = ("," if comma else "") + ("{" if token == _START_MAPPING else "[")
+            comma = False
+        else:
+            part = "}" if token == _END_MAPPING else "]"
+            comma = True
+        parts.append(part)
+        size += len(part)
+        if size >= _BUFFER_SIZE:
+            stream.write("".join(parts).encode("utf8"))
+            parts, size = [], 0
+    stream.write("".join(parts).encode("utf8"))
+
+
+def write_yaml(spec: Union[OpenAPIv3, Dict[str, Any]], stream: BinaryIO) -> None:
+    """
+    Write the spec as YAML, byte for byte as `yaml.dump` would have rendered its `yaml`-able form, into the binary
+    stream, a piece at a time.
+
+    Rather than representing the whole spec as YAML nodes and serializing those, each piece is represented on its own
+    and its nodes are emitted as the events that `yaml.dump` would have serialized them to.
+    """
+    if not isinstance(spec, OObject):
+        # Already `yaml`-able in full, so there is nothing to gain from doing it a piece at a time.
+        dumper = _yaml_dumper(stream)
+        dumper.represent(spec)
+        dumper.close()
+        return
+
+    _write_yaml_tokens(_spec_tokens(spec), stream)
+
+
+def _yaml_dumper(stream: BinaryIO) -> _NoAliasDumper:
+    dumper = _NoAliasDumper(stream, default_flow_style=False, explicit_start=False, sort_keys=False, encoding="utf-8")
+    dumper.open()
+    return dumper
+
+
+def _write_yaml_tokens(tokens: Iterable[Tuple[int, Any]], stream: BinaryIO) -> None:
+    dumper = _yaml_dumper(stream)
+    dumper.emit(DocumentStartEvent(explicit=False))
+    for token, value in tokens:
+        if token in (_KEY, _VALUE):
+            _emit_yaml_node(dumper, dumper.represent_data(value))
+        elif token == _START_MAPPING:
+            dumper.emit(MappingStartEvent(None, _YAML_MAPPING_TAG, True, flow_style=False))
+        elif token == _END_MAPPING:
+            dumper.emit(MappingEndEvent())
+        elif token == _START_SEQUENCE:
+            dumper.emit(SequenceStartEvent(None, _YAML_SEQUENCE_TAG, True, flow_style=False))
+        else:
+            dumper.emit(SequenceEndEvent())
+    dumper.emit(DocumentEndEvent(explicit=False))
+    dumper.close()
+
+
+_YAML_MAPPING_TAG = yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG
+_YAML_SEQUENCE_TAG = yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG
+
+
+def _emit_yaml_node(dumper: _NoAliasDumper, node: yaml.Node) -> None:
+    """Emit the events for the node, as `yaml.dump` serializes them, without any anchors and aliases."""
+    if isinstance(node, ScalarNode):
+        detected_tag = dumper.resolve(ScalarNode, node.value, (True, False))
+        default_tag = dumper.resolve(ScalarNode, node.value, (False, True))
+        implicit = (node.tag == detected_tag), (node.tag == default_tag)
+        dumper.emit(ScalarEvent(None, node.tag, implicit, node.value, style=node.style))
+    elif isinstance(node, SequenceNode):
+        implicit = node.tag == dumper.resolve(SequenceNode, node.value, True)
+        dumper.emit(SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+        for item in node.value:
+            _emit_yaml_node(dumper, item)
+        dumper.emit(SequenceEndEvent())
+    elif isinstance(node, MappingNode):
+        implicit = node.tag == dumper.resolve(MappingNode, node.value, True)
+        dumper.emit(MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+        for key, value in node.value:
+            _emit_yaml_node(dumper, key)
+            _emit_yaml_node(dumper, value)
+        dumper.emit(MappingEndEvent())
+
+
+_CHUNKS_PER_PROCESS = 4
+"""The paths are rendered in this many chunks per process, so that a process that is done early can take another."""
+
+
+def render_in_parallel(spec: OpenAPIv3, processes: int) -> Tuple[bytes, bytes]:
+    """
+    Render the spec as JSON and YAML, byte for byte as `write_json` and `write_yaml` would, but with its paths, which
+    are most of any large spec, rendered in other processes. Each is sent a contiguous chunk of the paths, pickled, and
+    renders it with the very same nesting, so its chunks are the same bytes as they would be in the whole. The rest of
+    the spec is rendered here, with a placeholder in place of the paths, which is then replaced with the chunks, in
+    their order.
+
+    The processes are started by a `forkserver` (or, where there is none, are spawned), and not forked from this one:
+    forking a process that has other threads running, like the executors that the specs may be built in, can leave
+    the forked processes waiting forever on a lock that one of those threads held. As with any `spawn`ed processes, the
+    app's main module must be importable without starting the app, as with an `if __name__ == "__main__":` guard.
+
+    :param spec: The spec.
+    :param processes: How many processes to render in.
+    :return: The JSON and the YAML.
+    """
+    # As `_spec_tokens` does.
+    yamlable = spec.as_shallow_yamlable_object(sort=False, opt_key=".")
+    paths = list(yamlable["paths"].items())
+    chunk_size = max(1, -(-len(paths) // (processes * _CHUNKS_PER_PROCESS)))
+    chunks = [paths[start : start + chunk_size] for start in range(0, len(paths), chunk_size)]
+
+    with multiprocessing.get_context(_START_METHOD).Pool(min(processes, len(chunks) or 1)) as pool:
+        rendered_chunks = pool.map(_render_paths, chunks, chunksize=1)
+
+    json_body, _, yaml_body, _ = _splice_paths(
+        yamlable, [json_chunk for json_chunk, _ in rendered_chunks], [yaml_chunk for _, yaml_chunk in rendered_chunks]
+    )
+    return json_body, yaml_body
+
+
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+"""How `render_in_parallel` starts its processes: never by forking this one, see there."""
+
+
+def render_by_path(  # pylint: disable=too-many-locals
+    spec: OpenAPIv3, previous: Optional[RenderedSpec] = None
+) -> Tuple[bytes, bytes, Dict[Tuple[str, Any], Tuple[int, int, int, int]]]:
+    """
+    Render the spec as JSON and YAML, byte for byte as `write_json` and `write_yaml` would, but with each of its paths
+    rendered on its own, as `render_in_parallel` does with its chunks, and then spliced into the rest of the spec.
+
+    Where each of the paths is in the renderings is returned too, keyed by its URI and `PathItem` (whose instances the
+    spec variants keep for as long as their routes are unchanged), so that a later rendering, of the spec with some of
+    its routes added or changed, only renders those paths, and the rest of the spec, and copies all of the others.
+
+    :param spec: The spec.
+    :param previous: A rendering, made by this, of the spec as it was, whose paths are copied rather than rendered
+        again, wherever the URI and `PathItem` are the same.
+    :return: The JSON, the YAML, and the (start, end) of each of the paths in the JSON and in the YAML.
+    """
+    # As `_spec_tokens` does.
+    yamlable = spec.as_shallow_yamlable_object(sort=False, opt_key=".")
+    previous_spans = previous.path_spans if previous is not None else {}
+    keys: List[Tuple[str, Any]] = []
+    json_paths: List[Body] = []
+    yaml_paths: List[Body] = []
+    for uri, path_item in yamlable["paths"].items():
+        key = (uri, path_item.value)
+        span = previous_spans.get(key)
+        json_path: Body
+        yaml_path: Body
+        if span is None:
+            json_path, yaml_path = _render_paths([(uri, path_item)])
+        else:
+            assert previous is not None
+            json_path = memoryview(previous.json)[span[0] : span[1]]
+            yaml_path = memoryview(previous.yaml)[span[2] : span[3]]
+        keys.append(key)
+        json_paths.append(json_path)
+        yaml_paths.append(yaml_path)
+
+    json_body, json_start, yaml_body, yaml_start = _splice_paths(yamlable, json_paths, yaml_paths)
+    spans: Dict[Tuple[str, Any], Tuple[int, int, int, int]] = {}
+    for key, json_path, yaml_path in zip(keys, json_paths, yaml_paths):
+        spans[key] = (json_start, json_start + len(json_path), yaml_start, yaml_start + len(yaml_path))
+        # The paths are separated by a comma in the JSON, and by nothing in the YAML.
+        json_start += len(json_path) + 1
+        yaml_start += len(yaml_path)
+    return json_body, yaml_body, spans
+
+
+def _splice_paths(
+    yamlable: Dict[str, Any], json_paths: List[Body], yaml_paths: List[Body]
+) -> Tuple[bytes, int, bytes, int]:
+    """
+    Render the rest of the spec, from its shallow `yaml`-able form, with a placeholder in place of its paths, which is
+    then replaced with the renderings of the paths (or of chunks of them), in their order.
+
+    :return: The JSON, where the paths start in it, the YAML, and where the paths start in it.
+    """
+    # Not a path (they all start with a "/"), and not anywhere else in the spec.
+    placeholder = "x-paths-{}".format(uuid.uuid4().hex)
+    yamlable = dict(yamlable, paths={placeholder: {}})
+
+    json_stream = io.BytesIO()
+    _write_json_tokens(_yamlable_tokens(yamlable, "#"), json_stream)
+    json_rest = json_stream.getvalue()
+    json_placeholder = json_dumps(placeholder).encode("utf8") + b":{}"
+    json_start = json_rest.index(json_placeholder)
+    json_body = b"".join(
+        (json_rest[:json_start], b",".join(json_paths), json_rest[json_start + len(json_placeholder) :])
+    )
+
+    yaml_stream = io.BytesIO()
+    _write_yaml_tokens(_yamlable_tokens(yamlable, "#"), yaml_stream)
+    yaml_rest = yaml_stream.getvalue()
+    yaml_placeholder = "  {}: {{}}\n".format(placeholder).encode("utf8")
+    yaml_start = yaml_rest.index(yaml_placeholder)
+    yaml_body = b"".join(
+        (yaml_rest[:yaml_start], b"".join(yaml_paths), yaml_rest[yaml_start + len(yaml_placeholder) :])
+    )
+    return json_body, json_start, yaml_body, yaml_start
+
+
+def _render_paths(paths: List[Tuple[str, Any]]) -> Tuple[bytes, bytes]:
+    """
+    Render the (deferred) `yaml`-able paths as the JSON and YAML of a spec with only those paths, less what comes before
+    and after them. This is also what the processes of `render_in_parallel` run.
+    """
+    yamlable = {"paths": dict(paths)}
+
+    json_stream = io.BytesIO()
+    _write_json_tokens(_yamlable_tokens(yamlable, "#"), json_stream)
+    json_chunk = json_stream.getvalue()
+    assert json_chunk.startswith(b'{"paths":{') and json_chunk.endswith(b"}}"), json_chunk[:20]
+
+    yaml_stream = io.BytesIO()
+    _write_yaml_tokens(_yamlable_tokens(yamlable, "#"), yaml_stream)
+    yaml_chunk = yaml_stream.getvalue()
+    assert yaml_chunk.startswith(b"paths:\n"), yaml_chunk[:20]
+    return json_chunk[len(b'{"paths":{') : -len(b"}}")], yaml_chunk[len(b"paths:\n") :]
+
+
+def gzip_compress(body: bytes, compression_level: int) -> bytes:
+    """
+    The `gzip` encoding of the body. Unlike `gzip.compress` on older pythons, the output does not contain the current
+    time, so the same spec always gives the same bytes (and so the same ETag) on every worker and after every restart.
+    """
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Tuple[str, ...]) -> str:
+    """
+    Pick the content-coding to send, as per RFC 7231 section 5.3.4. Of the ``available`` content-codings, the one with
+    the highest ``q`` value in the ``Accept-Encoding`` header wins; ties go to the first in ``available``. If the header
+    is absent, or nothing acceptable is available, ``identity`` is used.
+
+    :param accept_encoding: The value of the ``Accept-Encoding`` header, if any.
+    :param available: The content-codings that could be sent.
+    """
+    if not accept_encoding:
+        return IDENTITY
+
+    qvalues = _accept_encoding_qvalues(accept_encoding)
+    wildcard = qvalues.get("*")
+    best, best_qvalue = IDENTITY, 0.0
+    for coding in available:
+        if coding in qvalues:
+            qvalue = qvalues[coding]
+        elif wildcard is not None:
+            qvalue = wildcard
+        elif coding == IDENTITY:
+            # identity is always acceptable unless it is explicitly refused.
+            qvalue = 0.001
+        else:
+            continue
+        if qvalue > best_qvalue:
+            best, best_qvalue = coding, qvalue
+    return best
+
+
+def _accept_encoding_qvalues(accept_encoding: str) -> Dict[str, float]:
+    """The ``q`` value of each of the content-codings in the ``Accept-Encoding`` header, by its lower-cased name."""
+    qvalues: Dict[str, float] = {}
+    for element in accept_encoding.split(","):
+        coding, _, params = element.partition(";")
+        coding = coding.strip().lower()
+        if coding:
+            qvalues[GZIP if coding == "x-gzip" else coding] = _qvalue(params)
+    return qvalues
+
+
+def _qvalue(params: str) -> float:
+    """The ``q`` value of the parameters of an ``Accept-Encoding`` element: 1 if there is none, 0 if it is invalid."""
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether the ``If-None-Match`` request header matches the ``etag``. As per RFC 7232, this uses the weak comparison,
+    so a ``W/`` prefix on any of the listed entity-tags is ignored.
+
+    :param if_none_match: The value of the ``If-None-Match`` header, if any.
+    :param etag: The (strong) `ETag` of the rendering that would be served.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,187 @@
+"""
+What is built, and served, for each app.
+
+The specs of each app, with their renderings and how they are to be served, are kept in an ``_OpenAPIState`` of their
+own (see ``_openapi_state``), along with what they were built from, so that ``openapi`` can bring them up to date with
+the app's routes.
+"""
+import asyncio
+import functools
+import mmap
+import threading
+import weakref
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import sanic
+import sanic.app
+import sanic.router
+
+from .doc import (
+    Components,
+    ExternalDocumentation,
+    Info,
+    OpenAPIv3,
+    Operation,
+    PathItem,
+    SecurityRequirement,
+    Server,
+)
+from .rendering import RenderedSpec
+
+DEFAULT_CACHE_CONTROL = "no-cache"
+DEFAULT_RETRY_AFTER = 5
+
+
+class _ClassifiedOperation(NamedTuple):
+    """An `Operation`, built only once, and how it is classified for the spec variants."""
+
+    method: str
+    operation: Operation
+    excluded: bool
+    static: bool
+    cloaked: bool
+
+
+class _ClassifiedPath(NamedTuple):
+    """A route of the app, with its classified operations."""
+
+    uri: str
+    uri_parsed: str
+    operations: List[_ClassifiedOperation]
+    path_items: Dict[Tuple[str, ...], PathItem]
+    """The `PathItem`s made for the spec variants, keyed by their methods, so that the variants can share them."""
+
+
+class _ClassifiedSpec(NamedTuple):
+    """Everything that the spec variants are made from, all from a single traversal of the app's routes."""
+
+    paths: List[_ClassifiedPath]
+    components: Components
+    info: Info
+    servers: List[Server]
+    security: List[SecurityRequirement]
+    external_docs: Optional[ExternalDocumentation]
+
+
+class _SpecSources(NamedTuple):
+    """What the specs were built from, so that `_update_openapi_specs` can bring them up to date with the routes."""
+
+    routes: Dict[str, sanic.router.Route]
+    """The app's routes, as they were when the specs were (last) built."""
+    routes_added: int
+    """How many routes had been added to the app's router, see `_routes_added`, when the `routes` were taken."""
+    classified: _ClassifiedSpec
+    hide_openapi_self: bool
+    operation_id_fn: Callable[[str, str, sanic.router.Route], str]
+    cloak_fn: Optional[Callable[[str, str, sanic.router.Route], bool]]
+    compression_level: int
+    processes: int
+    variants: Dict[str, Dict[str, bool]]
+    """How each of the variants is built from the classified spec, keyed like the `_OpenAPIState.rendered`."""
+    validate: bool
+    """Whether the trusted OObjects of the routes are validated when they are classified, see `trust_oobjects`."""
+
+
+def _track_routes(router: sanic.router.Router):
+    """
+    Count the routes as they are added to the router, however they are added: `app.add_route`, `app.route` and such,
+    and `app.blueprint`, all end up in `router.add`. The count is kept with the router, see `_routes_added`, so each app
+    has its own. The router is only wrapped once, however many times the specs are built.
+    """
+    if hasattr(router.add, "routes_added"):
+        return
+    add = router.add
+
+    @functools.wraps(add)
+    def tracked_add(*args, **kwargs):
+        try:
+            return add(*args, **kwargs)
+        finally:
+            tracked_add.routes_added += 1  # type: ignore
+
+    tracked_add.routes_added = 0  # type: ignore
+    router.add = tracked_add  # type: ignore
+
+
+def _routes_added(router: sanic.router.Router) -> int:
+    """
+    How many routes have been added to the router since `_track_routes`, so that a request can tell whether the specs
+    may be out of date without comparing all of the routes.
+    """
+    return getattr(router.add, "routes_added", 0)
+
+
+class _OpenAPIState:  # pylint: disable=too-many-instance-attributes, too-few-public-methods
+    """
+    What is built, and served, for one app: each app has its own, see `_openapi_state`, so that the specs of one app
+    are never served by another, nor kept from one app (or test) to the next.
+    """
+
+    def __init__(self):
+        self.specs: Dict[str, OpenAPIv3] = {}
+        """
+        The OAS specs that are served-up on request, keyed by `SPEC` (without the `cloaked` nor the `exclude`d
+        endpoints), `UNCLOAKED` (with the `cloaked` but not the `exclude`d ones) or `ALL` (with them all). See
+        `_build_openapi_variant` for how they are built. They are rendered, a piece at a time, straight into the
+        `rendered` bytes: use `as_yamlable_object` for their `yaml`-able form.
+        """
+
+        self.rendered: Dict[str, RenderedSpec] = {}
+        """
+        The pre-rendered JSON and YAML `bytes` of the `specs`, with the same keys. These are rendered once, by
+        `build_openapi_spec`, and then served as-is for every request.
+        """
+
+        self.shared: Optional[mmap.mmap] = None
+        """
+        The shared memory map of the `rendered` bytes, when they were built by `share_openapi_spec` in the main
+        process, rather than by `build_openapi_spec` in each worker.
+        """
+
+        self.cache_control = DEFAULT_CACHE_CONTROL
+        """The `Cache-Control` of the specs, from `app.config.OPENAPI_CACHE_CONTROL`."""
+
+        self.lazy_variants: Dict[str, Callable[[], None]] = {}
+        """
+        How to build each of the variants that are not built until they are first requested, with
+        `app.config.OPENAPI_LAZY_VARIANTS`, keyed like the `rendered`. Each is removed once it is built.
+        """
+
+        self.lazy_builds: Dict[str, "asyncio.Future[None]"] = {}
+        """The builds of the `lazy_variants` that are in progress, so that they are shared."""
+
+        self.lock = threading.Lock()
+        """Held while the variants, which share some of their objects, are built after the start, one at a time."""
+
+        self.build: Optional["asyncio.Future[None]"] = None
+        """
+        The build of the specs, when it is run in the background, with `app.config.OPENAPI_BACKGROUND_BUILD`. Until it
+        is done, the specs are answered with a `503`. See `openapi_spec_ready`.
+        """
+
+        self.retry_after = DEFAULT_RETRY_AFTER
+        """The `Retry-After` of those `503`s, from `app.config.OPENAPI_RETRY_AFTER`."""
+
+        self.sources: Optional[_SpecSources] = None
+        """
+        What the specs were built from, with `app.config.OPENAPI_TRACK_ROUTES`, so that only the routes that have been
+        added, changed or removed since are built again. See `_update_openapi_specs`.
+        """
+
+        self.update: Optional["asyncio.Future[None]"] = None
+        """
+        The update of the specs with the app's routes that is in progress, with `app.config.OPENAPI_TRACK_ROUTES`, so
+        that it is shared. See `_rendered_variant`.
+        """
+
+
+_STATES: "weakref.WeakKeyDictionary[sanic.app.Sanic, _OpenAPIState]" = weakref.WeakKeyDictionary()
+"""The `_OpenAPIState` of each app, for as long as the app is around."""
+
+
+def _openapi_state(app: sanic.app.Sanic) -> _OpenAPIState:
+    """The `_OpenAPIState` of the app, made on first use."""
+    state = _STATES.get(app)
+    if state is None:
+        state = _STATES[app] = _OpenAPIState()
+    return state
@@ -45,6 +45,8 @@ def openapi__mod_bp_doc():
         "sanic_openapi3e",
         "sanic_openapi3e.doc",
         "sanic_openapi3e.openapi",
+        "sanic_openapi3e.prebuilt",
+        "sanic_openapi3e.state",
     ):
         if t_unimport in sys.modules:
             del sys.modules[t_unimport]
@@ -55,10 +57,14 @@ def openapi__mod_bp_doc():
 
     # The teardown - so when each function that uses this fixture has finished, these
     # modules are uninstalled and thus they will be re-imported anew for the next use.
+    # What was built for the apps of the test is dropped with them.
+    sanic_openapi3e.state._STATES.clear()  # pylint: disable=protected-access
     for t_unimport in (
         "sanic_openapi3e",
         "sanic_openapi3e.doc",
         "sanic_openapi3e.openapi",
+        "sanic_openapi3e.prebuilt",
+        "sanic_openapi3e.state",
     ):
         del sys.modules[t_unimport]
 
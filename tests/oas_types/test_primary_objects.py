@@ -1,17 +1,28 @@
+import warnings
 from typing import Set
 
+import pytest
 import sanic.response
+import yaml
 from sanic import Sanic
 
 from sanic_openapi3e.oas_types import (
     Contact,
     ExternalDocumentation,
     License,
+    MediaType,
+    Parameter,
     PathItem,
     Paths,
+    Reference,
+    Response,
     Schema,
     SecurityRequirement,
     Tag,
+    merge_oobjects,
+    trust_oobjects,
+    validate_oobjects,
+    yamlable_object,
 )
 
 ########################################################################################################################
@@ -310,6 +321,47 @@ def test_pathitem():
     assert pi.x_exclude
 
 
+def test_paths_locked():
+    pi1, pi2, pi3 = PathItem(summary="1"), PathItem(summary="2"), PathItem(summary="3")
+    ps = Paths([("/b", pi1), ("/a", pi2), ("/b", pi3)])
+    assert ps.locked
+    assert len(ps) == 3
+    # The first wins for lookups, and the order (and duplicates) are kept for iteration.
+    assert ps["/b"] is pi1
+    assert list(ps) == [("/b", pi1), ("/a", pi2), ("/b", pi3)]
+    assert "/a" in ps
+    assert "/c" not in ps
+    with pytest.raises(KeyError):
+        _ = ps["/c"]
+    with pytest.raises(ValueError):
+        ps["/a"] = pi1
+
+
+def test_paths_unlocked():
+    def handler_1():
+        pass  # pragma: no cover
+
+    def handler_2():
+        pass  # pragma: no cover
+
+    ps = Paths()
+    assert not ps.locked
+    assert handler_1 not in ps
+    pi1 = ps[handler_1]
+    assert ps[handler_1] is pi1
+    pi2 = ps[handler_2]
+    assert handler_1 in ps
+    assert len(ps) == 2
+    assert list(ps) == [(handler_1, pi1), (handler_2, pi2)]
+
+    pi3 = PathItem(summary="3")
+    ps[handler_1] = pi3
+    assert ps[handler_1] is pi3
+    assert list(ps) == [(handler_1, pi3), (handler_2, pi2)]
+    with pytest.raises(KeyError):
+        ps["not-there"] = pi3
+
+
 def test_schema():
     assert Schema(_type="string").as_yamlable_object() == {
         "type": "string",
@@ -364,3 +416,202 @@ def test_sorted_tags():
     tags.add(Tag("nameB", "descB"))
     tags.add(Tag("nameA", "descA"))
     assert sorted(tags) == [Tag("nameA", "descA"), Tag("nameB", "descB")]
+
+
+def test_schema_intern():
+    schema = Schema(_type="integer", _format="int32", minimum=1)
+    interned = schema.intern()
+    assert interned is Schema(_type="integer", _format="int32", minimum=1).intern()
+    assert interned.x_frozen
+    assert not schema.x_frozen  # left as-is
+    assert interned.as_yamlable_object() == schema.as_yamlable_object()
+
+    # Only structurally equal schemas are shared, and `True` is not `1`.
+    assert Schema(_type="integer", _format="int32", minimum=2).intern() is not interned
+    assert Schema(_type="integer", _format="int32", minimum=True).intern() is not interned
+    assert Schema(_type="integer").intern() is Schema.Integer
+    assert Schema(_type="array", items=Schema(_type="string")).intern() is Schema.Strings
+
+    # Nested schemas are interned too.
+    obj = Schema(_type="object", properties={"an_id": Schema(_type="integer", _format="int32", minimum=1)}).intern()
+    assert obj.properties["an_id"] is interned
+
+    # A frozen schema holding schemas that are not yet interned is not modified: a copy of it is shared instead.
+    nested = Schema(_type="integer", _format="int64", minimum=3)
+    frozen = Schema(_type="array", items=nested, x_frozen=True)
+    interned_frozen = frozen.intern()
+    assert interned_frozen is not frozen
+    assert frozen.items is nested
+    assert interned_frozen.items is nested.intern()
+    assert interned_frozen.as_yamlable_object() == frozen.as_yamlable_object()
+
+    # Values that cannot be compared structurally are not interned.
+    odd = Schema(_type="string", example={"a", "set"})
+    assert odd.intern() is odd
+
+    # Nor are schemas that are found within themselves.
+    node = Schema(_type="object", description="A node")
+    node.properties = {"children": Schema(_type="array", items=node), "parent": node}
+    assert node.intern() is node
+    tree = Schema(
+        _type="object", properties={"root": node, "an_id": Schema(_type="integer", _format="int32", minimum=1)}
+    )
+    assert tree.intern() is tree
+
+
+def test_merge_oobjects():
+    route_parameter = Parameter(name="an_id", _in="path", required=True, schema=Schema.Integer)
+    annotation = Parameter(
+        name="an_id",
+        _in="path",
+        description="An ID",
+        required=True,
+        schema=Schema(_type="integer", _format="int32", minimum=4, properties={"a": Schema(description="A")}),
+    )
+    merged = route_parameter + annotation
+    assert merged.as_yamlable_object() == {
+        "name": "an_id",
+        "in": "path",
+        "description": "An ID",
+        "required": True,
+        "schema": {"type": "integer", "format": "int32", "minimum": 4, "properties": {"a": {"description": "A"}}},
+    }
+    # Neither side is modified, and whatever the merge did not change is shared.
+    assert route_parameter.description is None
+    assert Schema.Integer.as_yamlable_object() == {"type": "integer"}
+    assert merged.schema.properties is annotation.schema.properties
+
+    # Recursively: OObjects field by field, and dicts key by key.
+    deeper = Schema(_type="integer", properties={"a": Schema(_type="string"), "b": Schema.String})
+    schema = merge_oobjects(annotation.schema, deeper)
+    assert schema.as_yamlable_object()["properties"] == {
+        "a": {"type": "string", "description": "A"},
+        "b": {"type": "string"},
+    }
+    assert merge_oobjects(annotation.schema, Schema(_type="integer")) is annotation.schema
+
+    # A `False` is set, and so a `False` in the annotation is kept.
+    merged = route_parameter + Parameter(name="an_id", _in="path", required=True, explode=False, allow_reserved=False)
+    assert merged.as_yamlable_object() == {
+        "name": "an_id",
+        "in": "path",
+        "required": True,
+        "explode": False,
+        "allowReserved": False,
+        "schema": {"type": "integer"},
+    }
+
+    # A merged copy of a frozen Schema is not frozen, unlike the shared constant that it was copied from.
+    route_parameter = Parameter(name="an_id", _in="path", required=True, schema=Schema.Integer)
+    merged = route_parameter + Parameter(
+        name="an_id", _in="path", required=True, schema=Schema(_type="integer", description="An ID")
+    )
+    merged.schema.add_enum([1, 2])
+    assert merged.schema.as_yamlable_object() == {"type": "integer", "description": "An ID", "enum": [1, 2]}
+    assert Schema.Integer.x_frozen and Schema.Integer.as_yamlable_object() == {"type": "integer"}
+
+    # A reference replaces, and what is set on both sides must otherwise agree.
+    reference = Reference("#/components/schemas/an_id")
+    assert (route_parameter + Parameter(name="an_id", _in="path", required=True, schema=reference)).schema is reference
+    with pytest.raises(AssertionError, match="schema._type: integer != string"):
+        _ = route_parameter + Parameter(name="an_id", _in="path", required=True, schema=Schema.String)
+    with pytest.raises(AssertionError, match="explode: True != False"):
+        _ = Parameter(name="an_id", _in="path", required=True, explode=True) + Parameter(
+            name="an_id", _in="path", required=True, explode=False
+        )
+
+    # An empty string sets nothing.
+    described = Parameter(name="an_id", _in="path", required=True, description="An ID")
+    merged = described + Parameter(name="an_id", _in="path", required=True, description="")
+    assert merged is described
+
+
+def test_trusted_oobjects_validated_in_bulk():
+    with pytest.raises(AssertionError):
+        Parameter(name="an_id", _in="path", required=False)
+
+    trust_oobjects()
+    try:
+        # Not validated as it is made ...
+        parameter = Parameter(name="an_id", _in="path", required=False, schema=Schema(_type="integer", minimum=1))
+        response = Response(description="OK", content={"application/json": "not a MediaType"})
+    finally:
+        trust_oobjects(False)
+
+    # ... but in bulk, wherever it is, and as its constructor would have.
+    with pytest.raises(AssertionError):
+        validate_oobjects(PathItem(parameters=[parameter]))
+    with pytest.raises(AssertionError):
+        validate_oobjects({"200": response})
+    validate_oobjects([Parameter(name="an_id", _in="path", required=True, schema=Schema.Integer)])
+
+    # What was warned about as it was made is not warned about again.
+    with pytest.warns(UserWarning, match="A MediaType without a schema"):
+        response = Response(description="OK", content={"application/json": MediaType()})
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        validate_oobjects(response)
+    assert not caught
+
+
+def test_frozen_objects_yamlable_form_made_once():
+    assert yamlable_object(Schema.Strings) is yamlable_object(Schema.Strings)
+    assert yamlable_object(Schema.Strings, sort=True) == yamlable_object(Schema.Strings)
+    assert yamlable_object(Response.DEFAULT_SUCCESS) is yamlable_object(Response.DEFAULT_SUCCESS)
+
+    # Any object can be frozen.
+    reference = Reference("#/components/schemas/an_id")
+    assert yamlable_object(reference) is not yamlable_object(reference)
+    reference.freeze()
+    assert yamlable_object(reference) is yamlable_object(reference)
+    assert reference.as_yamlable_object() == {"$ref": "#/components/schemas/an_id"}
+
+    # A clone of a frozen schema is not frozen, and does not keep the old form.
+    frozen = Schema(_type="integer", x_frozen=True)
+    assert frozen.as_yamlable_object() == {"type": "integer"}
+    clone = frozen.clone()
+    clone.minimum = 1
+    assert clone.as_yamlable_object() == {"type": "integer", "minimum": 1}
+    assert "_frozen_yamlable" not in dict(clone._fields())  # pylint: disable=protected-access
+
+
+def test_schema_yamlable_cycles_and_depth():
+    # A self-referencing schema is given as a `$ref` to where it was first found.
+    node = Schema(_type="object", description="A node")
+    node.properties = {"children": Schema(_type="array", items=node), "parent": node}
+    assert node.as_yamlable_object() == {
+        "type": "object",
+        "description": "A node",
+        "properties": {"children": {"type": "array", "items": {"$ref": "#"}}, "parent": {"$ref": "#"}},
+        "additionalProperties": True,
+    }
+    tree = yamlable_object({"a/b": {"node": node}}, pointer="#/components/schemas")
+    assert tree["a/b"]["node"]["properties"]["parent"] == {"$ref": "#/components/schemas/a~1b/node"}
+
+    # Shared schemas are made yaml-able once, and shared.
+    shared = Schema(_type="string", _format="uuid")
+    pair = yamlable_object(Schema(_type="object", properties={"one": shared, "two": shared}))
+    assert pair["properties"]["one"] is pair["properties"]["two"]
+
+
+def test_public_yamlable_form_not_shared():
+    # The public `yaml`-able form shares nothing, so `yaml.dump` gives no anchors and aliases, and it can be modified.
+    shared = Schema(_type="string", _format="uuid")
+    pair = Schema(_type="object", properties={"one": shared, "two": shared, "three": Schema.Strings})
+    yamlable = pair.as_yamlable_object()
+    assert yamlable["properties"]["one"] == yamlable["properties"]["two"]
+    assert yamlable["properties"]["one"] is not yamlable["properties"]["two"]
+    assert "&id" not in yaml.dump(yamlable)
+
+    yamlable["properties"]["three"]["items"]["minLength"] = 1
+    assert Schema.Strings.as_yamlable_object() == {"type": "array", "items": {"type": "string"}}
+    assert Response.DEFAULT_SUCCESS.as_yamlable_object() is not Response.DEFAULT_SUCCESS.as_yamlable_object()
+
+    # Any depth of nesting is fine.
+    deep = Schema.String
+    for _ in range(10_000):
+        deep = Schema(_type="array", items=deep)
+    yamlable = deep.as_yamlable_object()
+    for _ in range(10_000):
+        yamlable = yamlable["items"]
+    assert yamlable == {"type": "string"}
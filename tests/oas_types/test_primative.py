@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 import sanic_openapi3e
@@ -26,3 +28,98 @@ def test_asserts():
 )
 def test_openapi_keyname(key: str, expected: str):
     assert sanic_openapi3e.oas_types.openapi_keyname(key) == expected
+
+
+def test_parse_sanic_uri():
+    uri_template = sanic_openapi3e.oas_types.parse_sanic_uri("/items/<an_id:int>/<slug:[a-z]+>/price/<price:number>")
+    assert uri_template.segments == ("/items/", "/", "/price/", "")
+    assert uri_template.parameter_names == ("an_id", "slug", "price")
+    assert uri_template.parameter_casts == (int, str, float)
+    assert uri_template.oas_uri == "/items/{an_id}/{slug}/price/{price}"
+    assert uri_template.operation_id_uri == "/items/an_id/slug/price/price"
+
+    # Parsed once, then cached.
+    assert sanic_openapi3e.oas_types.parse_sanic_uri("/items/<an_id:int>/<slug:[a-z]+>/price/<price:number>") is (
+        uri_template
+    )
+
+    # Parameter names that are prefixes of others are not confused.
+    uri_template = sanic_openapi3e.oas_types.parse_sanic_uri("/<id>/<id_2>")
+    assert uri_template.oas_uri == "/{id}/{id_2}"
+    assert sanic_openapi3e.oas_types.default_operation_id_fn("get", "/<id>/<id_2>", None) == "GET~~~id~id_2"
+
+    uri_template = sanic_openapi3e.oas_types.parse_sanic_uri("/no/parameters")
+    assert uri_template.segments == ("/no/parameters",)
+    assert uri_template.oas_uri == uri_template.operation_id_uri == "/no/parameters"
+
+
+def test_oobjects_are_slotted():
+    schema = sanic_openapi3e.oas_types.Schema(_type="integer", minimum=4, description="Minimum value: 4")
+    assert not hasattr(schema, "__dict__")
+    with pytest.raises(AttributeError):
+        schema.not_a_field = True
+
+    # Serialized in the order of the fields, not of the arguments.
+    parameter = sanic_openapi3e.oas_types.Parameter(schema=schema, _in="query", description="An ID", name="an_id")
+    assert list(parameter.as_yamlable_object()) == ["name", "description", "in", "required", "schema"]
+
+    clone = schema.clone()
+    assert clone is not schema
+    assert clone.as_yamlable_object() == schema.as_yamlable_object()
+
+    # The dict-like OObjects keep their `__dict__`.
+    responses = sanic_openapi3e.oas_types.Responses(
+        {"200": sanic_openapi3e.oas_types.Response(description="OK")}, no_defaults=True
+    )
+    responses["201"] = sanic_openapi3e.oas_types.Response(description="Created")
+    assert responses.as_yamlable_object() == {"200": {"description": "OK"}, "201": {"description": "Created"}}
+
+
+def test_compiled_serializers_match_the_generic_one(monkeypatch):
+    oas_types = sanic_openapi3e.oas_types
+    int_min_4 = oas_types.Schema(
+        _type="integer", _format="int32", minimum=4, exclusive_minimum=False, read_only=True, deprecated=False
+    )
+    schema = oas_types.Schema(
+        title="An object",
+        _type="object",
+        required=["b_prop", "a_prop"],
+        properties={"b_prop": int_min_4, "a_prop": oas_types.Schema.Strings, "ref": oas_types.Reference("#/x")},
+        nullable=False,
+        example={"b_prop": 4, "a_prop": ["a"]},
+    )
+    example = oas_types.Example(summary="An example", value=0)
+    parameter = oas_types.Parameter(
+        name="an_id", _in="query", required=False, deprecated=True, schema=int_min_4, examples={"ex": example}
+    )
+    operation = oas_types.Operation(
+        operation_id="GET~~~an_id",
+        summary="",
+        parameters=[parameter, oas_types.Reference("#/components/parameters/p")],
+        responses=oas_types.Responses({200: oas_types.Response(description="OK")}),
+        security=[],
+        tags=["b", "a"],
+    )
+    components = oas_types.Components(
+        schemas={"z": schema, "a": int_min_4},
+        parameters={"p": parameter},
+        examples={"ex": example},
+        security_schemes={"api_key": oas_types.SecurityScheme(_type="apiKey", name="api_key", _in="header")},
+    )
+    spec = oas_types.OpenAPIv3(
+        openapi=oas_types.OpenAPIv3.version,
+        info=oas_types.Info(title="API", version="v1"),
+        paths=oas_types.Paths([("/an/{an_id}", oas_types.PathItem(get=operation, parameters=[parameter]))]),
+        components=components,
+        security=[oas_types.SecurityRequirement({"api_key": []})],
+    )
+    compiled = json.dumps(spec.as_yamlable_object())
+    compiled_sorted = json.dumps(schema.as_yamlable_object(sort=True))
+
+    monkeypatch.setattr(oas_types, "_YAMLABLE_SERIALIZERS", {})
+    monkeypatch.setattr(oas_types, "_compile_yamlable_serializer", lambda clazz: oas_types._generic_yamlable_serializer)
+    assert json.dumps(spec.as_yamlable_object()) == compiled
+    assert json.dumps(schema.as_yamlable_object(sort=True)) == compiled_sorted
+    assert '"security": []' in compiled
+    assert '"deprecated": true' in compiled
+    assert "exclusiveMinimum" not in compiled
@@ -52,6 +52,33 @@ def test_json_spec_00(openapi__mod_bp_doc):
     run_asserts(response, expected)
 
 
+def test_json_spec_00_trusted(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+
+    def build(sanic_name: str):
+        app = create_medium_sized_app_00(sanic_name, doc, openapi_blueprint)
+        app.config.SHOW_OPENAPI_EXCLUDED = True
+
+        @app.get("/test/24/search")
+        @doc.parameter(name="q", _in="query", schema=doc.Schema.String)  # <<-- `required` is normalised to False
+        @doc.parameter(name="limit", _in="query", schema=doc.Schema.Integer, explode=False)
+        def search(_):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        openapi.build_openapi_spec(app, None)
+        # pylint: disable=protected-access
+        return {variant: rendered.json for variant, rendered in openapi._openapi_state(app).rendered.items()}
+
+    validated = build("test_json_spec_00_validated")
+    assert b'"name":"q","in":"query","required":false' in validated[openapi.SPEC]
+
+    doc.trust_oobjects()
+    try:
+        assert build("test_json_spec_00_trusted") == validated
+    finally:
+        doc.trust_oobjects(False)
+
+
 def create_medium_sized_app_00(sanic_name: str, doc, openapi_blueprint):
     app = Sanic(sanic_name, strict_slashes=strict_slashes)
     app.config.OPENAPI_OPERATION_ID_FN = sanic_openapi3e.oas_types.camel_case_operation_id_fn
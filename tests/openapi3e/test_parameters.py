@@ -10,32 +10,36 @@ import sanic_openapi3e.oas_types
 from tests.conftest import null, run_asserts, strict_slashes, true
 
 
-@pytest.mark.asyncio
-async def test_param_cannot_be_in_multiple_places(openapi__mod_bp_doc):
+def test_param_in_multiple_places(openapi__mod_bp_doc):
+    # A parameter is identified by its (name, in): `an_id` can be both in the `path` and in the `query`.
     openapi, openapi_blueprint, doc = openapi__mod_bp_doc
 
-    app = Sanic("test_param_cannot_be_in_multiple_places", strict_slashes=strict_slashes)
+    app = Sanic("test_param_in_multiple_places", strict_slashes=strict_slashes)
+    state = openapi._openapi_state(app)
     app.blueprint(openapi_blueprint)
-    with pytest.raises(AssertionError):
 
-        @app.get("/test/699/some_ids/<an_id:int>")
-        @doc.parameter(
-            name="an_id", description="An ID", required=True, choices=[0, 2, 4, 8, 16], _in="path",
-        )
-        @doc.parameter(
-            name="an_id",
-            description="An ID",
-            required=True,
-            choices=[1, 3, 5, 7, 11, 13],
-            _in="query",  # <<-- item under test. `an_id` cannot be in `query` as it is already in `path` (above)
-            schema=sanic_openapi3e.oas_types.Schema.Integers,
-        )
-        async def test_some_ids(req, an_id):
-            return sanic.response.json(locals())  # pragma: no cover
+    @app.get("/test/699/some_ids/<an_id:int>")
+    @doc.parameter(
+        name="an_id", description="An ID", required=True, choices=[0, 2, 4, 8, 16], _in="path",
+    )
+    @doc.parameter(
+        name="an_id",
+        description="An ID",
+        required=True,
+        choices=[1, 3, 5, 7, 11, 13],
+        _in="query",  # <<-- item under test. Not merged into the `an_id` in the `path` (above), but added.
+        schema=sanic_openapi3e.oas_types.Schema.Integers,
+    )
+    async def test_some_ids(req, an_id):
+        return sanic.response.json(locals())  # pragma: no cover
 
-        _, response = await app.test_client.get("/openapi/spec.json")
-    if app:
-        app.stop()
+    openapi.build_openapi_spec(app, None)
+    # pylint: disable=protected-access
+    spec = state.specs[openapi.SPEC].as_yamlable_object()
+    parameters = spec["paths"]["/test/699/some_ids/{an_id}"]["get"]["parameters"]
+    assert [(p["name"], p["in"]) for p in parameters] == [("an_id", "path"), ("an_id", "query")]
+    assert parameters[0]["schema"] == {"type": "integer", "enum": [0, 2, 4, 8, 16]}
+    assert parameters[1]["schema"]["enum"] == [1, 3, 5, 7, 11, 13]
 
 
 def test_param_in_query(openapi__mod_bp_doc):
@@ -413,3 +417,128 @@ def test_path_params_w_reference_schema_and_choices(openapi__mod_bp_doc):
         def test_id2(_, an_id: int):  # pragma: no cover
             # `pragma: no cover` as the ValueError is raised during import of this module, before the method is defined.
             return sanic.response.json(locals())
+
+
+def test_parameter_schemas_interned(openapi__mod_bp_doc):
+    _, _, doc = openapi__mod_bp_doc
+    int_min_1 = doc.Schema(_type="integer", _format="int32", minimum=1)
+    doc.intern_schemas()
+    try:
+
+        def get_items(_):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        def get_other_items(_):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        for handler in (get_items, get_other_items):
+            doc.parameter(name="limit", _in="query", schema=doc.Schema(_type="integer", _format="int32", minimum=1))(
+                handler
+            )
+            doc.parameter(name="day", _in="query", choices=["Mon", "Tue"])(handler)
+            doc.parameter(name="offset", _in="query", schema=int_min_1, choices=[1, 2])(handler)
+    finally:
+        doc.intern_schemas(False)
+
+    items = doc.endpoints[get_items].parameters
+    other_items = doc.endpoints[get_other_items].parameters
+    assert [p.schema for p in items] == [p.schema for p in other_items]
+    assert items[0].schema is int_min_1.intern()
+    assert items[1].schema.as_yamlable_object() == {"enum": ["Mon", "Tue"], "type": "string"}
+    assert items[2].schema.as_yamlable_object() == {"enum": [1, 2], "format": "int32", "minimum": 1, "type": "integer"}
+    assert not int_min_1.x_frozen
+
+
+def test_parameter_schema_description_upgrade_shares_schema(openapi__mod_bp_doc):
+    openapi, _, doc = openapi__mod_bp_doc
+    components = doc.Components(schemas={"limit": doc.Schema(_type="integer", minimum=1, description="How many")})
+    examples = {"one": doc.Example(value=1)}
+    parameter = doc.Parameter(
+        name="limit", _in="query", schema=doc.Reference("#/components/schemas/limit"), examples=examples
+    )
+    parameter.freeze()
+    expected = parameter.as_yamlable_object()
+
+    # pylint: disable=protected-access
+    upgraded = openapi._upgrade_parameter_schema_description(parameter, components)
+    assert upgraded is not parameter
+    assert upgraded.schema is parameter.schema
+    assert upgraded.examples is parameter.examples
+    assert upgraded.as_yamlable_object() == {**expected, "description": "How many"}
+    assert parameter.description is None
+    assert parameter.as_yamlable_object() == expected
+
+
+def test_route_parameters_merged_once(openapi__mod_bp_doc):
+    openapi, _, doc = openapi__mod_bp_doc
+
+    @doc.parameter(name="an_id", description="An ID", _in="path", schema=doc.Schema(_type="integer", minimum=4))
+    def get_item(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    # pylint: disable=protected-access
+    route_parameters, _ = openapi._build_openapi_paths_routeparameters_and_uri("/items/<an_id:int>")
+    other_route_parameters, _ = openapi._build_openapi_paths_routeparameters_and_uri("/other/<an_id:int>")
+    assert route_parameters == other_route_parameters
+
+    assert route_parameters[0].is_frozen()
+
+    # The annotations of `doc.parameter` are frozen, and so are merged once.
+    path_item = doc.endpoints[get_item]
+    assert path_item.parameters[0].is_frozen()
+    parameters = openapi._build_openapi_paths_opparameters(path_item, route_parameters, doc.Components())
+    other_parameters = openapi._build_openapi_paths_opparameters(path_item, other_route_parameters, doc.Components())
+    assert parameters[0] is other_parameters[0]
+    assert parameters[0].schema.as_yamlable_object() == {"type": "integer", "minimum": 4}
+    assert route_parameters[0].schema is doc.Schema.Integer
+
+    # Any other annotation may be modified between builds, and so is merged again each time.
+    path_item.parameters[0] = doc.Parameter(name="an_id", _in="path", required=True, schema=doc.Schema(minimum=4))
+    parameters = openapi._build_openapi_paths_opparameters(path_item, route_parameters, doc.Components())
+    path_item.parameters[0].schema.minimum = 5
+    other_parameters = openapi._build_openapi_paths_opparameters(path_item, other_route_parameters, doc.Components())
+    assert other_parameters[0].schema.as_yamlable_object() == {"type": "integer", "minimum": 5}
+
+
+def test_parameter_documented_once(openapi__mod_bp_doc):
+    openapi, _, doc = openapi__mod_bp_doc
+
+    @doc.parameter(name="limit", _in="query", schema=doc.Schema.Integer)
+    @doc.parameter(name="limit", _in="header", schema=doc.Schema.Integer)
+    def get_items(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    @doc.parameter(name="limit", _in="query", schema=doc.Schema.Integer)
+    @doc.parameter(name="limit", _in="query", schema=doc.Schema.String)
+    def get_other_items(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    # pylint: disable=protected-access
+    parameters = openapi._build_openapi_paths_opparameters(doc.endpoints[get_items], [], doc.Components())
+    assert [(p.name, p._in) for p in parameters] == [("limit", "header"), ("limit", "query")]
+    with pytest.raises(AssertionError, match="The `limit` parameter in `query` is documented more than once."):
+        openapi._build_openapi_paths_opparameters(doc.endpoints[get_other_items], [], doc.Components())
+
+
+def test_trusted_parameters_validated_when_built(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = Sanic("test_trusted_parameters_validated_when_built", strict_slashes=strict_slashes)
+    state = openapi._openapi_state(app)
+    app.blueprint(openapi_blueprint)
+
+    doc.trust_oobjects()
+    try:
+
+        @app.get("/test/24/items")
+        @doc.parameter(name="limit", _in="query", schema=doc.Schema.Integer, style=1)  # <<-- not a str
+        def get_items(_):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        with pytest.raises(TypeError, match="Parameter.style"):
+            openapi.build_openapi_spec(app, None)
+
+        app.config.OPENAPI_VALIDATE_SPECS = False
+        openapi.build_openapi_spec(app, None)
+        assert state.specs[openapi.SPEC].paths  # pylint: disable=protected-access
+    finally:
+        doc.trust_oobjects(False)
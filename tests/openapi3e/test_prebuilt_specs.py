@@ -0,0 +1,236 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+import sanic.response
+from sanic import Sanic
+
+from tests.conftest import strict_slashes
+
+APP_MODULE = """
+import sanic.response
+from sanic import Sanic
+
+from sanic_openapi3e import doc, openapi_blueprint
+
+app = Sanic("prebuilt_app", strict_slashes=True)
+app.blueprint(openapi_blueprint)
+
+
+@app.get("/test/11/anId/<an_id:int>")
+@doc.summary("A summary")
+def test_id(_, an_id: int):
+    return sanic.response.json(locals())
+
+
+@app.get("/test/11/excluded")
+@doc.exclude()
+def test_excluded(_):
+    return sanic.response.json(locals())
+"""
+
+
+def test_build_cli(tmp_path: pathlib.Path):
+    (tmp_path / "prebuilt_app.py").write_text(APP_MODULE)
+    env = dict(os.environ, PYTHONPATH=str(pathlib.Path(__file__).absolute().parents[2]))
+    completed = subprocess.run(
+        [sys.executable, "-m", "sanic_openapi3e", "build", "prebuilt_app:app", "--out", "dist"],
+        cwd=str(tmp_path),
+        env=env,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    dist = tmp_path / "dist"
+    manifest = json.loads((dist / "manifest.json").read_text())
+    assert sorted(manifest["files"]) == sorted(
+        variant + suffix + encoding
+        for variant in ("spec", "uncloaked", "spec.all")
+        for suffix in (".json", ".yml")
+        for encoding in ("", ".gz", ".zz")
+    )
+    for file_name, digest in manifest["files"].items():
+        assert "{}  {}".format(digest, os.path.join("dist", file_name)) in completed.stdout.decode()
+    assert list(json.loads((dist / "spec.json").read_bytes())["paths"]) == ["/test/11/anId/{an_id}"]
+    assert "/test/11/excluded" in json.loads((dist / "spec.all.json").read_bytes())["paths"]
+
+
+def test_build_cli_fails(tmp_path: pathlib.Path):
+    # The route's `int` parameter is documented as a string, which the build rejects.
+    app_module = APP_MODULE.replace('@doc.summary("A summary")', '@doc.parameter(name="an_id", _in="path")')
+    (tmp_path / "prebuilt_app.py").write_text(app_module)
+    env = dict(os.environ, PYTHONPATH=str(pathlib.Path(__file__).absolute().parents[2]))
+    completed = subprocess.run(
+        [sys.executable, "-m", "sanic_openapi3e", "build", "prebuilt_app:app", "--out", "dist"],
+        cwd=str(tmp_path),
+        env=env,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    assert completed.returncode == 1
+    assert "Cannot build the specs of prebuilt_app:app" in completed.stderr.decode()
+    assert "Traceback" not in completed.stderr.decode()
+
+
+def test_serve_prebuilt_specs(openapi__mod_bp_doc, tmp_path: pathlib.Path):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = Sanic("test_serve_prebuilt_specs", strict_slashes=strict_slashes)
+    state = openapi._openapi_state(app)
+    app.blueprint(openapi_blueprint)
+
+    @app.get("/test/11/anId/<an_id:int>")
+    @doc.summary("A summary")
+    def test_id(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    digests = openapi.write_openapi_specs(app, str(tmp_path))
+    built = state.rendered[openapi.SPEC]
+
+    # A route added after the build is not in the prebuilt specs, as they are not built again.
+    @app.get("/test/11/added")
+    def test_added(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    app.config.OPENAPI_PREBUILT_SPECS = str(tmp_path)
+    _, response = app.test_client.get("/openapi/spec.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status == 200
+    assert response.body == (tmp_path / "spec.json").read_bytes() == built.json
+    assert response.headers["ETag"] == '"{}-gzip"'.format(digests["spec.json"])
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    # Without `SHOW_OPENAPI_EXCLUDED`, there is still no spec.all
+    _, response = app.test_client.get("/openapi/spec.all.json")
+    assert response.status == 404
+
+    # The files that are served must be the ones that were built.
+    (tmp_path / "uncloaked.yml").write_bytes(b"openapi: 3.0.2\n")
+    with pytest.raises(ValueError, match="uncloaked.yml"):
+        openapi.build_openapi_spec(app, None)
+
+
+def test_spec_cache_dir(openapi__mod_bp_doc, tmp_path: pathlib.Path):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = Sanic("test_spec_cache_dir", strict_slashes=strict_slashes)
+    state = openapi._openapi_state(app)
+    app.blueprint(openapi_blueprint)
+    app.config.OPENAPI_CACHE_DIR = str(tmp_path)
+
+    @doc.summary("A summary")
+    def test_id(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    app.add_route(test_id, "/test/11/anId/<an_id:int>")
+
+    # Built, and cached, on the first start...
+    openapi.build_openapi_spec(app, None)
+    built = state.rendered[openapi.SPEC]
+    (cached,) = tmp_path.iterdir()
+    assert cached.name == openapi.fingerprint_openapi_specs(app)
+    assert (cached / "spec.json").read_bytes() == built.json
+
+    # ... and read, memory-mapped, from the cache on the next ones.
+    openapi.build_openapi_spec(app, None)
+    assert isinstance(state.rendered[openapi.SPEC].json, memoryview)
+    assert state.rendered[openapi.SPEC].etags == built.etags
+    _, response = app.test_client.get("/openapi/spec.json")
+    assert response.status == 200
+    assert response.body == built.json
+
+    # Anything that the specs are built from changes the fingerprint, so they are built again.
+    fingerprints = {cached.name}
+    for change in (
+        lambda: doc.description("A description")(test_id),
+        lambda: app.config.update({"OPENAPI_CLOAK_FN": lambda method, uri, route: False}),
+        lambda: app.add_route(test_id, "/test/11/other/<an_id:int>"),
+        lambda: app.config.update({"OPENAPI_CLOAK_FN": lambda method, uri, route: "anId" in uri}),
+    ):
+        change()
+        fingerprint = openapi.fingerprint_openapi_specs(app)
+        assert fingerprint not in fingerprints
+        fingerprints.add(fingerprint)
+        openapi.build_openapi_spec(app, None)
+        assert (tmp_path / fingerprint / "manifest.json").exists()
+        assert isinstance(state.rendered[openapi.SPEC].json, bytes)
+    assert "/test/11/other/{an_id}" in json.loads(state.rendered[openapi.SPEC].json)["paths"]
+    assert "anId" not in state.rendered[openapi.SPEC].json.decode()
+
+
+def _sha256_of_spec(openapi, app, queue):
+    state = openapi._openapi_state(app)
+    queue.put((isinstance(state.rendered[openapi.SPEC].json, memoryview), not state.specs))
+    queue.put(hashlib.sha256(state.rendered[openapi.SPEC].json).hexdigest())
+
+
+def test_share_spec(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = Sanic("test_share_spec", strict_slashes=strict_slashes)
+    state = openapi._openapi_state(app)
+    app.blueprint(openapi_blueprint)
+
+    @doc.summary("A summary")
+    def test_id(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    app.add_route(test_id, "/test/11/anId/<an_id:int>")
+
+    # Only built in the main process when asked to.
+    openapi.share_openapi_spec(app, None)
+    assert state.shared is None
+    assert not state.rendered
+
+    app.config.OPENAPI_SHARE_SPECS = True
+    openapi.share_openapi_spec(app, None)
+    assert isinstance(state.shared, openapi.mmap.mmap)
+    assert not state.specs
+    built = state.rendered[openapi.SPEC]
+    assert isinstance(built.json, memoryview)
+    assert built.etags["json", "identity"] == '"{}"'.format(hashlib.sha256(built.json).hexdigest())
+
+    # A forked worker serves the very same bytes, without building them again.
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    worker = context.Process(target=_sha256_of_spec, args=(openapi, app, queue))
+    worker.start()
+    assert queue.get(timeout=30) == (True, True)
+    assert queue.get(timeout=30) == hashlib.sha256(built.json).hexdigest()
+    worker.join(timeout=30)
+
+    # A route added after the build is not in the shared specs, as the workers do not build them again.
+    app.add_route(test_id, "/test/11/added/<an_id:int>")
+    _, response = app.test_client.get("/openapi/spec.json")
+    assert response.status == 200
+    assert response.body == built.json
+    assert list(json.loads(response.body)["paths"]) == ["/test/11/anId/{an_id}"]
+    assert state.rendered[openapi.SPEC] is built
+
+
+def test_share_spec_not_shared(openapi__mod_bp_doc, monkeypatch):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = Sanic("test_share_spec_not_shared", strict_slashes=strict_slashes)
+    state = openapi._openapi_state(app)
+    app.blueprint(openapi_blueprint)
+    app.config.OPENAPI_SHARE_SPECS = True
+
+    @app.get("/test/11/anId/<an_id:int>")
+    @doc.summary("A summary")
+    def test_id(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    warnings = []
+    monkeypatch.setattr(openapi.logger, "warning", warnings.append)
+
+    # Where `share_openapi_spec` was not called, or could not share the specs, each worker builds its own, and says so.
+    monkeypatch.delattr(openapi.mmap, "MAP_SHARED")
+    openapi.share_openapi_spec(app, None)
+    assert state.shared is None
+    assert not state.rendered
+    openapi.build_openapi_spec(app, None)
+    assert state.shared is None
+    assert isinstance(state.rendered[openapi.SPEC].json, bytes)
+    assert len(warnings) == 1
+    assert "share_openapi_spec" in warnings[0]
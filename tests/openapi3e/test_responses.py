@@ -1,9 +1,11 @@
 from typing import Dict, List, Optional, Union
 
+import pytest
 import sanic.request
 import sanic.response
 from sanic import Sanic
 
+from sanic_openapi3e.oas_types import yamlable_object
 from tests.conftest import false, run_asserts, strict_slashes, true
 
 
@@ -178,3 +180,27 @@ def test_multiple_responses(openapi__mod_bp_doc):
     }
 
     run_asserts(response, expected)
+
+
+def test_default_responses_shared(openapi__mod_bp_doc):
+    """Test that the default responses are shared until a handler documents one of its own."""
+    _, _, doc = openapi__mod_bp_doc
+
+    def get_items(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    @doc.response(201, "Created")
+    def post_items(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    assert doc.endpoints[get_items].x_responses_holder is doc.Responses.DEFAULT
+    responses = doc.endpoints[post_items].x_responses_holder
+    assert responses is not doc.Responses.DEFAULT
+    assert list(responses) == ["200", "400", "404", "500", "201"]
+    assert all(responses[key] is doc.Responses.DEFAULT[key] for key in doc.Responses.DEFAULT)
+    assert list(doc.Responses.DEFAULT) == ["200", "400", "404", "500"]
+
+    # The shared default responses are made `yaml`-able only once, and cannot be modified.
+    assert yamlable_object(doc.Responses.DEFAULT) is yamlable_object(doc.Responses.DEFAULT)
+    with pytest.raises(AssertionError):
+        doc.Responses.DEFAULT["201"] = doc.Response(description="Created")
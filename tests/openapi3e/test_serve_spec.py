@@ -0,0 +1,591 @@
+import asyncio
+import gzip
+import json
+import threading
+import types
+import zlib
+
+import pytest
+import sanic
+import sanic.response
+import yaml
+from sanic import Sanic
+
+from sanic_openapi3e import rendering
+from tests.conftest import strict_slashes
+
+
+def create_simple_app(sanic_name: str, doc, openapi_blueprint):
+    app = Sanic(sanic_name, strict_slashes=strict_slashes)
+    app.blueprint(openapi_blueprint)
+
+    @app.get("/test/10/anId/<an_id:int>")
+    @doc.summary("A summary")
+    @doc.parameter(name="an_id", description="An ID", required=True, _in="path", schema=doc.Schema.Integer)
+    def test_id(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    @app.get("/test/10/cloaked")
+    @doc.summary("A cloaked route")
+    def test_cloaked(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    app.config.OPENAPI_CLOAK_FN = lambda method, uri, route: uri.endswith("cloaked")
+    return app
+
+
+@pytest.mark.asyncio
+async def test_spec_is_rendered_once(openapi__mod_bp_doc, monkeypatch):
+    openapi, _, _ = openapi__mod_bp_doc
+    rendered = openapi.RenderedSpec({"openapi": "3.0.2", "info": {"title": "API", "version": "v1.0.0"}})
+
+    def _no_more_rendering(*args, **kwargs):
+        raise AssertionError("The spec should not be re-rendered per request.")  # pragma: no cover
+
+    monkeypatch.setattr(yaml, "dump", _no_more_rendering)
+    monkeypatch.setattr(sanic.response, "json", _no_more_rendering)
+
+    app = Sanic("test_spec_is_rendered_once", strict_slashes=strict_slashes)
+    request = types.SimpleNamespace(app=app, headers={"Accept-Encoding": "identity"})
+    response = await openapi.serve_spec(request, rendered, "json")
+    assert response.body == b'{"openapi":"3.0.2","info":{"title":"API","version":"v1.0.0"}}'
+    response = await openapi.serve_spec(request, rendered, "yaml")
+    assert response.body == b"openapi: 3.0.2\ninfo:\n  title: API\n  version: v1.0.0\n"
+    assert response.content_type == "application/x-yaml"
+    response = await openapi.serve_spec(request, rendered, "yaml", yaml_as_text=True)
+    assert response.body == rendered.yaml
+    assert response.content_type == "text/plain"
+
+
+def test_spec_variants_bytes(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_variants_bytes", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+
+    _, response = app.test_client.get("/openapi/spec.json")
+    assert response.status == 200
+    assert response.content_type == "application/json"
+    assert response.body == state.rendered[openapi.SPEC].json
+    assert json.loads(response.body) == state.specs[openapi.SPEC].as_yamlable_object()
+    assert list(json.loads(response.body)["paths"]) == ["/test/10/anId/{an_id}"]
+
+    _, response = app.test_client.get("/openapi/uncloaked.json")
+    assert response.body == state.rendered[openapi.UNCLOAKED].json
+    assert list(json.loads(response.body)["paths"]) == ["/test/10/anId/{an_id}", "/test/10/cloaked"]
+
+    _, response = app.test_client.get("/openapi/uncloaked.yml?as_text")
+    assert response.content_type == "text/plain"
+    assert response.body == state.rendered[openapi.UNCLOAKED].yaml
+
+    # Without `SHOW_OPENAPI_EXCLUDED`, there is no spec.all
+    _, response = app.test_client.get("/openapi/spec.all.json")
+    assert response.status == 404
+
+
+def test_spec_etags(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_etags", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+
+    _, response = app.test_client.get("/openapi/spec.json")
+    assert response.status == 200
+    etag = response.headers["ETag"]
+    assert etag == state.rendered[openapi.SPEC].etag("json", "gzip")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    _, response = app.test_client.get("/openapi/spec.json", headers={"If-None-Match": etag})
+    assert response.status == 304
+    assert not response.body
+    assert response.headers["ETag"] == etag
+
+    _, response = app.test_client.get("/openapi/spec.json", headers={"If-None-Match": '"stale", W/' + etag})
+    assert response.status == 304
+
+    # Each format of each variant has its own ETag
+    _, response = app.test_client.get("/openapi/spec.yml", headers={"If-None-Match": etag})
+    assert response.status == 200
+    assert response.headers["ETag"] != etag
+    _, response = app.test_client.get("/openapi/uncloaked.json", headers={"If-None-Match": etag})
+    assert response.status == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_spec_cache_control_config(openapi__mod_bp_doc):
+    _, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_cache_control_config", doc, openapi_blueprint)
+    app.config.OPENAPI_CACHE_CONTROL = "public, max-age=60"
+
+    _, response = app.test_client.get("/openapi/uncloaked.yml")
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+
+
+def test_spec_compressed(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_compressed", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+
+    for accept_encoding, content_encoding in (
+        ("gzip, deflate", "gzip"),
+        ("deflate, gzip;q=0.5", "deflate"),
+        ("br;q=1.0, deflate;q=0.8, *;q=0.1", "deflate"),
+        ("x-gzip", "gzip"),
+        ("identity", None),
+        ("br", None),
+        ("", None),
+    ):
+        _, response = app.test_client.get("/openapi/spec.json", headers={"Accept-Encoding": accept_encoding})
+        assert response.status == 200, accept_encoding
+        assert response.headers.get("Content-Encoding") == content_encoding, accept_encoding
+        assert response.headers["Vary"] == "Accept-Encoding"
+        # The test client transparently decodes the body.
+        assert response.body == state.rendered[openapi.SPEC].json, accept_encoding
+        assert response.headers["ETag"] == state.rendered[openapi.SPEC].etag("json", content_encoding or "identity")
+
+    rendered = state.rendered[openapi.UNCLOAKED]
+    assert zlib.decompress(rendered.body("yaml", "deflate")) == rendered.yaml
+    assert gzip.decompress(rendered.body("yaml", "gzip")) == rendered.yaml
+    assert len(rendered.body("yaml", "gzip")) < len(rendered.yaml)
+    # The same spec always gives the same bytes, so the same ETags, on every worker.
+    assert openapi.RenderedSpec(state.specs[openapi.UNCLOAKED]).bodies == rendered.bodies
+
+
+def test_spec_compression_level_config(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_compression_level_config", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    app.config.OPENAPI_COMPRESSION_LEVEL = 0
+
+    _, response = app.test_client.get("/openapi/spec.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status == 200
+    assert "Content-Encoding" not in response.headers
+    assert state.rendered[openapi.SPEC].encodings == ("identity",)
+
+
+def test_spec_variants_built_in_one_pass(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_variants_built_in_one_pass", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+
+    @app.get("/test/10/excluded")
+    @doc.summary("An excluded route")
+    @doc.exclude()
+    def test_excluded(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    calls = []
+
+    def operation_id_fn(method, uri, route):
+        calls.append(("operation_id_fn", method, uri))
+        return openapi.default_operation_id_fn(method, uri, route)
+
+    def cloak_fn(method, uri, route):
+        calls.append(("cloak_fn", method, uri))
+        return uri.endswith("cloaked")
+
+    app.config.OPENAPI_OPERATION_ID_FN = operation_id_fn
+    app.config.OPENAPI_CLOAK_FN = cloak_fn
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    openapi.build_openapi_spec(app, None)
+
+    # Each operation is built, and so each fn called, only once for all three variants.
+    assert len(calls) == len(set(calls))
+    assert {uri for _, _, uri in calls} == {"/test/10/anId/<an_id:int>", "/test/10/cloaked", "/test/10/excluded"}
+
+    assert [uri for uri, _ in state.specs[openapi.SPEC].paths] == ["/test/10/anId/{an_id}"]
+    assert [uri for uri, _ in state.specs[openapi.UNCLOAKED].paths] == ["/test/10/anId/{an_id}", "/test/10/cloaked"]
+    uris = [uri for uri, _ in state.specs[openapi.ALL].paths]
+    assert uris == ["/test/10/anId/{an_id}", "/test/10/cloaked", "/test/10/excluded"]
+    assert state.specs[openapi.ALL].paths["/test/10/excluded"].get.summary == "[excluded] An excluded route"
+
+    # The variants share what they have in common, which is still rendered in full in the YAML.
+    path = "/test/10/anId/{an_id}"
+    assert state.specs[openapi.SPEC].paths[path] is state.specs[openapi.UNCLOAKED].paths[path]
+    assert state.specs[openapi.SPEC].components is state.specs[openapi.ALL].components
+    assert b"&id" not in state.rendered[openapi.ALL].yaml
+    assert yaml.safe_load(state.rendered[openapi.ALL].yaml) == state.specs[openapi.ALL].as_yamlable_object()
+
+
+def test_spec_variants_built_lazily(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_variants_built_lazily", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    openapi.build_openapi_spec(app, None)
+    eager = {variant: rendered.bodies for variant, rendered in state.rendered.items()}
+
+    app.config.OPENAPI_LAZY_VARIANTS = True
+    openapi.build_openapi_spec(app, None)
+    assert list(state.rendered) == [openapi.SPEC]
+    assert list(state.specs) == [openapi.SPEC]
+
+    # Concurrent first requests share the one build.
+    builds = []
+    render = state.lazy_variants[openapi.ALL]
+    state.lazy_variants[openapi.ALL] = lambda: builds.append(render())
+
+    async def first_requests():
+        return await asyncio.gather(*(openapi._rendered_variant(app, openapi.ALL) for _ in range(3)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        renderings = loop.run_until_complete(first_requests())
+    finally:
+        loop.close()
+    assert len(builds) == 1
+    assert renderings[0] is renderings[1] is renderings[2] is state.rendered[openapi.ALL]
+    assert renderings[0].bodies == eager[openapi.ALL]
+    assert openapi.ALL not in state.lazy_variants and not state.lazy_builds
+
+    _, response = app.test_client.get("/openapi/uncloaked.json")
+    assert response.status == 200
+    assert response.body == eager[openapi.UNCLOAKED]["json", "identity"]
+    assert openapi.UNCLOAKED in state.specs
+    assert openapi.ALL in state.lazy_variants, "not requested since the server started"
+
+
+def test_spec_built_in_background(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_built_in_background", doc, openapi_blueprint)
+    app.config.OPENAPI_BACKGROUND_BUILD = True
+    app.config.OPENAPI_RETRY_AFTER = 2
+
+    # A build that is slow to finish.
+    built = threading.Event()
+    build_openapi_specs = openapi._build_openapi_specs
+
+    def slow_build_openapi_specs(*args):
+        built.wait(timeout=30)
+        build_openapi_specs(*args)
+
+    openapi._build_openapi_specs = slow_build_openapi_specs
+
+    @app.get("/test/10/ready")
+    async def test_ready(request):
+        await openapi.openapi_spec_ready(app)
+        assert openapi.is_openapi_spec_ready(app)
+        return await openapi.spec_v3_json(request)
+
+    # The server is accepting connections while the specs are built.
+    try:
+        _, response = app.test_client.get("/openapi/spec.json")
+        assert response.status == 503
+        assert response.headers["Retry-After"] == "2"
+        assert not openapi.is_openapi_spec_ready(app)
+    finally:
+        built.set()
+
+    # ... and they are served once they are.
+    _, response = app.test_client.get("/test/10/ready")
+    assert response.status == 200
+    assert list(json.loads(response.body)["paths"]) == ["/test/10/anId/{an_id}", "/test/10/ready"]
+
+
+def test_spec_built_in_background_fails(openapi__mod_bp_doc, monkeypatch):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_built_in_background_fails", doc, openapi_blueprint)
+    app.config.OPENAPI_BACKGROUND_BUILD = True
+
+    def failing_build_openapi_specs(*args, **kwargs):
+        raise ValueError("A broken doc decorator.")
+
+    logged = []
+    monkeypatch.setattr(openapi, "_build_openapi_specs", failing_build_openapi_specs)
+    monkeypatch.setattr(openapi.logger, "exception", logged.append)
+
+    async def requests():
+        openapi.build_openapi_spec(app, asyncio.get_event_loop())
+        with pytest.raises(ValueError):
+            await openapi.openapi_spec_ready(app)
+        request = types.SimpleNamespace(app=app, headers={})
+        return [await openapi.serve_spec(request, None, "json") for _ in range(2)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        responses = loop.run_until_complete(requests())
+    finally:
+        loop.close()
+    # Logged once, by the build, and not per request, which are all answered alike.
+    assert logged == ["The OpenAPI specs could not be built."]
+    for response in responses:
+        assert response.status == 500
+        assert response.body == b"The OpenAPI specs could not be built."
+
+
+def test_spec_tracks_routes(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_tracks_routes", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+
+    calls = []
+
+    def operation_id_fn(method, uri, route):
+        calls.append(uri)
+        return openapi.default_operation_id_fn(method, uri, route)
+
+    app.config.OPENAPI_OPERATION_ID_FN = operation_id_fn
+    app.config.OPENAPI_TRACK_ROUTES = True
+    app.config.OPENAPI_LAZY_VARIANTS = True
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    openapi.build_openapi_spec(app, None)
+    etag = state.rendered[openapi.SPEC].etag("json")
+    uncloaked = state.rendered[openapi.UNCLOAKED] = openapi.RenderedSpec(state.specs[openapi.SPEC])
+
+    # Unchanged routes are not built again.
+    calls.clear()
+    openapi._update_openapi_specs(app)
+    assert state.rendered[openapi.SPEC].etag("json") == etag
+    assert state.rendered[openapi.UNCLOAKED] is uncloaked
+
+    # Only the operations of the routes that were added are built, in a blueprint registered after the start too.
+    added = sanic.Blueprint("added", url_prefix="/test/10/added")
+
+    @added.get("/<an_id:int>", strict_slashes=strict_slashes)
+    @doc.summary("An added route")
+    def test_added(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    app.blueprint(added)
+    openapi._update_openapi_specs(app)
+    assert calls == ["/test/10/added/<an_id:int>"]
+    assert state.rendered[openapi.SPEC].etag("json") != etag
+    spec = json.loads(state.rendered[openapi.SPEC].json)
+    assert list(spec["paths"]) == ["/test/10/anId/{an_id}", "/test/10/added/{an_id}"]
+    assert spec["paths"]["/test/10/added/{an_id}"]["get"]["tags"] == ["added"]
+    assert state.rendered[openapi.UNCLOAKED] is not uncloaked
+
+    # ... and the same as when built in full, including the lazy variant that had not been built yet.
+    assert openapi.ALL in state.lazy_variants
+    openapi._build_lazy_variant(app, openapi.ALL)
+    incremental = {variant: rendered.bodies for variant, rendered in state.rendered.items()}
+    app.config.OPENAPI_LAZY_VARIANTS = False
+    openapi.build_openapi_spec(app, None)
+    assert incremental[openapi.SPEC] == state.rendered[openapi.SPEC].bodies
+    assert incremental[openapi.ALL] == state.rendered[openapi.ALL].bodies
+
+
+def test_spec_tracked_routes_rendered_by_path(openapi__mod_bp_doc, monkeypatch):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_tracked_routes_rendered_by_path", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    app.config.OPENAPI_TRACK_ROUTES = True
+    openapi.build_openapi_spec(app, None)
+    spans = state.rendered[openapi.SPEC].path_spans
+    assert [uri for uri, _ in spans] == ["/test/10/anId/{an_id}"]
+
+    rendered_paths = []
+    render_paths = rendering._render_paths
+
+    def count_render_paths(paths):
+        rendered_paths.extend(uri for uri, _ in paths)
+        return render_paths(paths)
+
+    monkeypatch.setattr(rendering, "_render_paths", count_render_paths)
+
+    @app.get("/test/10/added")
+    @doc.summary("An added route")
+    @doc.tag("added")
+    def test_added(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    # Only the added path is rendered, once for each variant, and the others are copied.
+    openapi._update_openapi_specs(app)
+    assert rendered_paths == ["/test/10/added"] * 3
+    rendered = state.rendered[openapi.SPEC]
+    for (uri, _), (json_start, json_end, yaml_start, yaml_end) in rendered.path_spans.items():
+        # With the very same `json_dumps` as the renderings: `ujson`, when installed, escapes the "/"s.
+        assert rendered.json[json_start:json_end].startswith(sanic.response.json_dumps(uri).encode("utf8") + b":{")
+        assert rendered.yaml[yaml_start:yaml_end].startswith("  {}:\n".format(uri).encode("utf8"))
+    incremental = {variant: rendered.bodies for variant, rendered in state.rendered.items()}
+    assert json.loads(incremental[openapi.SPEC]["json", "identity"])["tags"] == [{"name": "added"}]
+
+    # ... and the very same bytes, and so ETags, as the specs built in full, in one go.
+    app.config.OPENAPI_TRACK_ROUTES = False
+    openapi.build_openapi_spec(app, None)
+    assert {variant: rendered.bodies for variant, rendered in state.rendered.items()} == incremental
+
+
+def test_spec_routes_added_counted(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_routes_added_counted", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    app.config.OPENAPI_TRACK_ROUTES = True
+    openapi.build_openapi_spec(app, None)
+    openapi.build_openapi_spec(app, None)
+
+    class UncomparableRoutes(dict):
+        def __eq__(self, other):
+            raise AssertionError("The routes should not be compared on the event loop.")  # pragma: no cover
+
+        __ne__ = __eq__
+
+    app.router.routes_all = UncomparableRoutes(app.router.routes_all)
+    routes_added = openapi._routes_added(app.router)
+
+    async def requests():
+        # Without any routes added, nothing is compared, nor updated.
+        await openapi._rendered_variant(app, openapi.SPEC)
+        assert state.update is None
+
+        # The router is only wrapped once, though the specs were built twice, and so each route is counted once.
+        added = sanic.Blueprint("added", url_prefix="/test/10/added")
+
+        @added.get("/one")
+        @added.get("/two")
+        def test_added(_):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        app.blueprint(added)
+        assert openapi._routes_added(app.router) == routes_added + 2
+        await openapi._rendered_variant(app, openapi.SPEC)
+        await state.update
+        await asyncio.sleep(0)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(requests())
+    finally:
+        loop.close()
+    assert state.sources.routes_added == openapi._routes_added(app.router)
+    assert "/test/10/added/two" in json.loads(state.rendered[openapi.SPEC].json)["paths"]
+
+    # The routes added to another app are counted for that app only.
+    other = create_simple_app("test_spec_routes_added_counted_other", doc, openapi_blueprint)
+    other.config.OPENAPI_TRACK_ROUTES = True
+    openapi.build_openapi_spec(other, None)
+
+    @other.get("/test/10/other")
+    def test_other(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    assert openapi._routes_added(other.router) == 1
+    assert state.sources.routes_added == openapi._routes_added(app.router)
+    assert openapi._openapi_state(other).sources.routes_added == 0
+
+
+def test_spec_updated_in_executor(openapi__mod_bp_doc, monkeypatch):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_updated_in_executor", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    app.config.OPENAPI_TRACK_ROUTES = True
+    openapi.build_openapi_spec(app, None)
+    stale = state.rendered[openapi.SPEC]
+
+    @app.get("/test/10/added")
+    @doc.summary("An added route")
+    def test_added(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    started, release = threading.Event(), threading.Event()
+    updates = []
+    update_openapi_specs = openapi._update_openapi_specs
+
+    def _update_openapi_specs(_app):
+        updates.append(threading.current_thread())
+        started.set()
+        release.wait(5)
+        update_openapi_specs(_app)
+
+    monkeypatch.setattr(openapi, "_update_openapi_specs", _update_openapi_specs)
+
+    async def requests():
+        # The specs as they were are served, by each of the requests, until the one update in the executor is done.
+        renderings = [await openapi._rendered_variant(app, openapi.SPEC) for _ in range(3)]
+        assert await asyncio.get_event_loop().run_in_executor(None, started.wait, 5)
+        release.set()
+        await state.update
+        await asyncio.sleep(0)
+        return renderings, await openapi._rendered_variant(app, openapi.SPEC)
+
+    loop = asyncio.new_event_loop()
+    try:
+        renderings, rendered = loop.run_until_complete(requests())
+    finally:
+        loop.close()
+    assert renderings == [stale] * 3
+    assert len(updates) == 1 and updates[0] is not threading.current_thread()
+    assert state.update is None
+    assert rendered is not stale
+    assert "/test/10/added" in json.loads(rendered.json)["paths"]
+
+
+def test_spec_built_in_parallel(openapi__mod_bp_doc, monkeypatch):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_built_in_parallel", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    for idx in range(20):
+
+        @doc.summary("Route {}".format(idx))
+        @doc.description("A description that is long enough to be wrapped when it is rendered as YAML, more than once.")
+        @doc.parameter(name="limit", _in="query", schema=doc.Schema.Integer)
+        def test_route(_, an_id: int):
+            return sanic.response.json(locals())  # pragma: no cover
+
+        app.add_route(test_route, "/test/10/{}/<an_id:int>".format(idx), methods=("GET", "POST"))
+
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    openapi.build_openapi_spec(app, None)
+    serial = {variant: rendered.bodies for variant, rendered in state.rendered.items()}
+
+    rendered_in_parallel = []
+    render_in_parallel = rendering.render_in_parallel
+
+    def count_render_in_parallel(spec, processes):
+        rendered_in_parallel.append(processes)
+        return render_in_parallel(spec, processes)
+
+    monkeypatch.setattr(rendering, "render_in_parallel", count_render_in_parallel)
+    app.config.OPENAPI_BUILD_PROCESSES = 3
+    openapi.build_openapi_spec(app, None)
+    assert rendered_in_parallel == [3, 3, 3]
+    assert {variant: rendered.bodies for variant, rendered in state.rendered.items()} == serial
+
+    # ... from any thread, as in an executor, while other threads are running: the processes are not forked from this
+    # one, so there is no lock for them to wait on forever.
+    rendered_in_parallel.clear()
+    thread = threading.Thread(target=openapi.build_openapi_spec, args=(app, None))
+    thread.start()
+    thread.join()
+    assert rendered_in_parallel == [3, 3, 3]
+    assert {variant: rendered.bodies for variant, rendered in state.rendered.items()} == serial
+
+
+def test_spec_rendered_a_piece_at_a_time(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_rendered_a_piece_at_a_time", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    app.config.SHOW_OPENAPI_EXCLUDED = True
+    openapi.build_openapi_spec(app, None)
+
+    for variant in (openapi.SPEC, openapi.ALL):
+        # The same bytes as rendering the whole `yaml`-able form at once.
+        yamlable = state.specs[variant].as_yamlable_object()
+        rendered = state.rendered[variant]
+        assert rendered.json == sanic.response.json_dumps(yamlable).encode("utf8")
+        # The frozen objects, like the default `Responses`, share their `yaml`-able form, for which `yaml.dump` would
+        # emit anchors and aliases: a copy without any shared objects is dumped instead.
+        unshared = json.loads(rendered.json)
+        assert rendered.yaml == yaml.dump(unshared, default_flow_style=False, sort_keys=False).encode("utf8")
+        assert openapi.RenderedSpec(yamlable).bodies == rendered.bodies
+
+
+def test_spec_self_referencing_schema(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = create_simple_app("test_spec_self_referencing_schema", doc, openapi_blueprint)
+    state = openapi._openapi_state(app)
+    node = doc.Schema(_type="object", description="A filter")
+    node.properties = {"any_of": doc.Schema(_type="array", items=node)}
+
+    @app.get("/test/10/tree")
+    @doc.parameter(name="filter", _in="query", schema=node)
+    def test_tree(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    _, response = app.test_client.get("/openapi/spec.json")
+    assert response.status == 200
+    schema = json.loads(response.body)["paths"]["/test/10/tree"]["get"]["parameters"][0]["schema"]
+    assert schema["properties"]["any_of"]["items"] == {"$ref": "#/paths/~1test~110~1tree/get/parameters/0/schema"}
+    spec = state.specs[openapi.SPEC]
+    assert json.loads(response.body) == spec.as_yamlable_object(), "the same `$ref`s when not streamed"
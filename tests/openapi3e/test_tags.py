@@ -1,6 +1,8 @@
 import pytest
 import sanic.response
 from sanic import Sanic
+from sanic.blueprints import Blueprint
+from sanic.views import CompositionView
 
 import sanic_openapi3e
 import sanic_openapi3e.oas_types
@@ -659,3 +661,43 @@ def test_path_with_multiple_equal_tags_does_not_repeat_tags(openapi__mod_bp_doc)
     }
 
     run_asserts(response, expected)
+
+
+def test_untagged_routes_use_their_blueprint_name(openapi__mod_bp_doc):
+    openapi, openapi_blueprint, doc = openapi__mod_bp_doc
+    app = Sanic("test_untagged_routes_use_their_blueprint_name", strict_slashes=strict_slashes)
+    app.blueprint(openapi_blueprint)
+
+    items_bp = Blueprint("items", url_prefix="items")
+
+    @items_bp.get("/<an_id:int>")
+    def get_item(_, an_id: int):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    @items_bp.get("/tagged")
+    @doc.tag("Tagged")
+    def get_tagged(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    def put_thing(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    things_bp = Blueprint("things", url_prefix="things")
+    view = CompositionView()
+    view.add(["PUT"], put_thing)
+    things_bp.add_route(view, "/", name="thing")
+
+    @app.get("/no/blueprint")
+    def no_blueprint(_):
+        return sanic.response.json(locals())  # pragma: no cover
+
+    app.blueprint(items_bp)
+    app.blueprint(things_bp)
+
+    # noinspection PyProtectedMember
+    spec = openapi._build_openapi_spec(app, operation_id_fn=openapi.default_operation_id_fn)
+    paths = spec.as_yamlable_object()["paths"]
+    assert paths["/items/{an_id}"]["get"]["tags"] == ["items"]
+    assert paths["/items/tagged"]["get"]["tags"] == ["Tagged"]
+    assert paths["/things/"]["put"]["tags"] == ["things"]
+    assert "tags" not in paths["/no/blueprint"]["get"]